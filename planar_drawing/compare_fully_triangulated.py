@@ -1,6 +1,17 @@
+"""Compare straight line drawings with and without full triangulation
+
+Shows the drawings of random planar graphs side by side. The script
+imports the packages of this repository, so it is run as a module from the
+repository root::
+
+    python -m planar_drawing.compare_fully_triangulated
+"""
 import matplotlib.pyplot as plt
 import networkx as nx
 
+from planar_drawing.straight_line import straight_line_pos
+from planarity_checking.lr_planarity import check_planarity
+
 
 def main():
     while True:
@@ -9,14 +20,14 @@ def main():
         is_planar = False
         while not is_planar:
             G = nx.fast_gnp_random_graph(n, p)
-            is_planar, embedding = nx.check_planarity(G)
+            is_planar, embedding = check_planarity(G, compact=True)
             p *= 0.99
-        print("Embedding: ", embedding.get_data())
+        print("Embedding: ", embedding.to_dict())
         print("Displaying not fully triangulated drawing")
         plt.subplot(1, 2, 1)
-        nx.draw_planar(embedding, node_size=2)
+        nx.draw(G, straight_line_pos(embedding), node_size=2)
 
-        pos = nx.combinatorial_embedding_to_pos(embedding, fully_triangulate=True)
+        pos = straight_line_pos(embedding, fully_triangulate=True)
         print("Displaying fully triangulated drawing")
         plt.subplot(1, 2, 2)
         nx.draw(G, pos, node_size=2)
@@ -0,0 +1,263 @@
+"""Straight-line grid drawings of planar embeddings
+
+:func:`straight_line_drawing` places the nodes of a planar embedding on the
+(2n - 4) x (n - 2) grid such that all edges are straight lines without
+crossings. It implements the shift method of de Fraysseix, Pach and
+Pollack [1] with the relative offsets of Chrobak and Payne [2], which
+makes it linear: a node only stores its x offset to its parent in a tree,
+so shifting a node shifts the whole subtree, and the absolute coordinates
+are summed up once at the end.
+
+Everything works on the integer arrays of a :class:`RotationSystem`, as
+returned by :func:`check_planarity` with compact set.
+
+References
+----------
+.. [1] Hubert de Fraysseix, Janos Pach, Richard Pollack:
+    How to draw a planar graph on a grid
+    Combinatorica 10(1), 1990
+.. [2] Marek Chrobak, Thomas H. Payne:
+    A linear-time algorithm for drawing a planar graph on a grid
+    Information Processing Letters 54(4), 1995
+"""
+from array import array
+
+from planar_drawing.triangulation import _rotation_system, _triangulate
+from planarity_checking.lr_planarity import NONE
+
+
+def straight_line_drawing(embedding, fully_triangulate=False):
+    """Returns the grid coordinates of a planar straight-line drawing
+
+    Parameters
+    ----------
+    embedding : RotationSystem, dict or nx.PlanarEmbedding
+        A planar embedding as returned by :func:`check_planarity`
+    fully_triangulate : bool
+        If True the drawing has a triangle as outer face, otherwise the
+        largest face of the embedding is the outer face.
+
+    Returns
+    -------
+    nodes : list
+        The nodes of the embedding
+    x, y : numpy.ndarray
+        The coordinates of ``nodes[i]`` are ``(x[i], y[i])``, integers
+        with 0 <= x <= 2n - 4 and 0 <= y <= n - 2
+
+    Notes
+    -----
+    The embedding is triangulated and the nodes are ordered in a canonical
+    ordering v1, ..., vn [1]_. Then v1, v2, v3 form a triangle and every
+    further node vk is put above the contour of the drawing of v1, ...,
+    vk-1, between its first and last neighbor wp and wq on the contour.
+    The nodes right of wp are shifted by one and the nodes right of wq by
+    two, so that vk sees all its contour neighbors. Every node stores the
+    x offset to the node it hangs from, so a shift changes one offset.
+    Finding the contour neighbors and the shifts take O(n) time together.
+
+    References
+    ----------
+    .. [1] Hubert de Fraysseix, Janos Pach, Richard Pollack:
+        How to draw a planar graph on a grid
+        Combinatorica 10(1), 1990
+    """
+    import numpy
+    nodes, x, y = _grid_coordinates(_rotation_system(embedding),
+                                    fully_triangulate)
+    return (nodes, numpy.frombuffer(x, dtype=numpy.intc),
+            numpy.frombuffer(y, dtype=numpy.intc))
+
+
+def straight_line_pos(embedding, fully_triangulate=False):
+    """Returns the positions of :func:`straight_line_drawing` as dict
+
+    The dict maps every node to a tuple (x, y) like
+    :func:`nx.combinatorial_embedding_to_pos`, e.g. for :func:`nx.draw`.
+    NumPy is not needed.
+    """
+    nodes, x, y = _grid_coordinates(_rotation_system(embedding),
+                                    fully_triangulate)
+    return {v: (x[i], y[i]) for i, v in enumerate(nodes)}
+
+
+def _grid_coordinates(rotation_system, fully_triangulate):
+    """Return the nodes and their coordinates as arrays"""
+    nodes = rotation_system.nodes
+    n = len(rotation_system)
+    if n < 4:
+        # the nodes of any triangle
+        return nodes, array('i', [0, 2, 1][:n]), array('i', [0, 0, 1][:n])
+    rotation_system, outer_face, _ = _triangulate(rotation_system,
+                                                  fully_triangulate)
+    order, contours = _canonical_ordering(rotation_system, outer_face)
+    x, y = _shift(order, contours)
+    return nodes, x, y
+
+
+def _canonical_ordering(rotation_system, outer_face):
+    """Return a canonical ordering of an internally triangulated embedding
+
+    The vertices are removed from the outer face one by one, starting with
+    vn. A vertex on the outer face can be removed if it is not v1, v2 and
+    no chord (an edge between two vertices of the outer face that is not
+    on the outer face) ends at it. The number of chords of every vertex
+    on the outer face is kept up to date.
+
+    Returns
+    -------
+    order : array
+        The vertices v1, ..., vn
+    contours : list
+        ``contours[k]`` are the neighbors wp, ..., wq of vk on the contour
+        of v1, ..., vk-1 from left to right, empty for k < 3
+    """
+    offsets, targets = rotation_system.offsets, rotation_system.targets
+    n = len(rotation_system)
+    v1, v2 = outer_face[0], outer_face[1]
+    chords = array('i', [0]) * n
+    removed = bytearray(n)
+    # the candidates with ready set, the stack may hold stale entries
+    ready = bytearray(n)
+    candidates = []
+
+    # the neighbors on the outer face, without the edge (v1, v2)
+    ccw_nbr = array('i', [NONE]) * n
+    cw_nbr = array('i', [NONE]) * n
+    for i in range(1, len(outer_face)):
+        ccw_nbr[outer_face[i]] = outer_face[(i + 1) % len(outer_face)]
+        cw_nbr[outer_face[(i + 1) % len(outer_face)]] = outer_face[i]
+
+    def on_outer_face(x):
+        return not removed[x] and (ccw_nbr[x] != NONE or x == v1)
+
+    def outer_face_nbrs(x, y):
+        return ccw_nbr[x] == y or cw_nbr[x] == y
+
+    for v in outer_face:
+        for i in range(offsets[v], offsets[v + 1]):
+            w = targets[i]
+            if on_outer_face(w) and not outer_face_nbrs(v, w):
+                chords[v] += 1
+        if chords[v] == 0 and v != v1 and v != v2:
+            ready[v] = 1
+            candidates.append(v)
+
+    order = array('i', [NONE]) * n
+    order[0], order[1] = v1, v2
+    contours = [[] for _ in range(n)]
+    for k in range(n - 1, 1, -1):
+        v = candidates.pop()
+        while not ready[v]:
+            v = candidates.pop()
+        ready[v] = 0
+        removed[v] = 1
+
+        # the neighbors wp and wq of v on the outer face
+        wp = wq = NONE
+        for i in range(offsets[v], offsets[v + 1]):
+            w = targets[i]
+            if not on_outer_face(w):
+                continue
+            if w == v1 or (w != v2 and cw_nbr[w] == v):
+                wp, start = w, i
+            else:
+                wq = w
+            if wp != NONE and wq != NONE:
+                break
+
+        # the neighbors from wp to wq (counterclockwise around v) become
+        # the outer face
+        contour = [wp]
+        i = start
+        w = wp
+        while w != wq:
+            i = i - 1 if i > offsets[v] else offsets[v + 1] - 1
+            x = targets[i]
+            contour.append(x)
+            cw_nbr[w] = x
+            ccw_nbr[x] = w
+            w = x
+
+        if len(contour) == 2:
+            # the chord (wp, wq) is now on the outer face
+            for w in (wp, wq):
+                chords[w] -= 1
+                if chords[w] == 0 and w != v1 and w != v2:
+                    ready[w] = 1
+                    candidates.append(w)
+        else:
+            inner = contour[1:-1]
+            for w in inner:
+                ready[w] = 2  # marks the new vertices of the outer face
+            for w in inner:
+                for i in range(offsets[w], offsets[w + 1]):
+                    x = targets[i]
+                    if on_outer_face(x) and not outer_face_nbrs(w, x):
+                        chords[w] += 1
+                        if ready[x] != 2:
+                            # chords between new vertices are found twice
+                            chords[x] += 1
+                            ready[x] = 0
+            for w in inner:
+                ready[w] = chords[w] == 0
+                if ready[w]:
+                    candidates.append(w)
+        order[k] = v
+        contours[k] = contour
+    return order, contours
+
+
+def _shift(order, contours):
+    """Return the x and y coordinates of the vertices
+
+    Every vertex is a node of a binary tree rooted at v1 and stores its x
+    offset to its parent. The right children run along the contour from
+    v1 to v2, the left child of vk is the first vertex covered by vk.
+    """
+    n = len(order)
+    delta_x = array('i', [0]) * n
+    y = array('i', [0]) * n
+    left = array('i', [NONE]) * n
+    right = array('i', [NONE]) * n
+
+    v1, v2, v3 = order[0], order[1], order[2]
+    delta_x[v2] = delta_x[v3] = 1
+    y[v3] = 1
+    right[v1] = v3
+    right[v3] = v2
+
+    for k in range(3, n):
+        vk = order[k]
+        contour = contours[k]
+        wp, wp1, wq = contour[0], contour[1], contour[-1]
+
+        # stretch the gaps after wp and before wq
+        delta_x[wp1] += 1
+        delta_x[wq] += 1
+        width = 0
+        for i in range(1, len(contour)):
+            width += delta_x[contour[i]]
+
+        # vk is at the intersection of the lines of slope 1 and -1
+        # through wp and wq
+        delta_x[vk] = (width - y[wp] + y[wq]) // 2
+        y[vk] = (width + y[wp] + y[wq]) // 2
+        delta_x[wq] = width - delta_x[vk]
+        if len(contour) > 2:
+            delta_x[wp1] -= delta_x[vk]
+            left[vk] = wp1
+            right[contour[-2]] = NONE
+        right[wp] = vk
+        right[vk] = wq
+
+    # absolute coordinates, top down
+    x = array('i', [0]) * n
+    stack = [v1]
+    while stack:
+        v = stack.pop()
+        for w in (left[v], right[v]):
+            if w != NONE:
+                x[w] = x[v] + delta_x[w]
+                stack.append(w)
+    return x, y
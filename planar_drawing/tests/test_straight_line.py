@@ -0,0 +1,104 @@
+import random
+
+import networkx as nx
+from nose import SkipTest
+from nose.tools import assert_equals, assert_true
+from planar_drawing.straight_line import (straight_line_drawing,
+                                          straight_line_pos)
+from planarity_checking import generators
+from planarity_checking.lr_planarity import check_planarity
+
+
+def orientation(a, b, c):
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+
+def check_drawing(G, pos):
+    """Check a straight-line drawing on the (2n - 4) x (n - 2) grid"""
+    n = len(G)
+    assert_equals(set(pos), set(G))
+    assert_equals(len(set(pos.values())), n)
+    if n >= 3:
+        for x, y in pos.values():
+            assert_true(0 <= x <= 2 * n - 4 and 0 <= y <= n - 2)
+    edges = list(G.edges)
+    for i, (a, b) in enumerate(edges):
+        pa, pb = pos[a], pos[b]
+        for v in G:
+            # no node on an edge
+            pv = pos[v]
+            assert_true(v in (a, b) or orientation(pa, pb, pv) != 0 or
+                        not (min(pa[0], pb[0]) <= pv[0] <= max(pa[0], pb[0])
+                             and min(pa[1], pb[1]) <= pv[1] <=
+                             max(pa[1], pb[1])))
+        for c, d in edges[i + 1:]:
+            if len({a, b, c, d}) < 4:
+                continue
+            pc, pd = pos[c], pos[d]
+            crossing = (orientation(pa, pb, pc) * orientation(pa, pb, pd) < 0
+                        and orientation(pc, pd, pa) *
+                        orientation(pc, pd, pb) < 0)
+            assert_true(not crossing,
+                        "Edges {}-{} and {}-{} cross.".format(a, b, c, d))
+
+
+class TestStraightLinePos:
+    """Unit tests for :func:`straight_line_pos`."""
+
+    @staticmethod
+    def check(G):
+        is_planar, embedding = check_planarity(G, compact=True)
+        for fully_triangulate in (False, True):
+            check_drawing(G, straight_line_pos(embedding, fully_triangulate))
+
+    def test_small(self):
+        for n in range(5):
+            self.check(nx.path_graph(n))
+        self.check(nx.empty_graph(4))
+        self.check(nx.complete_graph(4))
+
+    def test_special(self):
+        self.check(nx.cycle_graph(10))
+        self.check(nx.star_graph(6))
+        self.check(nx.grid_2d_graph(4, 5))
+        self.check(nx.octahedral_graph())
+        self.check(nx.disjoint_union(nx.cycle_graph(5), nx.path_graph(4)))
+
+    def test_random(self):
+        rnd = random.Random(4)
+        for _ in range(20):
+            G = generators.to_networkx(*generators.triangulation_edges(
+                rnd.randint(3, 40), rnd.randint(0, 10 ** 6)))
+            G.remove_edges_from(rnd.sample(
+                list(G.edges), rnd.randint(0, G.number_of_edges() // 2)))
+            self.check(G)
+
+    def test_embedding_types(self):
+        G = nx.wheel_graph(7)
+        is_planar, embedding = check_planarity(G, compact=True)
+        pos = straight_line_pos(embedding)
+        check_drawing(G, pos)
+        assert_equals(straight_line_pos(embedding.to_dict()), pos)
+        assert_equals(straight_line_pos(embedding.to_planar_embedding()), pos)
+
+
+class TestStraightLineDrawing:
+    """Unit tests for :func:`straight_line_drawing`."""
+
+    @classmethod
+    def setup_class(cls):
+        global numpy
+        try:
+            import numpy
+        except ImportError:
+            raise SkipTest('NumPy not available.')
+
+    def test_arrays(self):
+        G = generators.to_networkx(*generators.triangulation_edges(30, 1))
+        is_planar, embedding = check_planarity(G, compact=True)
+        nodes, x, y = straight_line_drawing(embedding)
+        assert_true(isinstance(x, numpy.ndarray))
+        assert_equals(x.shape, (len(G),))
+        assert_equals(y.shape, (len(G),))
+        pos = straight_line_pos(embedding)
+        assert_equals({v: (x[i], y[i]) for i, v in enumerate(nodes)}, pos)
@@ -0,0 +1,92 @@
+import random
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true
+from planar_drawing.triangulation import triangulate
+from planarity_checking import generators
+from planarity_checking.faces import face_index
+from planarity_checking.lr_planarity import check_planarity
+from planarity_checking.verify import check_rotation_system
+
+
+class TestTriangulate:
+    """Unit tests for :func:`planar_drawing.triangulation.triangulate`."""
+
+    @staticmethod
+    def check(G, fully_triangulate):
+        is_planar, embedding = check_planarity(G, compact=True)
+        triangulation, outer_face, added = triangulate(embedding,
+                                                       fully_triangulate)
+        check_rotation_system(triangulation)
+        H = nx.Graph(triangulation.to_dict())
+        assert_equals(set(H), set(G))
+        added_edges = set(map(frozenset, added))
+        assert_equals(len(added_edges), len(added))
+        assert_true(added_edges.isdisjoint(map(frozenset, G.edges)))
+        assert_equals(set(map(frozenset, H.edges)),
+                      added_edges.union(map(frozenset, G.edges)))
+        n = len(G)
+        if n < 3:
+            return
+        assert_true(nx.is_biconnected(H))
+        faces = face_index(triangulation)
+        large = [f for f in range(len(faces)) if faces.sizes[f] != 3]
+        if fully_triangulate:
+            assert_equals(H.number_of_edges(), 3 * n - 6)
+            assert_equals(large, [])
+            assert_equals(len(outer_face), 3)
+        else:
+            assert_true(len(large) <= 1)
+            assert_equals(len(set(outer_face)), len(outer_face))
+            if large:
+                assert_equals(sorted(faces.boundary(large[0]), key=repr),
+                              sorted(outer_face, key=repr))
+
+    def check_both(self, G):
+        self.check(G, True)
+        self.check(G, False)
+
+    def test_small(self):
+        for n in range(5):
+            self.check_both(nx.path_graph(n))
+        self.check_both(nx.empty_graph(5))
+
+    def test_cycle(self):
+        G = nx.cycle_graph(20)
+        self.check_both(G)
+        is_planar, embedding = check_planarity(G, compact=True)
+        triangulation, outer_face, added = triangulate(embedding, False)
+        assert_equals(len(outer_face), 20)
+        assert_equals(len(added), 17)
+
+    def test_cut_vertices(self):
+        self.check_both(nx.star_graph(6))
+        self.check_both(nx.barbell_graph(4, 3))
+        G = nx.Graph([(1, 2), (2, 3), (3, 4), (4, 5), (5, 6), (1, 4), (4, 3)])
+        self.check_both(G)
+        # the fan of the outer face must skip the existing chords
+        G = nx.wheel_graph(6)
+        G.add_edges_from([(1, 6), (6, 3)])
+        self.check_both(G)
+
+    def test_disconnected(self):
+        G = nx.disjoint_union(nx.complete_graph(4), nx.cycle_graph(5))
+        G.add_nodes_from(['a', 'b'])
+        self.check_both(G)
+
+    def test_random(self):
+        rnd = random.Random(5)
+        for _ in range(30):
+            G = generators.to_networkx(*generators.triangulation_edges(
+                rnd.randint(3, 50), rnd.randint(0, 10 ** 6)))
+            G.remove_edges_from(rnd.sample(
+                list(G.edges), rnd.randint(0, G.number_of_edges())))
+            self.check_both(G)
+
+    def test_embedding_types(self):
+        G = nx.grid_2d_graph(3, 3)
+        is_planar, embedding = check_planarity(G, compact=True)
+        expected = triangulate(embedding)[2]
+        assert_equals(triangulate(embedding.to_dict())[2], expected)
+        assert_equals(triangulate(embedding.to_planar_embedding())[2],
+                      expected)
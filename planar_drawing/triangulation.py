@@ -0,0 +1,337 @@
+"""Triangulation of planar embeddings on half-edge arrays
+
+:func:`triangulate` adds edges to a planar embedding until every face is a
+triangle, optionally except for the outer face. It replaces
+``nx.triangulate_embedding`` for large embeddings: instead of inserting
+half-edges into a :class:`nx.PlanarEmbedding` one by one, the rotations
+are kept as linked lists in flat integer arrays, and the result is a
+:class:`RotationSystem` again.
+
+The half-edges of edge k are 2k and 2k + 1, so the twin of h is h ^ 1.
+``cw[h]`` and ``ccw[h]`` are the neighbors of h in the rotation of its
+start vertex, ``target[h]`` its end vertex. The half-edge after h on its
+face is ``ccw[h ^ 1]``, the one before h is ``cw[h] ^ 1``, as in
+:meth:`RotationSystem.face_next`.
+"""
+from array import array
+
+import networkx as nx
+
+from planarity_checking.lr_planarity import NONE, LRPlanarity, RotationSystem
+from planarity_checking.verify import rotation_system_from_dict
+
+
+def triangulate(embedding, fully_triangulate=True):
+    """Returns a triangulation of a planar embedding and the added edges
+
+    Parameters
+    ----------
+    embedding : RotationSystem, dict or nx.PlanarEmbedding
+        A planar embedding as returned by :func:`check_planarity`
+    fully_triangulate : bool
+        If False the largest face is the outer face and is not triangulated
+
+    Returns
+    -------
+    triangulation : RotationSystem
+        The embedding with the added edges, with the same nodes
+    outer_face : list
+        The nodes of the outer face in the order of a face traversal. If
+        the embedding is fully triangulated it is any triangle.
+    added : list
+        The added edges as node pairs, e.g. to draw them differently
+
+    Notes
+    -----
+    The triangulation has no multiple edges. With three or more nodes it
+    is biconnected, so the outer face is a simple cycle as required by
+    :func:`straight_line_drawing`. It is built in three linear passes:
+
+    1. The connected components are joined by edges.
+    2. At every cut vertex v, the neighbors u, w of two consecutive edges
+       from different blocks are joined, which merges the two blocks. A
+       union-find structure on the blocks of the input (computed by the LR
+       orientation) skips pairs of blocks that are already merged, so no
+       edge is added twice.
+    3. Every face v1, ..., vk is triangulated by a fan from v1. If the edge
+       (v1, v3) already exists outside of the face, the fan starts at v2
+       instead, as in ``nx.triangulate_embedding``.
+    """
+    rotation_system = _rotation_system(embedding)
+    triangulation, outer_face, added = _triangulate(rotation_system,
+                                                    fully_triangulate)
+    nodes = rotation_system.nodes
+    return (triangulation, [nodes[v] for v in outer_face],
+            [(nodes[u], nodes[w]) for u, w in added])
+
+
+def _rotation_system(embedding):
+    """Return the embedding as RotationSystem"""
+    if isinstance(embedding, RotationSystem):
+        return embedding
+    if isinstance(embedding, nx.PlanarEmbedding):
+        embedding = embedding.get_data()
+    return rotation_system_from_dict(embedding)
+
+
+def _triangulate(rotation_system, fully_triangulate):
+    """Triangulate a rotation system
+
+    Returns
+    -------
+    triangulation : RotationSystem
+    outer_face : list of vertices
+    added : list of vertex pairs
+    """
+    state = _HalfEdges(rotation_system)
+    n = len(rotation_system)
+    state.connect_components()
+    if n < 3:
+        outer_face = list(range(n))
+        return state.rotation_system(), outer_face, state.added
+    state.biconnect(_edge_blocks(rotation_system))
+    outer = state.triangulate(fully_triangulate)
+    outer_face = []
+    h = outer
+    while True:
+        outer_face.append(state.target[h ^ 1])
+        h = state.ccw[h ^ 1]
+        if h == outer:
+            break
+    return state.rotation_system(), outer_face, state.added
+
+
+def _edge_blocks(rotation_system):
+    """Return the block of every edge 0, ..., m-1 and the number of blocks
+
+    The edge k has the half-edges 2k and 2k + 1 of :class:`_HalfEdges`.
+    """
+    twin = rotation_system.twin
+    adj_edges = array('i', [NONE]) * len(twin)
+    k = 0
+    for i, j in enumerate(twin):
+        if i < j:
+            adj_edges[i] = adj_edges[j] = k
+            k += 1
+    planarity_state = LRPlanarity.from_csr(
+        rotation_system.offsets, rotation_system.targets, adj_edges)
+    return planarity_state.get_dfs_index().edge_blocks()
+
+
+class _HalfEdges(object):
+    """A mutable embedding with the rotations as doubly linked lists"""
+
+    def __init__(self, rotation_system):
+        offsets, targets, twin = (rotation_system.offsets,
+                                  rotation_system.targets,
+                                  rotation_system.twin)
+        n = len(rotation_system)
+        self.n = n
+        # the half-edge ids: i < twin[i] gets 2k for the k-th such i
+        half = array('i', [NONE]) * len(targets)
+        k = 0
+        for i, j in enumerate(twin):
+            if i < j:
+                half[i] = 2 * k
+                half[j] = 2 * k + 1
+                k += 1
+        self.target = array('i', [NONE]) * len(targets)
+        self.cw = array('i', [NONE]) * len(targets)
+        self.ccw = array('i', [NONE]) * len(targets)
+        self.first = array('i', [NONE]) * n
+        for v in range(n):
+            start, end = offsets[v], offsets[v + 1]
+            if start == end:
+                continue
+            self.first[v] = half[start]
+            for i in range(start, end):
+                h = half[i]
+                self.target[h] = targets[i]
+                self.cw[h] = half[i + 1 if i + 1 < end else start]
+                self.ccw[h] = half[i - 1 if i > start else end - 1]
+        self.nodes = rotation_system.nodes
+        self.added = []
+
+    def new_edge(self, u, w):
+        """Append the edge (u, w) without placing it, return the half-edge
+        from u to w"""
+        h = len(self.target)
+        self.target.extend((w, u))
+        self.cw.extend((NONE, NONE))
+        self.ccw.extend((NONE, NONE))
+        self.added.append((u, w))
+        return h
+
+    def insert_after(self, v, g, h):
+        """Put the half-edge h from v right after g in clockwise order, g is
+        NONE if v has no edges yet"""
+        if g == NONE:
+            self.first[v] = h
+            self.cw[h] = self.ccw[h] = h
+            return
+        cw = self.cw
+        self.ccw[h] = g
+        cw[h] = cw[g]
+        self.ccw[cw[g]] = h
+        cw[g] = h
+
+    def add_chord(self, p, r):
+        """Add an edge through the face of p and r from the end of p to
+        the end of r, return the new half-edge
+
+        On the face the new half-edge follows p and is followed by the
+        half-edge that followed r before.
+        """
+        ccw, target = self.ccw, self.target
+        a, c = target[p], target[r]
+        q = ccw[p ^ 1]
+        s = ccw[r ^ 1]
+        h = self.new_edge(a, c)
+        self.insert_after(a, q, h)
+        self.insert_after(c, s, h ^ 1)
+        return h
+
+    def connect_components(self):
+        """Join the connected components by a path of new edges"""
+        target, cw, first = self.target, self.cw, self.first
+        visited = bytearray(self.n)
+        previous = NONE
+        for r in range(self.n):
+            if visited[r]:
+                continue
+            visited[r] = 1
+            stack = [r]
+            while stack:
+                v = stack.pop()
+                h = first[v]
+                if h == NONE:
+                    continue
+                while True:
+                    w = target[h]
+                    if not visited[w]:
+                        visited[w] = 1
+                        stack.append(w)
+                    h = cw[h]
+                    if h == first[v]:
+                        break
+            if previous != NONE:
+                g, k = first[previous], first[r]
+                h = self.new_edge(previous, r)
+                self.insert_after(previous, g, h)
+                self.insert_after(r, k, h ^ 1)
+            previous = r
+
+    def biconnect(self, blocks):
+        """Join the blocks at every cut vertex
+
+        The new edges between components belong to blocks of their own.
+        """
+        edge_block, num_blocks = blocks
+        target, cw, first = self.target, self.cw, self.first
+        block = array('i', edge_block)
+        extra = len(target) // 2 - len(edge_block)
+        block.extend(range(num_blocks, num_blocks + extra))
+        num_blocks += extra
+        leader = array('i', range(num_blocks))
+
+        def find(b):
+            while leader[b] != b:
+                leader[b] = leader[leader[b]]
+                b = leader[b]
+            return b
+
+        for v in range(self.n):
+            g = first[v]
+            while True:
+                # g = (v, w) is followed by h = (v, u) in clockwise order
+                h = cw[g]
+                a, b = find(block[g >> 1]), find(block[h >> 1])
+                if a != b:
+                    # the new edge (u, w) closes the triangle u, v, w
+                    self.add_chord(cw[h ^ 1] ^ 1, g)
+                    block.append(a)
+                    leader[b] = a
+                g = h
+                if g == first[v]:
+                    break
+
+    def triangulate(self, fully_triangulate):
+        """Triangulate the faces, return a half-edge of the outer face"""
+        target, cw, ccw = self.target, self.cw, self.ccw
+
+        # the largest face becomes the outer face
+        visited = bytearray(len(target))
+        outer, outer_size = NONE, 0
+        for start in range(len(target)):
+            if visited[start]:
+                continue
+            size = 0
+            h = start
+            while not visited[h]:
+                visited[h] = 1
+                size += 1
+                h = ccw[h ^ 1]
+            if size > outer_size:
+                outer, outer_size = start, size
+
+        edges = set()
+        n = self.n
+        for h in range(0, len(target), 2):
+            u, w = target[h ^ 1], target[h]
+            edges.add(u * n + w if u < w else w * n + u)
+
+        visited = bytearray(len(target))
+        for start in range(len(visited)):
+            if visited[start]:
+                continue
+            h = start
+            while not visited[h]:
+                visited[h] = 1
+                h = ccw[h ^ 1]
+            if start == outer and not fully_triangulate:
+                continue
+            # the face v1, v2, v3, v4, ... with h1 = (v1, v2),
+            # h2 = (v2, v3), h3 = (v3, v4) and p before h1
+            p = cw[start] ^ 1
+            h1 = start
+            h2 = ccw[h1 ^ 1]
+            h3 = ccw[h2 ^ 1]
+            while target[h3] != target[h1 ^ 1]:
+                v1, v3 = target[p], target[h2]
+                key = v1 * n + v3 if v1 < v3 else v3 * n + v1
+                if key in edges:
+                    p, h1, h2 = h1, h2, h3
+                else:
+                    edges.add(key)
+                    h1 = self.add_chord(p, h2)
+                    visited.extend(b'\x01\x01')
+                    h2 = h3
+                h3 = ccw[h2 ^ 1]
+
+        if fully_triangulate:
+            outer = 0
+        return outer
+
+    def rotation_system(self):
+        """Return the embedding as RotationSystem"""
+        target, cw, first = self.target, self.cw, self.first
+        n = self.n
+        position = array('i', [NONE]) * len(target)
+        offsets = array('i', [0]) * (n + 1)
+        targets = array('i', [NONE]) * len(target)
+        i = 0
+        for v in range(n):
+            h = first[v]
+            if h != NONE:
+                while True:
+                    position[h] = i
+                    targets[i] = target[h]
+                    i += 1
+                    h = cw[h]
+                    if h == first[v]:
+                        break
+            offsets[v + 1] = i
+        twin = array('i', [NONE]) * len(target)
+        for h in range(len(target)):
+            twin[position[h]] = position[h ^ 1]
+        return RotationSystem(self.nodes, offsets, targets, twin)
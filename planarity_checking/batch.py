@@ -0,0 +1,122 @@
+"""Planarity checks of many graphs in worker processes
+
+Graphs are sent to the workers as edge arrays instead of pickled NetworkX
+graphs: a list of node labels and two ``array('i')`` vectors with the
+endpoints of the edges (as indices into the node list). The workers build
+the CSR adjacency from these arrays directly, see
+:meth:`LRPlanarity.from_csr`.
+"""
+from array import array
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+import os
+
+from planarity_checking.kuratowski import kuratowski_graph
+from planarity_checking.lr_planarity import LRPlanarity, csr_from_edges
+
+
+def check_planarity_many(graphs, counterexample=False, workers=None,
+                         chunksize=16):
+    """Checks the planarity of many graphs in parallel
+
+    Parameters
+    ----------
+    graphs : iterable of NetworkX graphs
+    counterexample : bool
+        A Kuratowski subgraph is returned for non planar graphs if set to
+        true, see :func:`check_planarity`.
+    workers : int, optional
+        Number of worker processes, default is the number of CPUs. With a
+        single worker the graphs are checked in this process.
+    chunksize : int
+        Number of graphs sent to a worker at once. Larger chunks reduce the
+        communication overhead for many small graphs.
+
+    Returns
+    -------
+    results : iterator
+        Yields the result ``(is_planar, certificate)`` of
+        :func:`check_planarity` for every graph, in the order of the input.
+        Results are produced as soon as they are available, so the input
+        can be an arbitrary long stream of graphs.
+
+    Notes
+    -----
+    The input is read in chunks, and at most 2 * workers chunks are
+    submitted to the pool at a time. A further chunk is only read when the
+    results of the oldest one are collected, so the memory does not grow
+    with the length of the input.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tasks = ((graph_to_edge_arrays(G), counterexample) for G in graphs)
+
+    if workers == 1:
+        for task in tasks:
+            yield _check_edge_arrays(task)
+        return
+
+    chunks = iter(lambda: list(islice(tasks, chunksize)), [])
+    with Pool(workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.map_async(_check_edge_arrays, chunk,
+                                          len(chunk)))
+            if len(pending) == 2 * workers:
+                for result in pending.popleft().get():
+                    yield result
+        while pending:
+            for result in pending.popleft().get():
+                yield result
+
+
+def graph_to_edge_arrays(G):
+    """Returns a compact edge array representation of G
+
+    Self-loops are left out and multiple edges are merged.
+
+    Returns
+    -------
+    nodes : list
+        The node labels of G
+    sources, targets : array('i')
+        The endpoints of the edges as indices into nodes
+    """
+    if G.is_directed():
+        G = G.to_undirected(as_view=True)
+    nodes = list(G)
+    index = {v: i for i, v in enumerate(nodes)}
+    sources = array('i')
+    targets = array('i')
+    for i, v in enumerate(nodes):
+        for w in G.adj[v]:
+            j = index[w]
+            if j > i:
+                sources.append(i)
+                targets.append(j)
+    return nodes, sources, targets
+
+
+def check_planarity_edge_arrays(nodes, sources, targets,
+                                counterexample=False):
+    """Checks the planarity of a graph given by edge arrays
+
+    See :func:`graph_to_edge_arrays` for the format and
+    :func:`check_planarity` for the result.
+    """
+    planarity_state = LRPlanarity.from_csr(
+        *csr_from_edges(len(nodes), sources, targets), nodes=nodes)
+    embedding = planarity_state.lr_planarity()
+    if embedding is not None:
+        return True, embedding
+    if counterexample:
+        return False, kuratowski_graph(planarity_state)
+    return False, None
+
+
+def _check_edge_arrays(task):
+    """Worker function for :func:`check_planarity_many`"""
+    (nodes, sources, targets), counterexample = task
+    return check_planarity_edge_arrays(nodes, sources, targets,
+                                       counterexample)
@@ -1,8 +1,11 @@
-import networkx as nx
-import urllib
+import urllib.request
 import tarfile
 import os, sys
 from timeit import default_timer as timer
+from planarity_checking.loader import read_csr
+from planarity_checking.lr_planarity import LRPlanarity
+from planarity_checking.stats import PlanarityStats
+from planarity_checking.verify import check_rotation_system
 
 links = [
     ('https://users.dcc.uchile.cl/~jfuentess/datasets/files/g/planar1M.tar.gz', 'planar_embedding1000000.pg'),
@@ -25,7 +28,7 @@ time_start = timer()
 
 if not os.path.isfile(graph_file):
     if not os.path.isfile(graph_tar):
-        urllib.urlretrieve(graph_link, graph_tar)
+        urllib.request.urlretrieve(graph_link, graph_tar)
     tar = tarfile.open(graph_tar)
     tar.extractall()
     tar.close()
@@ -34,21 +37,24 @@ if not os.path.isfile(graph_file):
 time_download_finished = timer()
 print("Download time: {}".format(time_download_finished - time_start))
 
-G = nx.read_edgelist(graph_file)
+nodes, adj_offsets, adj_targets, adj_edges = read_csr(graph_file)
 
 time_graph_import_finished = timer()
 print("Graph successfully loaded. Graph import time: {}".format(time_graph_import_finished- time_download_finished))
 
-res, embedding = nx.check_planarity(G)
+stats = PlanarityStats()
+planarity_state = LRPlanarity.from_csr(adj_offsets, adj_targets, adj_edges, nodes, stats=stats)
+rotation_system = planarity_state.lr_planarity(compact=True)
 
 time_planarity_check_finished = timer()
 print("Planarity check time: {}".format(time_planarity_check_finished - time_graph_import_finished))
+print("Planarity check phases: {}".format(stats.to_json()))
 
-if not res:
+if rotation_system is None:
     print("The check returned 'non planar'.")
     exit()
 
-embedding.check_structure()
+check_rotation_system(rotation_system, adj_offsets, adj_targets)
 
 time_structure_check_finished = timer()
 print("Everything is correct. Structure check time: {}".format(time_structure_check_finished - time_planarity_check_finished))
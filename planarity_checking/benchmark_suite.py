@@ -0,0 +1,209 @@
+"""Offline benchmark suite of the LR planarity test
+
+The graphs are generated locally by :mod:`planarity_checking.generators`
+and the phases of the test are timed with :class:`PlanarityStats`. The
+results can be stored as JSON and compared with a baseline, cases that got
+slower or need more memory than the tolerance allows are reported as
+regressions::
+
+    python -m planarity_checking.benchmark_suite --sizes 1000 100000 \\
+        --baseline planarity_checking/benchmark_baseline.json
+
+The stored baseline covers the sizes 10^3 to 10^5. Timings depend on the
+machine, so the baseline should be written with --save-baseline on the
+machine that runs the comparisons.
+
+The graphs are passed to :meth:`LRPlanarity.from_csr` as edge arrays,
+since graphs with millions of nodes do not fit into memory as NetworkX
+graphs. The copy phase contains the construction of the CSR arrays.
+"""
+import argparse
+import json
+import platform
+import sys
+
+from planarity_checking import generators
+from planarity_checking.lr_planarity import LRPlanarity, csr_from_edges
+from planarity_checking.stats import PlanarityStats
+
+FAMILIES = {
+    'grid': generators.grid_edges,
+    'triangulation': lambda n: generators.triangulation_edges(n, seed=0),
+    'apollonian': lambda n: generators.apollonian_edges(n, seed=0),
+    'heavy_wheel': generators.heavy_wheel_edges,
+    'planted_k5': lambda n: generators.planted_kuratowski_edges(n, 'K5'),
+    'planted_k33': lambda n: generators.planted_kuratowski_edges(n, 'K3,3'),
+}
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+
+# phases faster than this (in seconds) are not compared with the baseline
+MIN_TIME = 0.01
+
+
+def run_case(family, size, repeat=1, trace_memory=True):
+    """Run the planarity test on one generated graph
+
+    Parameters
+    ----------
+    family : str
+        A key of FAMILIES
+    size : int
+        The approximate number of nodes
+    repeat : int
+        The test is run this often, the minimum time of every phase is
+        recorded
+    trace_memory : bool
+        If set, the test is run once more with memory tracing to record the
+        peak memory of every phase
+
+    Returns
+    -------
+    result : dict
+        The number of nodes 'n' and edges 'm', whether the graph is
+        'planar', the 'phases' with their 'time' and 'peak_memory', the
+        'total_time', the overall 'peak_memory' and the 'counters'
+    """
+    n, sources, targets = FAMILIES[family](size)
+    result = {'n': n, 'm': len(sources), 'phases': {}}
+    for i in range(repeat + trace_memory):
+        traced = i == repeat
+        stats = PlanarityStats(trace_memory=traced)
+        with stats.phase('copy'):
+            csr = csr_from_edges(n, sources, targets)
+        planarity_state = LRPlanarity.from_csr(*csr, stats=stats)
+        result['planar'] = planarity_state.lr_planarity() is not None
+        planarity_state = csr = None
+        for name, record in stats.phases.items():
+            phase = result['phases'].setdefault(name, {})
+            if traced:
+                phase['peak_memory'] = record['peak_memory']
+            else:
+                phase['time'] = min(phase.get('time', record['time']),
+                                    record['time'])
+        if not traced:
+            result['counters'] = stats.counters
+    result['total_time'] = sum(phase['time']
+                               for phase in result['phases'].values())
+    if trace_memory:
+        result['peak_memory'] = max(phase['peak_memory']
+                                    for phase in result['phases'].values())
+    return result
+
+
+def run_suite(families=None, sizes=None, repeat=1, trace_memory=True,
+              log=None):
+    """Run all benchmark cases
+
+    Returns
+    -------
+    results : dict
+        The platform and a dict of 'cases' with keys 'family/size', see
+        :func:`run_case`
+    """
+    if families is None:
+        families = list(FAMILIES)
+    if sizes is None:
+        sizes = SIZES
+    results = {'python': platform.python_version(),
+               'machine': platform.machine(),
+               'cases': {}}
+    for family in families:
+        for size in sizes:
+            key = '{}/{}'.format(family, size)
+            result = run_case(family, size, repeat, trace_memory)
+            results['cases'][key] = result
+            if log is not None:
+                log('{:24} n={:<9} m={:<9} time={:.3f}s'.format(
+                    key, result['n'], result['m'], result['total_time']))
+    return results
+
+
+def compare(results, baseline, tolerance=0.25, memory_tolerance=0.1):
+    """Compare benchmark results with a baseline
+
+    Only cases and phases contained in both are compared. A case is a
+    regression if the planarity result differs, if the total time or the
+    time of a phase (taking at least MIN_TIME) grew by more than the
+    tolerance, or if the peak memory grew by more than the memory
+    tolerance.
+
+    Returns
+    -------
+    regressions : list of str
+        A description of every regression
+    """
+    regressions = []
+    for key, result in results['cases'].items():
+        base = baseline['cases'].get(key)
+        if base is None:
+            continue
+        if result['planar'] != base['planar']:
+            regressions.append('{}: planar is {}, baseline {}'.format(
+                key, result['planar'], base['planar']))
+        times = [('total', result['total_time'], base['total_time'])]
+        for name, phase in sorted(result['phases'].items()):
+            base_phase = base['phases'].get(name, {})
+            if 'time' in phase and 'time' in base_phase:
+                times.append((name, phase['time'], base_phase['time']))
+        for name, time, base_time in times:
+            if (max(time, base_time) >= MIN_TIME and
+                    time > base_time * (1 + tolerance)):
+                regressions.append(
+                    '{}: {} time {:.3f}s, baseline {:.3f}s'.format(
+                        key, name, time, base_time))
+        if 'peak_memory' in result and 'peak_memory' in base and \
+                result['peak_memory'] > \
+                base['peak_memory'] * (1 + memory_tolerance):
+            regressions.append(
+                '{}: peak memory {} bytes, baseline {} bytes'.format(
+                    key, result['peak_memory'], base['peak_memory']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--families', nargs='+', choices=sorted(FAMILIES),
+                        help='graph families, default all')
+    parser.add_argument('--sizes', nargs='+', type=int,
+                        help='approximate numbers of nodes, default '
+                             '10^3 to 10^7')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='runs per case, the fastest is recorded')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='do not trace the peak memory')
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument('--baseline', help='compare with this result file')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write the results to the baseline file '
+                             'instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative increase of the times')
+    parser.add_argument('--memory-tolerance', type=float, default=0.1,
+                        help='allowed relative increase of the peak memory')
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.families, args.sizes, args.repeat,
+                        not args.no_memory, log=print)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+    if args.baseline is None:
+        return 0
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance,
+                          args.memory_tolerance)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    if not regressions:
+        print('No regressions')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
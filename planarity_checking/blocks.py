@@ -0,0 +1,131 @@
+"""Planarity check by splitting the graph into its biconnected components
+
+A graph is planar if and only if all of its biconnected components (blocks)
+are planar. Planar embeddings of the blocks are merged into an embedding of
+the whole graph by concatenating the rotations of the blocks at every cut
+vertex: each block is then drawn inside one face of the blocks before it.
+"""
+from array import array
+from multiprocessing import Pool
+
+from planarity_checking.batch import check_planarity_edge_arrays
+from planarity_checking.lr_planarity import LRPlanarity, NONE
+
+
+def check_planarity_blocks(G, counterexample=False, workers=1,
+                           parallel_block_size=100000):
+    """Checks planarity by testing the biconnected components separately
+
+    The blocks are computed from the lowpoints of the LR orientation (see
+    :meth:`LRPlanarity.biconnected_blocks`), then every block is tested and
+    embedded on its own and the block embeddings are merged at the cut
+    vertices.
+
+    Parameters
+    ----------
+    G : NetworkX graph
+    counterexample : bool
+        A Kuratowski subgraph is returned for non planar graphs if set to
+        true. It is extracted from a non planar block only.
+    workers : int
+        Number of worker processes for large blocks. With a single worker
+        all blocks are tested in this process.
+    parallel_block_size : int
+        Blocks with at least this many edges are sent to the workers, the
+        smaller ones are tested in this process.
+
+    Returns
+    -------
+    is_planar, certificate :
+        See :func:`check_planarity`.
+
+    Notes
+    -----
+    Before any block is tested, all blocks are checked against the bound
+    m <= 3n - 6 on their number of edges, so a dense non planar block
+    fails without testing the others first. The remaining blocks are tested
+    in order of their size, smallest first; the check stops at the first non
+    planar block.
+    """
+    planarity_state = LRPlanarity(G)
+    planarity_state.lr_orientation()
+    edge_block, num_blocks = planarity_state.biconnected_blocks()
+    nodes = planarity_state.nodes
+
+    # edges of the blocks in CSR form
+    block_offsets = array('i', [0]) * (num_blocks + 1)
+    for b in edge_block:
+        block_offsets[b + 1] += 1
+    for b in range(num_blocks):
+        block_offsets[b + 1] += block_offsets[b]
+    block_edges = array('i', [NONE]) * planarity_state.m
+    pos = block_offsets[:-1]
+    for e, b in enumerate(edge_block):
+        block_edges[pos[b]] = e
+        pos[b] += 1
+
+    # relabel the vertices of every block
+    tasks = []
+    for b in range(num_blocks):
+        index = {}
+        sources = array('i')
+        targets = array('i')
+        for i in range(block_offsets[b], block_offsets[b + 1]):
+            e = block_edges[i]
+            sources.append(index.setdefault(
+                planarity_state.edge_source[e], len(index)))
+            targets.append(index.setdefault(
+                planarity_state.edge_target[e], len(index)))
+        block_nodes = [nodes[v] for v in index]
+        tasks.append((block_nodes, sources, targets))
+    planarity_state = None
+
+    # fail fast on dense blocks
+    for block_nodes, sources, targets in tasks:
+        if len(block_nodes) > 2 and len(sources) > 3 * len(block_nodes) - 6:
+            if counterexample:
+                return check_planarity_edge_arrays(
+                    block_nodes, sources, targets, True)
+            return False, None
+
+    tasks.sort(key=lambda task: len(task[1]))
+    large = [task for task in tasks if len(task[1]) >= parallel_block_size]
+    if workers == 1 or len(large) < 2:
+        large = []
+    small = tasks[:len(tasks) - len(large)]
+
+    embedding = {v: [] for v in nodes}
+    if large:
+        with Pool(workers) as pool:
+            results = pool.imap(
+                _check_block, [(task, counterexample) for task in large])
+            for task in small:
+                result = _check_block((task, counterexample))
+                if not result[0]:
+                    return result
+                _merge_block_embedding(embedding, result[1])
+            for result in results:
+                if not result[0]:
+                    return result
+                _merge_block_embedding(embedding, result[1])
+    else:
+        for task in small:
+            result = _check_block((task, counterexample))
+            if not result[0]:
+                return result
+            _merge_block_embedding(embedding, result[1])
+
+    return True, embedding
+
+
+def _check_block(task):
+    """Worker function for :func:`check_planarity_blocks`"""
+    (block_nodes, sources, targets), counterexample = task
+    return check_planarity_edge_arrays(block_nodes, sources, targets,
+                                       counterexample)
+
+
+def _merge_block_embedding(embedding, block_embedding):
+    """Append the rotations of a block to the rotations of the graph"""
+    for v, nbrs in block_embedding.items():
+        embedding[v].extend(nbrs)
@@ -0,0 +1,164 @@
+"""Cache of planarity results keyed by the edge set of a graph
+
+:class:`PlanarityCache` answers :func:`check_planarity` queries for graphs
+it has seen before without running the test again. The results are kept
+in a bounded in-memory LRU cache and optionally in a directory shared by
+several processes.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+
+from planarity_checking import lr_planarity
+from planarity_checking.lr_planarity import RotationSystem
+
+
+def graph_key(G):
+    """Return a hash of the nodes and edges of G as hex string
+
+    Self-loops, multiple edges and edge directions are ignored, like in
+    :func:`check_planarity`. The nodes are identified by their repr(), so
+    graphs whose node labels have a stable repr get the same key in every
+    process, regardless of the order in which nodes and edges were added.
+    """
+    if G.is_directed():
+        G = G.to_undirected(as_view=True)
+    label = {v: repr(v) for v in G}
+    edges = set()
+    for u, v in G.edges():
+        if u != v:
+            a, b = label[u], label[v]
+            edges.add((a, b) if a < b else (b, a))
+    data = repr((sorted(label.values()), sorted(edges)))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class PlanarityCache(object):
+    """Cache in front of :func:`check_planarity`
+
+    A result is stored as the planarity, the embedding as
+    :class:`RotationSystem` for planar graphs and, once it was requested,
+    the Kuratowski subgraph for non planar graphs. Callers get copies, so
+    they may modify the returned certificates.
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of results kept in memory, the least recently used
+        ones are dropped first
+    path : str, optional
+        A directory where all results are stored in addition. Every result
+        is one file, written to a temporary file first and then renamed, so
+        several processes can share the directory. The files are pickles,
+        so the directory must be trusted.
+
+    Attributes
+    ----------
+    hits : int
+        Number of queries answered from the cache, including disk_hits
+    disk_hits : int
+        Number of queries answered from the directory
+    misses : int
+        Number of queries that ran the planarity test, including those
+        whose entry was found but lacked the requested counterexample
+    """
+    def __init__(self, maxsize=1024, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def check_planarity(self, G, counterexample=False, compact=False):
+        """Checks planarity of G, see :func:`check_planarity`
+
+        Returns
+        -------
+        is_planar, certificate :
+            As returned by :func:`check_planarity` with the same arguments
+        """
+        key = graph_key(G)
+        entry, on_disk = self._lookup(key)
+        if entry is not None and (entry[0] or entry[1] is not None or
+                                  not counterexample):
+            self.hits += 1
+            self.disk_hits += on_disk
+        else:
+            # includes entries without the requested counterexample, also
+            # when they were found in the directory
+            self.misses += 1
+            is_planar, certificate = lr_planarity.check_planarity(
+                G, counterexample, compact=True)
+            entry = (is_planar, certificate)
+            self.put(key, entry)
+
+        is_planar, certificate = entry
+        if is_planar:
+            if compact:
+                return True, RotationSystem(
+                    list(certificate.nodes), certificate.offsets[:],
+                    certificate.targets[:], certificate.twin[:])
+            return True, certificate.to_dict()
+        if counterexample:
+            return False, certificate.copy()
+        return False, None
+
+    def get(self, key):
+        """Return the stored entry for a key or None"""
+        return self._lookup(key)[0]
+
+    def _lookup(self, key):
+        """Return the stored entry for a key or None, and whether it was
+        read from the directory"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry, False
+        if self.path is None:
+            return None, False
+        try:
+            with open(self._file(key), 'rb') as f:
+                entry = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None, False
+        self._remember(key, entry)
+        return entry, True
+
+    def put(self, key, entry):
+        """Store an entry (is_planar, certificate) for a key"""
+        self._remember(key, entry)
+        if self.path is None:
+            return
+        fd, temp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp, self._file(key))
+        except BaseException:
+            os.unlink(temp)
+            raise
+
+    def clear(self):
+        """Remove all entries from memory, the directory is kept"""
+        self.entries.clear()
+
+    def info(self):
+        """Return the counters and the number of entries in memory"""
+        return {'hits': self.hits, 'disk_hits': self.disk_hits,
+                'misses': self.misses, 'maxsize': self.maxsize,
+                'size': len(self.entries)}
+
+    def _remember(self, key, entry):
+        """Put an entry into the in-memory LRU cache"""
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def _file(self, key):
+        return os.path.join(self.path, key + '.pickle')
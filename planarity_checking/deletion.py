@@ -0,0 +1,172 @@
+"""Planarity of a graph after deleting one of its edges, for many edges
+
+If G is planar, every G - e is planar. Otherwise G - e is planar only if e
+lies on every Kuratowski subgraph of G. So a single Kuratowski subgraph K
+already answers all edges outside of K, only the edges of K need to be
+tested.
+"""
+from array import array
+
+import networkx as nx
+
+from planarity_checking.kuratowski import edge_chains, kuratowski_edges
+from planarity_checking.lr_planarity import LRPlanarity, csr_from_edges
+
+
+def check_planarity_deletions(G, edges):
+    """Checks for every given edge whether G without this edge is planar
+
+    Parameters
+    ----------
+    G : NetworkX graph
+    edges : iterable of edges
+        The edges of G to delete, one at a time. Parallel edges count as
+        one edge, like in :func:`check_planarity`.
+
+    Returns
+    -------
+    planar : list of bool
+        planar[i] is True if G without the i-th edge is planar
+
+    Raises
+    ------
+    NetworkXError
+        If an edge is not in G
+
+    Notes
+    -----
+    The queries share the work on G:
+
+    - All answers are False if G - e has more than 3n - 6 edges.
+    - G is split into its biconnected components (blocks) with one LR
+      orientation, and the blocks are tested. If all are planar, all
+      answers are True, if two are not planar, all answers are False.
+    - A Kuratowski subgraph K of the non planar block B is extracted from
+      the failed test of B (see :func:`kuratowski_edges`). Deleting an
+      edge outside of K leaves K intact, so the answer is False.
+    - The edges of a path of degree two vertices in B (a chain) all have
+      the same answer, so they are handled as one unit.
+    - If B without the edges of several units is still not planar, all of
+      these units are answered False by this one test. Otherwise the units
+      are split into two halves of every other unit, which are tested
+      again.
+    - Deleting back edges of the DFS tree of B keeps the tree, so these
+      tests reuse the orientation of B and recompute only the lowpoints
+      on the tree paths below the deleted edges (see
+      :meth:`LRPlanarity.without_back_edges`). Units with tree edges are
+      tested after the others and need a new orientation.
+
+    Since usually only a few edges lie on every Kuratowski subgraph, most
+    units are answered in large groups. For k candidate units and t True
+    answers about O(t log k) tests on B are needed instead of k.
+    """
+    planarity_state = LRPlanarity(G)
+    index = {v: i for i, v in enumerate(planarity_state.nodes)}
+    queries = []
+    for e in edges:
+        u, v = e[0], e[1]
+        if not G.has_edge(u, v):
+            raise nx.NetworkXError(
+                "The edge {}-{} is not in the graph.".format(u, v))
+        i, j = index[u], index[v]
+        queries.append((i, j) if i < j else (j, i))
+
+    n, m = planarity_state.n, planarity_state.m
+    if n > 2 and m - 1 > 3 * n - 6:
+        return [False] * len(queries)
+
+    planarity_state.lr_orientation()
+    edge_block, num_blocks = planarity_state.biconnected_blocks()
+    blocks = [[] for _ in range(num_blocks)]
+    for e, b in enumerate(edge_block):
+        blocks[b].append(e)
+
+    nonplanar = None
+    for block in sorted(blocks, key=len):
+        block_state = _subgraph_state(planarity_state, block)
+        if not block_state.lr_testing():
+            if nonplanar is not None:
+                return [False] * len(queries)
+            nonplanar = block_state
+    if nonplanar is None:
+        return [True] * len(queries)
+
+    # the vertices of the block state are labeled by the vertices of G
+    block_state = nonplanar
+    nodes = block_state.nodes
+    edge_source, edge_target = block_state.edge_source, \
+        block_state.edge_target
+    edge_id = {}
+    for e in range(block_state.m):
+        i, j = nodes[edge_source[e]], nodes[edge_target[e]]
+        edge_id[(i, j) if i < j else (j, i)] = e
+    candidates = set(kuratowski_edges(block_state))
+    candidates.intersection_update(edge_id.get(e) for e in queries)
+
+    # group the candidates by chains, units without tree edges first
+    units = []
+    for _, _, chain in edge_chains(edge_source, edge_target,
+                                   range(block_state.m)):
+        unit = [e for e in chain if e in candidates]
+        if unit:
+            units.append(unit)
+    parent_edge = block_state.parent_edge
+    units.sort(key=lambda unit: any(parent_edge[edge_target[e]] == e
+                                    for e in unit))
+    planar = _planar_deletions(block_state, units)
+    return [edge_id.get(e) in planar for e in queries]
+
+
+def _subgraph_state(planarity_state, edges):
+    """Return the planarity state of the subgraph formed by some edges
+
+    The vertices are relabeled, the node labels of the new state are the
+    vertices of the given state.
+    """
+    edge_source = planarity_state.edge_source
+    edge_target = planarity_state.edge_target
+    index = {}
+    sources = array('i')
+    targets = array('i')
+    for e in edges:
+        sources.append(index.setdefault(edge_source[e], len(index)))
+        targets.append(index.setdefault(edge_target[e], len(index)))
+    return LRPlanarity.from_csr(*csr_from_edges(len(index), sources,
+                                                targets), nodes=list(index))
+
+
+def _planar_deletions(block_state, units):
+    """Find the units whose edges can be deleted to make the block planar
+
+    A group of units is tested by deleting all of their edges at once. If
+    the block stays non planar, no unit of the group makes it planar.
+    Otherwise the group is split by taking every other unit, a group of
+    units spread over the block is more likely to leave a Kuratowski
+    subgraph intact than a contiguous one.
+
+    Returns
+    -------
+    planar : set
+        The edges of the units whose deletion makes the block planar
+    """
+    edge_target, parent_edge = block_state.edge_target, \
+        block_state.parent_edge
+    planar = set()
+    groups = [units]
+    while groups:
+        group = groups.pop()
+        removed = set(e for unit in group for e in unit)
+        if any(parent_edge[edge_target[e]] == e for e in removed):
+            # a new orientation is needed
+            planarity_state = _subgraph_state(
+                block_state,
+                [e for e in range(block_state.m) if e not in removed])
+        else:
+            planarity_state = block_state.without_back_edges(removed)
+        if planarity_state.lr_testing():
+            if len(group) == 1:
+                planar.update(removed)
+            else:
+                groups.append(group[1::2])
+                groups.append(group[::2])
+    return planar
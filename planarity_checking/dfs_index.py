@@ -0,0 +1,160 @@
+"""The DFS tree of the LR orientation and what follows from it
+
+:class:`DFSIndex` holds the arrays of the orientation phase of
+:class:`LRPlanarity`. Blocks, cut vertices and bridges are read off these
+arrays without another traversal of the graph.
+"""
+from array import array
+
+from planarity_checking.lr_planarity import NONE
+
+
+class DFSIndex(object):
+    """The DFS tree computed by the orientation phase of the LR test
+
+    The vertices are 0, ..., n-1 and ``nodes[v]`` is the label of v, the
+    edges have the ids 0, ..., m-1 of :class:`LRPlanarity`. Every edge e
+    is oriented from ``edge_source[e]`` to ``edge_target[e]``: tree edges
+    point away from the roots, back edges (return edges) point to an
+    ancestor. ``parent_edge[v]`` is the tree edge to v (NONE for the roots
+    of the DFS trees), ``height[v]`` the depth of v in its tree and
+    ``lowpt[e]``, ``lowpt2[e]`` are the lowest and second lowest height
+    reached by a return edge from the subtree of e, at most the height of
+    the source of e.
+
+    Blocks, cut vertices and bridges are derived from these arrays in
+    O(n + m) time without another traversal of the graph.
+    """
+    def __init__(self, nodes, roots, height, parent_edge, edge_source,
+                 edge_target, lowpt, lowpt2):
+        self.nodes = nodes
+        self.roots = roots
+        self.height = height
+        self.parent_edge = parent_edge
+        self.edge_source = edge_source
+        self.edge_target = edge_target
+        self.lowpt = lowpt
+        self.lowpt2 = lowpt2
+
+    def __len__(self):
+        return len(self.height)
+
+    def number_of_edges(self):
+        """Return the number of (undirected) edges"""
+        return len(self.edge_source)
+
+    def is_tree_edge(self, e):
+        """Return True if the edge e belongs to the DFS tree"""
+        return self.parent_edge[self.edge_target[e]] == e
+
+    def vertices_by_height(self):
+        """Return an array of the vertices ordered by increasing height
+
+        The order is found by a bucket sort in O(n) time.
+        """
+        height = self.height
+        n = len(height)
+        height_offsets = array('i', [0]) * (n + 1)
+        for v in range(n):
+            height_offsets[height[v] + 1] += 1
+        for h in range(n):
+            height_offsets[h + 1] += height_offsets[h]
+        by_height = array('i', [NONE]) * n
+        for v in range(n):
+            by_height[height_offsets[height[v]]] = v
+            height_offsets[height[v]] += 1
+        return by_height
+
+    def edge_blocks(self):
+        """Assign the edges to the biconnected components (blocks)
+
+        A tree edge (u, w) starts a new block if no return edge of its
+        subtree ends above u, i.e. if lowpt[(u, w)] >= height[u]; otherwise
+        it belongs to the block of the parent edge of u. A back edge (v, x)
+        closes a cycle with the tree path from x to v and belongs to the
+        block of the parent edge of v. The vertices are handled in order of
+        their height, so the block of a parent edge is always known.
+
+        Returns
+        -------
+        edge_block : array
+            The block id of every edge
+        num_blocks : int
+            The number of blocks
+        """
+        m = len(self.edge_source)
+        edge_block = array('i', [NONE]) * m
+        num_blocks = 0
+
+        for w in self.vertices_by_height():
+            e = self.parent_edge[w]
+            if e == NONE:
+                continue
+            u = self.edge_source[e]
+            if self.lowpt[e] >= self.height[u]:
+                edge_block[e] = num_blocks
+                num_blocks += 1
+            else:
+                edge_block[e] = edge_block[self.parent_edge[u]]
+
+        for e in range(m):
+            if edge_block[e] == NONE:  # back edge
+                edge_block[e] = edge_block[self.parent_edge[
+                    self.edge_source[e]]]
+
+        return edge_block, num_blocks
+
+    def biconnected_components(self):
+        """Generate the node sets of the blocks
+
+        Like :func:`nx.biconnected_components`, isolated nodes are not
+        contained in any block.
+        """
+        edge_block, num_blocks = self.edge_blocks()
+        components = [set() for _ in range(num_blocks)]
+        for e, b in enumerate(edge_block):
+            components[b].add(self.edge_source[e])
+            components[b].add(self.edge_target[e])
+        nodes = self.nodes
+        for component in components:
+            yield {nodes[v] for v in component}
+
+    def articulation_points(self):
+        """Generate the cut vertices, each one once
+
+        A root is a cut vertex if it has more than one child. Any other
+        vertex u is a cut vertex if a tree edge (u, w) starts a new block.
+        """
+        height, lowpt = self.height, self.lowpt
+        parent_edge, edge_source = self.parent_edge, self.edge_source
+        children = array('i', [0]) * len(height)
+        cut = bytearray(len(height))
+        for w in range(len(height)):
+            e = parent_edge[w]
+            if e == NONE:
+                continue
+            u = edge_source[e]
+            children[u] += 1
+            if parent_edge[u] != NONE and lowpt[e] >= height[u]:
+                cut[u] = 1
+        for v in self.roots:
+            cut[v] = children[v] > 1
+        nodes = self.nodes
+        for v in range(len(height)):
+            if cut[v]:
+                yield nodes[v]
+
+    def bridges(self):
+        """Generate the edges whose removal disconnects the graph
+
+        An edge is a bridge if it is the only edge of its block. The edges
+        are oriented as in the DFS tree, from the parent to the child.
+        """
+        edge_block, num_blocks = self.edge_blocks()
+        size = array('i', [0]) * num_blocks
+        for b in edge_block:
+            size[b] += 1
+        nodes = self.nodes
+        for e, b in enumerate(edge_block):
+            if size[b] == 1:
+                yield nodes[self.edge_source[e]], nodes[self.edge_target[e]]
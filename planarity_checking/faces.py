@@ -0,0 +1,111 @@
+"""The faces and the dual graph of a planar embedding
+
+:func:`face_index` traces all faces of a :class:`RotationSystem` in one
+pass over its half-edges. The resulting :class:`FaceIndex` keeps the face
+boundaries in flat arrays, from which the dual graph is built in linear
+time.
+"""
+from array import array
+
+import networkx as nx
+
+from planarity_checking.lr_planarity import NONE, RotationSystem
+
+
+def face_index(rotation_system):
+    """Return the faces of a rotation system as :class:`FaceIndex`"""
+    face_next = rotation_system.face_next()
+    face = array('i', [NONE]) * len(face_next)
+    face_offsets = array('i', [0])
+    half_edges = array('i')
+    for i in range(len(face_next)):
+        if face[i] != NONE:
+            continue
+        f = len(face_offsets) - 1
+        while face[i] == NONE:
+            face[i] = f
+            half_edges.append(i)
+            i = face_next[i]
+        face_offsets.append(len(half_edges))
+    return FaceIndex(rotation_system, face_offsets, half_edges, face)
+
+
+class FaceIndex(object):
+    """The faces of a :class:`RotationSystem` in flat arrays
+
+    The faces are 0, ..., f-1. The boundary of face f is the sequence of
+    half-edges ``half_edges[offsets[f]]``, ..., ``half_edges[offsets[f + 1]
+    - 1]`` in the order of :meth:`RotationSystem.face_next`, its size is
+    ``sizes[f]``. ``face[i]`` is the face of the half-edge i, i.e. the face
+    to the right of it. Every connected component with an edge has its own
+    faces, so the outer face of a disconnected graph appears once per
+    component and isolated vertices lie on no face.
+
+    The dual graph has a vertex for every face and an edge for every edge
+    of the graph, joining the faces on both sides. :meth:`dual` returns it
+    as rotation system in O(n + m) time from these arrays.
+    """
+    def __init__(self, rotation_system, offsets, half_edges, face):
+        self.rotation_system = rotation_system
+        self.offsets = offsets
+        self.half_edges = half_edges
+        self.face = face
+        self.sizes = array('i', (offsets[f + 1] - offsets[f]
+                                 for f in range(len(offsets) - 1)))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def boundary(self, f):
+        """Return the labels of the nodes on the boundary of face f
+
+        The node at position k is the start of the k-th half-edge of the
+        face, nodes on a bridge or cut vertex can appear several times.
+        """
+        rotation_system = self.rotation_system
+        nodes, targets, twin = (rotation_system.nodes,
+                                rotation_system.targets, rotation_system.twin)
+        return [nodes[targets[twin[i]]]
+                for i in self.half_edges[self.offsets[f]:self.offsets[f + 1]]]
+
+    def dual(self):
+        """Return the dual graph as :class:`RotationSystem`
+
+        The vertices are the faces, the node labels are 0, ..., f-1. The
+        dual half-edges of face f correspond to its boundary half-edges in
+        the same order, so the arrays ``offsets`` are shared. Bridges give
+        self-loops and faces sharing several edges multiple edges, so the
+        result is a valid embedding of a multigraph but does not pass
+        :func:`check_rotation_system` in general.
+        """
+        half_edges, face = self.half_edges, self.face
+        twin = self.rotation_system.twin
+        position = array('i', [NONE]) * len(half_edges)
+        for k, i in enumerate(half_edges):
+            position[i] = k
+        targets = array('i', [NONE]) * len(half_edges)
+        dual_twin = array('i', [NONE]) * len(half_edges)
+        for k, i in enumerate(half_edges):
+            j = twin[i]
+            targets[k] = face[j]
+            dual_twin[k] = position[j]
+        return RotationSystem(list(range(len(self))), self.offsets, targets,
+                              dual_twin)
+
+    def dual_graph(self):
+        """Return the dual graph as :class:`nx.MultiGraph`
+
+        Every edge has the attribute 'edge' with the edge of the graph it
+        crosses.
+        """
+        rotation_system = self.rotation_system
+        nodes, targets, twin = (rotation_system.nodes,
+                                rotation_system.targets, rotation_system.twin)
+        face = self.face
+        dual = nx.MultiGraph()
+        dual.add_nodes_from(range(len(self)))
+        dual.add_edges_from(
+            (face[i], face[twin[i]],
+             {'edge': (nodes[targets[twin[i]]], nodes[targets[i]])})
+            for i in range(len(targets)) if i < twin[i])
+        return dual
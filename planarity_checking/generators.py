@@ -0,0 +1,147 @@
+"""Generators of large planar and near planar graphs
+
+The graphs are returned as edge arrays ``(n, sources, targets)`` with the
+nodes 0, ..., n-1, as used by :func:`csr_from_edges`, so that graphs with
+millions of nodes can be built without NetworkX. Use
+:func:`to_networkx` for small graphs. The random generators are
+deterministic for a given seed.
+"""
+import random
+from array import array
+from math import isqrt
+
+import networkx as nx
+
+
+def to_networkx(n, sources, targets):
+    """Return the graph given by edge arrays as nx.Graph"""
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(zip(sources, targets))
+    return G
+
+
+def grid_edges(n):
+    """Return a square grid with about n nodes"""
+    side = max(2, isqrt(n))
+    sources = array('i')
+    targets = array('i')
+    _add_grid(side, 0, sources, targets)
+    return side * side, sources, targets
+
+
+def _add_grid(side, offset, sources, targets):
+    """Add a side x side grid on the nodes offset, offset + 1, ..."""
+    for i in range(side):
+        row = offset + i * side
+        sources.extend(range(row, row + side - 1))
+        targets.extend(range(row + 1, row + side))
+    sources.extend(range(offset, offset + side * (side - 1)))
+    targets.extend(range(offset + side, offset + side * side))
+
+
+def triangulation_edges(n, seed=None):
+    """Return a random maximal planar graph with about n nodes
+
+    Every cell of a square grid is split by a random diagonal and an
+    additional node is joined to the outer cycle of the grid, so that
+    every face is a triangle and the graph has 3n - 6 edges.
+    """
+    rnd = random.Random(seed)
+    side = max(2, isqrt(n - 1))
+    sources = array('i')
+    targets = array('i')
+    _add_grid(side, 0, sources, targets)
+    for i in range(side - 1):
+        for j in range(side - 1):
+            v = i * side + j
+            if rnd.random() < 0.5:
+                sources.append(v)
+                targets.append(v + side + 1)
+            else:
+                sources.append(v + 1)
+                targets.append(v + side)
+    apex = side * side
+    boundary = (list(range(side - 1)) +
+                list(range(side - 1, side * side - 1, side)) +
+                list(range(side * side - 1, side * (side - 1), -1)) +
+                list(range(side * (side - 1), 0, -side)))
+    sources.extend(array('i', [apex]) * len(boundary))
+    targets.extend(boundary)
+    return apex + 1, sources, targets
+
+
+def apollonian_edges(n, seed=None):
+    """Return a random Apollonian network with n nodes
+
+    Starting from a triangle, every node is put into a random triangular
+    face and joined to its three corners.
+    """
+    rnd = random.Random(seed)
+    n = max(n, 3)
+    sources = array('i', [0, 1, 2])
+    targets = array('i', [1, 2, 0])
+    # the corners of the inner faces
+    a, b, c = array('i', [0]), array('i', [1]), array('i', [2])
+    for v in range(3, n):
+        f = rnd.randrange(len(a))
+        x, y, z = a[f], b[f], c[f]
+        sources.extend((x, y, z))
+        targets.extend((v, v, v))
+        c[f] = v
+        a.extend((y, z))
+        b.extend((z, x))
+        c.extend((v, v))
+    return n, sources, targets
+
+
+def heavy_wheel_edges(n):
+    """Return a wheel with n nodes, the hub 0 is adjacent to all others"""
+    n = max(n, 4)
+    sources = array('i', [0]) * (n - 1)
+    targets = array('i', range(1, n))
+    sources.extend(range(1, n))
+    targets.extend(range(2, n))
+    targets.append(1)
+    return n, sources, targets
+
+
+def planted_kuratowski_edges(n, kind='K3,3', fraction=0.1):
+    """Return a grid with a subdivided Kuratowski graph planted into it
+
+    About a fraction of the n nodes subdivide the edges of K5 or K3,3,
+    the rest form a grid. Every branch node and the middle node of every
+    subdivided edge is joined to its own grid node, spread over the rows
+    of the grid. So the subdivision lies inside the biconnected component
+    of the grid and is not split off by a block decomposition or by
+    removing nodes of degree one or two.
+    """
+    if kind == 'K5':
+        branch = 5
+        pairs = [(i, j) for i in range(5) for j in range(i + 1, 5)]
+    elif kind == 'K3,3':
+        branch = 6
+        pairs = [(i, j) for i in range(3) for j in range(3, 6)]
+    else:
+        raise ValueError("kind must be 'K5' or 'K3,3'")
+    path_length = max(0, int(n * fraction) - branch) // len(pairs)
+    grid_n, sources, targets = grid_edges(n - branch -
+                                          path_length * len(pairs))
+    attached = list(range(grid_n, grid_n + branch))
+    v = grid_n + branch
+    for i, j in pairs:
+        prev = grid_n + i
+        for k in range(path_length):
+            sources.append(prev)
+            targets.append(v)
+            if k == path_length // 2:
+                attached.append(v)
+            prev = v
+            v += 1
+        sources.append(prev)
+        targets.append(grid_n + j)
+    k = len(attached)
+    for i, x in enumerate(attached):
+        sources.append(x)
+        targets.append(grid_n * (2 * i + 1) // (2 * k))
+    return v, sources, targets
@@ -0,0 +1,652 @@
+"""Incremental planarity test for graphs that grow edge by edge
+
+The graph is kept together with a planar embedding, its faces and its
+blocks (biconnected components). An edge between two vertices on a common
+face, or between two components, can be added to the embedding directly.
+Only if the endpoints do not share a face in the current embedding, the
+blocks between them are tested again, since another embedding of them may
+still admit the edge.
+"""
+from array import array
+
+import networkx as nx
+
+from planarity_checking.lr_planarity import (LRPlanarity, NONE,
+                                             csr_from_edges)
+
+
+class IncrementalPlanarity(object):
+    """Maintains a planar embedding of a graph under edge insertions
+
+    The rotation at every vertex is stored as a cyclic linked list of its
+    neighbors in clockwise order, ``cw[v][w]`` is the neighbor after w and
+    ``ccw[v][w]`` the one before w. Every half-edge (v, w) belongs to the
+    face to its right, which is traversed by following the half-edges
+    (v, w), (w, ccw[w][v]), ... as in :class:`nx.PlanarEmbedding`. The
+    faces are numbered and ``face[v][w]`` is the number of the face of
+    (v, w).
+
+    The blocks are maintained on a spanning forest: ``tree_parent[v]`` is
+    the parent of v (None for a root) and ``parent_block[v]`` the block of
+    the tree edge to it, up to the union-find structure on the blocks. The
+    tree edges of a block form a subtree, ``block_head[b]`` is its topmost
+    vertex and ``block_nodes[b]`` lists the vertices of the block (possibly
+    with repetitions). An edge (u, v) merges the blocks on the tree path
+    from u to v, which is followed one block at a time.
+
+    Parameters
+    ----------
+    G : NetworkX graph, optional
+        The initial graph, it is tested once with :class:`LRPlanarity`.
+
+    Notes
+    -----
+    An edge between two components merges one face at each endpoint, an
+    edge inside a face splits it. In both cases only the half-edges of the
+    smaller face are numbered again, the other steps take O(deg(u) +
+    deg(v)) time plus the walk over the blocks between u and v. Joining
+    two components reroots the spanning tree of the smaller one, which
+    takes O(n log n) time over all insertions.
+
+    If u and v do not share a face, the graph with the edge is planar if
+    and only if every block on the path from u to v in the block-cut tree
+    is planar together with an edge between its two vertices on the path.
+    Blocks where these vertices are adjacent or share a face pass without
+    a test. For the others, the CSR arrays, the LR orientation and the
+    sorted adjacency lists of the block are cached until an edge is added
+    to it, together with the answers. If one of the two vertices is an
+    ancestor of the other in the DFS tree, the edge is a new back edge
+    (see :meth:`LRPlanarity.with_back_edge`) and only the lowpoints on the
+    tree path between them are updated. Otherwise the block is oriented
+    again from one of them, and this orientation is cached as well. The
+    testing phase still runs over the whole block, so on a biconnected
+    graph, such as a grid, a query without a common face costs about a
+    third of a test of the block from scratch, not less. The test is
+    skipped if a block would have more than 3n - 6 edges, and for edges
+    that were rejected before: the graph only grows, so they stay
+    rejected.
+
+    Attributes
+    ----------
+    graph : nx.Graph
+        The current graph, including edges that made it non planar
+    retests : int
+        Number of insertions that needed a new planarity test of blocks
+    retested_edges : int
+        Total number of edges in these tests
+    """
+    def __init__(self, G=None):
+        self.graph = nx.Graph()
+        self.cw = {}
+        self.ccw = {}
+        self.face = {}
+        self.face_size = {}
+        self.next_face = 0
+        # union-find forest of the components, with the number of nodes
+        # and edges stored at the roots
+        self.parent = {}
+        self.node_count = {}
+        self.edge_count = {}
+        # vertex pairs whose edge makes the graph non planar
+        self.rejected = set()
+        # the spanning forest and the blocks
+        self.tree_parent = {}
+        self.parent_block = {}
+        self.depth = {}
+        self.block_parent = []
+        self.block_head = []
+        self.block_nodes = []
+        # oriented planarity states of blocks, see _block_state
+        self.block_states = {}
+        self.planar = True
+        self.retests = 0
+        self.retested_edges = 0
+        if G is not None:
+            for v in G:
+                self.add_node(v)
+            for u, v in G.edges():
+                if u != v and not self.graph.has_edge(u, v):
+                    self.graph.add_edge(u, v)
+                    self._union(u, v)
+                    self.edge_count[self._find(u)] += 1
+            embedding = LRPlanarity(self.graph).lr_planarity()
+            if embedding is None:
+                self.planar = False
+            else:
+                self._set_rotations(embedding)
+                self._build_blocks()
+
+    def is_planar(self):
+        """Return True if the current graph is planar"""
+        return self.planar
+
+    def add_node(self, v):
+        """Add an isolated vertex"""
+        if v not in self.graph:
+            self.graph.add_node(v)
+            self.parent[v] = v
+            self.node_count[v] = 1
+            self.edge_count[v] = 0
+            if self.planar:
+                self.cw[v] = {}
+                self.ccw[v] = {}
+                self.face[v] = {}
+                self.tree_parent[v] = None
+                self.depth[v] = 0
+
+    def add_edge(self, u, v):
+        """Add the edge (u, v) and return True if the graph stays planar
+
+        Once the graph is non planar, edges are only added to the graph.
+        """
+        if self.planar and not self._insert(u, v, commit=True):
+            self.planar = False
+            self.cw = self.ccw = self.face = self.face_size = None
+            self.tree_parent = self.parent_block = self.depth = None
+            self.block_parent = self.block_head = self.block_nodes = None
+            self.block_states = None
+        if u != v:
+            self.graph.add_edge(u, v)
+        return self.planar
+
+    def can_add_edge(self, u, v):
+        """Return True if the graph stays planar when (u, v) is added
+
+        The graph is not changed.
+        """
+        return self.planar and self._insert(u, v, commit=False)
+
+    def try_add_edge(self, u, v):
+        """Add the edge (u, v) only if the graph stays planar
+
+        Returns
+        -------
+        added : bool
+            True if the graph stays planar, the edge is added then.
+        """
+        if not self.planar or not self._insert(u, v, commit=True):
+            return False
+        if u != v:
+            self.graph.add_edge(u, v)
+        return True
+
+    def embed_edge(self, u, v):
+        """Add the edge (u, v) only if it fits into the current embedding
+
+        The edge is added if u and v are in different components or on a
+        common face. No planarity test is run, so an edge that needs
+        another embedding of the graph is not added.
+
+        Returns
+        -------
+        added : bool
+            True if the edge is added
+        """
+        if not self.planar or not self._insert(u, v, commit=True,
+                                               retest=False):
+            return False
+        if u != v:
+            self.graph.add_edge(u, v)
+        return True
+
+    def get_embedding(self):
+        """Return the embedding as dict in the format of check_planarity
+
+        Raises nx.NetworkXException if the graph is not planar.
+        """
+        if not self.planar:
+            raise nx.NetworkXException("G is not planar.")
+        return {v: self._rotation(v) for v in self.cw}
+
+    def _rotation(self, v):
+        """Return the neighbors of v in clockwise order"""
+        rotation = self.cw[v]
+        nbrs = []
+        if rotation:
+            first = w = next(iter(rotation))
+            while True:
+                nbrs.append(w)
+                w = rotation[w]
+                if w == first:
+                    break
+        return nbrs
+
+    def _insert(self, u, v, commit, retest=True):
+        """Insert (u, v) into the embedding if possible
+
+        Returns False if the graph with the edge is not planar. If commit
+        is false the embedding is not changed. If retest is false, False is
+        also returned when u and v do not share a face.
+        """
+        if u == v or self.graph.has_edge(u, v):
+            return True
+        pair = frozenset((u, v))
+        if pair in self.rejected:
+            return False
+        if commit:
+            self.add_node(u)
+            self.add_node(v)
+
+        root = self._find(u)
+        if root != self._find(v):
+            # another component can be put into any face
+            if commit:
+                self._connect(u, v)
+                if self.node_count[root] < self.node_count[self._find(v)]:
+                    self._link(v, u)
+                else:
+                    self._link(u, v)
+                root = self._union(u, v)
+                self.edge_count[root] += 1
+            return True
+        faces_u = {}
+        for w, f in self.face[u].items():
+            faces_u[f] = w
+        for y, f in self.face[v].items():
+            if f in faces_u:
+                if commit:
+                    self._split_face(u, faces_u[f], v, y)
+                    self._merge_blocks(self._block_path(u, v))
+                    self.edge_count[root] += 1
+                return True
+        if not retest:
+            return False
+        if not self._retest(u, v, commit):
+            self.rejected.add(pair)
+            return False
+        if commit:
+            self.edge_count[root] += 1
+        return True
+
+    def _find(self, v):
+        """Return the representative of the component of v"""
+        parent = self.parent
+        if v not in parent:
+            return v
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    def _union(self, u, v):
+        """Merge the components of u and v and return the new root"""
+        u, v = self._find(u), self._find(v)
+        if self.node_count[u] > self.node_count[v]:
+            u, v = v, u
+        self.parent[u] = v
+        self.node_count[v] += self.node_count.pop(u)
+        self.edge_count[v] += self.edge_count.pop(u)
+        return v
+
+    def _find_block(self, b):
+        """Return the representative of block b"""
+        block_parent = self.block_parent
+        while block_parent[b] != b:
+            block_parent[b] = block_parent[block_parent[b]]
+            b = block_parent[b]
+        return b
+
+    def _new_block(self, x, y):
+        """Return a new block for the tree edge from x to its child y"""
+        b = len(self.block_parent)
+        self.block_parent.append(b)
+        self.block_head.append(x)
+        self.block_nodes.append([x, y])
+        return b
+
+    def _build_blocks(self):
+        """Compute the spanning forest and the blocks of the graph
+
+        The forest is grown by breadth-first search, then the other edges
+        merge the blocks between their endpoints.
+        """
+        tree_parent, parent_block, depth = (self.tree_parent,
+                                            self.parent_block, self.depth)
+        others = []
+        for r in self.graph:
+            if r in parent_block or tree_parent[r] is not None:
+                continue
+            queue = [r]
+            for x in queue:
+                for y in self.graph[x]:
+                    if y == r or y in parent_block:
+                        if tree_parent[x] != y:
+                            others.append((x, y))
+                        continue
+                    tree_parent[y] = x
+                    parent_block[y] = self._new_block(x, y)
+                    depth[y] = depth[x] + 1
+                    queue.append(y)
+        for x, y in others:
+            self._merge_blocks(self._block_path(x, y))
+
+    def _block_path(self, u, v):
+        """Return the blocks on the path from u to v in the block-cut tree
+
+        u and v must be in the same component. The deeper of the two moves
+        to the head of the block of its parent edge until they meet.
+        """
+        return list(self._block_ports(u, v))
+
+    def _block_ports(self, u, v):
+        """Return the blocks from u to v and where the path passes them
+
+        Returns
+        -------
+        ports : dict
+            Maps the blocks on the path in the block-cut tree, in the order
+            of the path, to the pair of their vertices on the path (u, v or
+            cut vertices).
+        """
+        depth, head, parent_block = (self.depth, self.block_head,
+                                     self.parent_block)
+        ports = {}
+        while u != v:
+            if depth[u] < depth[v]:
+                u, v = v, u
+            b = self._find_block(parent_block[u])
+            if b in ports:
+                # entered from both sides, the paths meet at the head
+                ports[b] = (ports[b][0], u)
+            else:
+                ports[b] = (u, head[b])
+            u = head[b]
+        return ports
+
+    def _merge_blocks(self, path):
+        """Merge the blocks of a path in the block-cut tree into one
+
+        The vertex lists of the smaller blocks are appended to the largest
+        one, so every vertex is moved O(log n) times. The cached states of
+        the blocks are dropped, a new edge may join them.
+        """
+        for b in path:
+            self.block_states.pop(b, None)
+        if len(path) < 2:
+            return
+        depth, head, nodes = self.depth, self.block_head, self.block_nodes
+        top = head[min(path, key=lambda b: depth[head[b]])]
+        largest = max(path, key=lambda b: len(nodes[b]))
+        for b in path:
+            if b != largest:
+                nodes[largest].extend(nodes[b])
+                nodes[b] = None
+                self.block_parent[b] = largest
+        head[largest] = top
+
+    def _link(self, u, v):
+        """Hang the spanning tree of the component of v from u
+
+        The tree is rerooted at v: the tree path from v to the old root is
+        reversed and its blocks get new heads. Then the depths in the tree
+        are computed again.
+        """
+        tree_parent, parent_block, head = (self.tree_parent,
+                                           self.parent_block,
+                                           self.block_head)
+        x, parent, block = v, u, self._new_block(u, v)
+        seen = set()
+        while x is not None:
+            next_x, next_block = tree_parent[x], parent_block.get(x)
+            tree_parent[x], parent_block[x] = parent, block
+            if next_x is not None:
+                b = self._find_block(next_block)
+                if b not in seen:
+                    seen.add(b)
+                    head[b] = x
+            x, parent, block = next_x, x, next_block
+        depth = self.depth
+        depth[v] = depth[u] + 1
+        queue = [v]
+        for x in queue:
+            for y in self.cw[x]:
+                if tree_parent[y] == x:
+                    depth[y] = depth[x] + 1
+                    queue.append(y)
+
+    def _add_half_edge(self, v, w, ref):
+        """Add w to the rotation of v, clockwise after ref"""
+        cw, ccw = self.cw[v], self.ccw[v]
+        if ref is None:
+            cw[w] = ccw[w] = w
+            return
+        after = cw[ref]
+        cw[ref] = w
+        ccw[w] = ref
+        cw[w] = after
+        ccw[after] = w
+
+    def _traverse(self, v, w):
+        """Return the half-edges of the face of (v, w)"""
+        ccw = self.ccw
+        half_edges = [(v, w)]
+        x, y = w, ccw[w][v]
+        while (x, y) != (v, w):
+            half_edges.append((x, y))
+            x, y = y, ccw[y][x]
+        return half_edges
+
+    def _new_face(self, half_edges):
+        """Give the half-edges a new face number"""
+        f = self.next_face
+        self.next_face += 1
+        face = self.face
+        for x, y in half_edges:
+            face[x][y] = f
+        self.face_size[f] = len(half_edges)
+        return f
+
+    def _connect(self, u, v):
+        """Add an edge between two components
+
+        The edge goes into any face at u and any face at v, these faces are
+        merged into one. The half-edges of the smaller face get the number
+        of the larger face.
+        """
+        face = self.face
+        x = next(iter(self.cw[u]), None)
+        y = next(iter(self.cw[v]), None)
+        if x is None and y is None:
+            self._add_half_edge(u, v, None)
+            self._add_half_edge(v, u, None)
+            self._new_face([(u, v), (v, u)])
+            return
+        if x is None or y is not None and \
+                self.face_size[face[u][x]] < self.face_size[face[v][y]]:
+            u, v, x, y = v, u, y, x
+        # the face of (u, x) is kept, the face of (v, y) joins it
+        f = face[u][x]
+        if y is not None:
+            merged = self._traverse(v, y)
+            del self.face_size[face[v][y]]
+            for a, b in merged:
+                face[a][b] = f
+            self.face_size[f] += len(merged)
+        self._add_half_edge(u, v, x)
+        self._add_half_edge(v, u, y)
+        face[u][v] = face[v][u] = f
+        self.face_size[f] += 2
+
+    def _split_face(self, u, x, v, y):
+        """Add (u, v) into the common face of (u, x) and (v, y)
+
+        The face is split in two. Both parts are traversed alternately
+        until the smaller one is complete, it gets a new number.
+        """
+        f = self.face[u][x]
+        self._add_half_edge(u, v, x)
+        self._add_half_edge(v, u, y)
+        ccw = self.ccw
+        walks = [[(u, v)], [(v, u)]]
+        ends = [(u, v), (v, u)]
+        while True:
+            for walk, end in zip(walks, ends):
+                x, y = walk[-1]
+                x, y = y, ccw[y][x]
+                if (x, y) == end:
+                    self._new_face(walk)
+                    if walk[0] == (u, v):
+                        self.face[v][u] = f
+                    else:
+                        self.face[u][v] = f
+                    # one of the new half-edges stays in f
+                    self.face_size[f] += 2 - len(walk)
+                    return
+                walk.append((x, y))
+
+    def _retest(self, u, v, commit):
+        """Test the blocks between u and v with the new edge
+
+        Without commit, only the orientation and testing phase are run. If
+        the blocks are planar and commit is set, they are merged, their
+        embedding is replaced by the new one and the faces at their
+        vertices are numbered again.
+
+        The blocks on the path and the new edge form a cycle of 2-sums: the
+        graph is planar with the edge if and only if every block is planar
+        together with an edge between its two vertices on the path. So the
+        blocks are tested one by one, see :meth:`_block_admits`, and only
+        the embedding of a new merged block needs all of them at once.
+        """
+        ports = self._block_ports(u, v)
+        path = list(ports)
+        if len(path) == 1:
+            planarity_state = self._block_state_with_edge(path[0], u, v)
+            if planarity_state is None:
+                return False
+            if not commit:
+                return planarity_state.lr_testing()
+            embedding = planarity_state.lr_planarity()
+            if embedding is None:
+                return False
+        else:
+            for b, (x, y) in ports.items():
+                if not self._block_admits(b, x, y):
+                    return False
+            if not commit:
+                return True
+            nodes, index, sources, targets = self._block_edges(path)
+            sources.append(index[u])
+            targets.append(index[v])
+            embedding = LRPlanarity.from_csr(
+                *csr_from_edges(len(nodes), sources, targets),
+                nodes=nodes).lr_planarity()
+        self._merge_blocks(path)
+        self._set_rotations(embedding)
+        return True
+
+    def _block_admits(self, b, x, y):
+        """Return True if block b stays planar with an edge from x to y
+
+        The answer is cached with the state of the block. Adjacent vertices
+        and vertices on a common face need no test.
+        """
+        if y in self.cw[x] or not set(self.face[x].values()).isdisjoint(
+                self.face[y].values()):
+            return True
+        answers = self._block_state(b)[2]
+        pair = (x, y) if (x, y) in answers else (y, x)
+        if pair not in answers:
+            planarity_state = self._block_state_with_edge(b, x, y)
+            answers[pair] = (planarity_state is not None and
+                             planarity_state.lr_testing())
+        return answers[pair]
+
+    def _block_state_with_edge(self, b, u, v):
+        """Return the planarity state of block b with the edge (u, v)
+
+        The cached orientation of the block is reused if the edge is a
+        back edge of its DFS tree. Otherwise the block is oriented again
+        from u, which makes (v, u) a back edge. This orientation is cached
+        as well, since consecutive queries often share an endpoint. Returns
+        None if the block would have more than 3n - 6 edges.
+        """
+        cached = self._block_state(b)
+        block_state, index, rooted = cached[0], cached[1], cached[3]
+        n, m = block_state.n, block_state.m + 1
+        if n > 2 and m > 3 * n - 6:
+            return None
+        self.retests += 1
+        self.retested_edges += m
+        i, j = index[u], index[v]
+        if block_state.height[i] < block_state.height[j]:
+            i, j = j, i
+        planarity_state = block_state.with_back_edge(i, j)
+        if planarity_state is None:
+            i, j = index[u], index[v]
+            if i not in rooted:
+                rooted.clear()
+                rooted[i] = LRPlanarity.from_csr(
+                    block_state.adj_offsets, block_state.adj_targets,
+                    block_state.adj_edges, block_state.nodes)
+                rooted[i].lr_orientation(root=i)
+                rooted[i].sort_adjacency_lists()
+            planarity_state = rooted[i].with_back_edge(j, i)
+        return planarity_state
+
+    def _block_edges(self, path):
+        """Return the vertices, their index and the edges of some blocks
+
+        The edges are read off the rotations. Two vertices of the blocks
+        are only adjacent by an edge of the blocks.
+        """
+        cw, block_nodes = self.cw, self.block_nodes
+        nodes = []
+        index = {}
+        for b in path:
+            for x in block_nodes[b]:
+                if x not in index:
+                    index[x] = len(nodes)
+                    nodes.append(x)
+        sources = array('i')
+        targets = array('i')
+        for i, x in enumerate(nodes):
+            for y in cw[x]:
+                j = index.get(y, NONE)
+                if j != NONE and j < i:
+                    sources.append(i)
+                    targets.append(j)
+        return nodes, index, sources, targets
+
+    def _block_state(self, b):
+        """Return the oriented planarity state of block b, the index of
+        its vertices, the answers of :meth:`_block_admits` and the states
+        oriented from other roots
+
+        The state is cached until an edge is added to the block, so the
+        queries inside one block share its CSR arrays, its orientation and
+        the order of its adjacency lists.
+        """
+        if b not in self.block_states:
+            nodes, index, sources, targets = self._block_edges([b])
+            block_state = LRPlanarity.from_csr(
+                *csr_from_edges(len(nodes), sources, targets), nodes=nodes)
+            block_state.lr_orientation()
+            block_state.sort_adjacency_lists()
+            self.block_states[b] = block_state, index, {}, {}
+        return self.block_states[b]
+
+    def _set_rotations(self, embedding):
+        """Replace the rotations of the embedded vertices and their faces
+
+        The embedding must contain every edge between its vertices. At
+        every vertex the edges to other vertices follow the new ones in
+        their old order, i.e. the blocks attached at a cut vertex are moved
+        into one angle of the embedding. All faces through the embedded
+        vertices are numbered again.
+        """
+        face, face_size = self.face, self.face_size
+        rotations = {}
+        for v, nbrs in embedding.items():
+            for f in face[v].values():
+                face_size.pop(f, None)
+            rotations[v] = nbrs + [w for w in self._rotation(v)
+                                   if w not in embedding]
+        for v, nbrs in rotations.items():
+            self.cw[v] = dict(zip(nbrs, nbrs[1:] + nbrs[:1]))
+            self.ccw[v] = dict(zip(nbrs, nbrs[-1:] + nbrs[:-1]))
+            face[v] = dict.fromkeys(nbrs)
+        for v, nbrs in rotations.items():
+            for w in nbrs:
+                if face[v][w] is None:
+                    self._new_face(self._traverse(v, w))
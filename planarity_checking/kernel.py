@@ -0,0 +1,391 @@
+"""Planarity check on a reduced graph (kernel)
+
+Vertices of degree at most two do not influence planarity:
+
+- A vertex of degree zero or one can always be added to a planar drawing.
+- A vertex v of degree two with neighbors a and b is a subdivision of the
+  edge (a, b). It is replaced by this edge. If the edge (a, b) is already
+  present, the path a - v - b is parallel to it and v is removed.
+
+These rules are applied until all vertices have degree at least three. The
+remaining graph (the kernel) is planar if and only if the input graph is
+planar. For road networks and sparse meshes the kernel is usually much
+smaller than the input graph.
+"""
+from array import array
+
+import networkx as nx
+
+from planarity_checking.lr_planarity import (LRPlanarity, NONE,
+                                             csr_from_edges, csr_from_graph,
+                                             kuratowski_subgraph)
+
+# where a logged half-edge is inserted relative to its reference half-edge
+AFTER, BEFORE = range(2)
+
+
+def check_planarity_kernel(G, counterexample=False):
+    """Checks planarity by running the LR test on the kernel of G
+
+    Parameters
+    ----------
+    G : NetworkX graph
+    counterexample : bool
+        A Kuratowski subgraph is returned for non planar graphs if set to
+        true.
+
+    Returns
+    -------
+    is_planar, certificate :
+        See :func:`check_planarity`.
+
+    Notes
+    -----
+    Besides the bound m <= 3n - 6, the kernel is rejected without running
+    the LR test if it has no triangle and m > 2n - 4, which is the
+    corresponding bound for triangle-free (e.g. bipartite) planar graphs.
+    The embedding of the kernel is expanded to an embedding of G afterwards,
+    see :meth:`PlanarityKernel.expand_embedding`.
+    """
+    kernel = PlanarityKernel(G)
+    is_planar = kernel.satisfies_edge_bounds()
+    if is_planar:
+        planarity_state = LRPlanarity.from_csr(*kernel.csr(),
+                                               nodes=kernel.kernel_nodes)
+        kernel_embedding = planarity_state.lr_planarity()
+        is_planar = kernel_embedding is not None
+    if not is_planar:
+        if counterexample:
+            return False, kernel.counterexample()
+        return False, None
+    return True, kernel.expand_embedding(kernel_embedding)
+
+
+class PlanarityKernel(object):
+    """Reduces a graph to its vertices of degree at least three
+
+    The graph is stored in CSR form as in :class:`LRPlanarity`. A position
+    p in the adjacency arrays is the half-edge from the vertex that owns
+    the adjacency list to ``adj_targets[p]``. During the reduction every
+    edge of the current graph is represented by the two half-edges (ports)
+    of the input graph it starts with at its endpoints. Suppressing a vertex
+    joins two edges without changing these ports, so a suppressed vertex
+    just keeps its two ports as its rotation. Removed leaves and parallel
+    paths are written to a log, which tells where their ports are inserted
+    into the rotations of the remaining vertices.
+
+    The reduction runs in three passes: vertices of degree at most one are
+    peeled off on the CSR arrays, then the paths of degree two vertices
+    between the remaining vertices are contracted, and the rules are
+    applied again to the contracted graph, which is stored as dicts from a
+    neighbor to the port of the edge to it.
+
+    Attributes
+    ----------
+    nodes : list
+        The node labels of the input graph
+    kernel_nodes : list of int
+        The vertices of the kernel
+    kernel_edges : list of tuples
+        The edges (i, j) of the kernel as positions in kernel_nodes
+    """
+    def __init__(self, G):
+        (self.nodes, self.adj_offsets, self.adj_targets,
+         self.adj_edges) = csr_from_graph(G)
+        n = len(self.nodes)
+        m = len(self.adj_edges) // 2
+        adj_offsets = self.adj_offsets
+        adj_targets = self.adj_targets
+        adj_edges = self.adj_edges
+
+        # the other half-edge of every half-edge
+        self.twin = twin = array('i', [NONE]) * (2 * m)
+        seen = array('i', [NONE]) * m
+        for p in range(2 * m):
+            e = adj_edges[p]
+            if seen[e] == NONE:
+                seen[e] = p
+            else:
+                twin[p] = seen[e]
+                twin[seen[e]] = p
+        seen = None
+
+        # rotation of a removed vertex at the time it is removed
+        self.port1 = port1 = array('i', [NONE]) * n
+        self.port2 = port2 = array('i', [NONE]) * n
+        # log entries (vertex, port, reference port, AFTER/BEFORE)
+        self.log = log = array('i')
+        self.removed = removed = bytearray(n)
+        dead = bytearray(m)
+
+        # peel off vertices of degree at most one
+        degree = array('i', (adj_offsets[v + 1] - adj_offsets[v]
+                             for v in range(n)))
+        stack = [v for v in range(n) if degree[v] <= 1]
+        while stack:
+            v = stack.pop()
+            if removed[v]:
+                continue
+            removed[v] = 1
+            if degree[v] == 0:
+                continue
+            for p in range(adj_offsets[v], adj_offsets[v + 1]):
+                if not dead[adj_edges[p]]:
+                    break
+            dead[adj_edges[p]] = 1
+            u = adj_targets[p]
+            port1[v] = p
+            degree[v] = 0
+            degree[u] -= 1
+            log.extend((u, twin[p], NONE, AFTER))
+            if degree[u] <= 1:
+                stack.append(u)
+
+        # contract the paths between the vertices of degree at least three
+        self.ports = ports = [None] * n
+        for v in range(n):
+            if degree[v] > 2:
+                ports[v] = {}
+        for a in range(n):
+            if ports[a] is None:
+                continue
+            for p in range(adj_offsets[a], adj_offsets[a + 1]):
+                if dead[adj_edges[p]]:
+                    continue
+                dead[adj_edges[p]] = 1
+                q = p
+                w = adj_targets[q]
+                while ports[w] is None:
+                    # w has degree two, leave it by its other edge
+                    for r in range(adj_offsets[w], adj_offsets[w + 1]):
+                        if not dead[adj_edges[r]]:
+                            break
+                    dead[adj_edges[r]] = 1
+                    removed[w] = 1
+                    port1[w] = twin[q]
+                    port2[w] = r
+                    q = r
+                    w = adj_targets[q]
+                self._add_edge(a, w, p, twin[q])
+        # the remaining vertices of degree two form cycles
+        for v in range(n):
+            if not removed[v] and ports[v] is None:
+                removed[v] = 1
+                for p in range(adj_offsets[v], adj_offsets[v + 1]):
+                    if not dead[adj_edges[p]]:
+                        if port1[v] == NONE:
+                            port1[v] = p
+                        else:
+                            port2[v] = p
+
+        # reduce the contracted graph
+        stack = [v for v in range(n) if ports[v] is not None and
+                 len(ports[v]) <= 2]
+        while stack:
+            v = stack.pop()
+            nbrs = ports[v]
+            if removed[v] or len(nbrs) > 2:
+                continue
+            removed[v] = 1
+            if len(nbrs) == 1:
+                u, port1[v] = nbrs.popitem()
+                log.extend((u, ports[u].pop(v), NONE, AFTER))
+                if len(ports[u]) <= 2:
+                    stack.append(u)
+            elif len(nbrs) == 2:
+                (a, port1[v]), (b, port2[v]) = nbrs.items()
+                nbrs.clear()
+                self._add_edge(a, b, ports[a].pop(v), ports[b].pop(v))
+                for u in (a, b):
+                    if len(ports[u]) <= 2:
+                        stack.append(u)
+
+        self.kernel_nodes = kernel_nodes = [v for v in range(n)
+                                            if not removed[v]]
+        position = {v: i for i, v in enumerate(kernel_nodes)}
+        self.kernel_edges = [(position[v], position[w]) for v in kernel_nodes
+                             for w in ports[v] if v < w]
+
+    def _add_edge(self, a, b, pa, pb):
+        """Add the edge (a, b) with the ports pa at a and pb at b
+
+        Loops and parallel edges are not added, their ports are logged to
+        be inserted next to each other or next to the existing edge.
+        """
+        ports = self.ports
+        if a == b:
+            self.log.extend((a, pb, pa, AFTER))
+            self.log.extend((a, pa, NONE, AFTER))
+        elif b in ports[a]:
+            self.log.extend((a, pa, ports[a][b], AFTER))
+            self.log.extend((b, pb, ports[b][a], BEFORE))
+        else:
+            ports[a][b] = pa
+            ports[b][a] = pb
+
+    def csr(self):
+        """Return the kernel in CSR form, see :func:`csr_from_edges`"""
+        sources = array('i', (i for i, _ in self.kernel_edges))
+        targets = array('i', (j for _, j in self.kernel_edges))
+        return csr_from_edges(len(self.kernel_nodes), sources, targets)
+
+    def satisfies_edge_bounds(self):
+        """Check the kernel against the edge bounds of planar graphs
+
+        Returns False if the kernel has more than 3n - 6 edges, or more than
+        2n - 4 edges and no triangle. Every component of the kernel has at
+        least four vertices, so the bounds hold for the whole kernel.
+        """
+        n = len(self.kernel_nodes)
+        m = len(self.kernel_edges)
+        if n < 3 or m <= 2 * n - 4:
+            return True
+        if m > 3 * n - 6:
+            return False
+        return self.has_triangle()
+
+    def has_triangle(self):
+        """Check if the kernel contains a triangle
+
+        Every edge is directed towards the endpoint of higher degree, so
+        each triangle is found from its lowest vertex by intersecting the
+        out-neighbors of two of its vertices.
+        """
+        n = len(self.kernel_nodes)
+        degree = [0] * n
+        for i, j in self.kernel_edges:
+            degree[i] += 1
+            degree[j] += 1
+        out = [[] for _ in range(n)]
+        for i, j in self.kernel_edges:
+            if (degree[i], i) < (degree[j], j):
+                out[i].append(j)
+            else:
+                out[j].append(i)
+        mark = [NONE] * n
+        for v in range(n):
+            for w in out[v]:
+                mark[w] = v
+            for w in out[v]:
+                for x in out[w]:
+                    if mark[x] == v:
+                        return True
+        return False
+
+    def expand_path(self, v, p):
+        """Return the path of the input graph that starts with port p at v
+
+        The path follows the suppressed vertices until it reaches a vertex
+        of the kernel, the edges are returned as pairs of vertex indices.
+        """
+        path = []
+        while True:
+            w = self.adj_targets[p]
+            path.append((v, w))
+            if not self.removed[w]:
+                return path
+            q = self.twin[p]
+            p = self.port2[w] if self.port1[w] == q else self.port1[w]
+            v = w
+
+    def counterexample(self):
+        """Return a Kuratowski subgraph of the input graph
+
+        The Kuratowski subgraph of the kernel is a subdivision of K5 or
+        K3,3, replacing its edges by the paths they stand for gives another
+        subdivision.
+        """
+        kernel_subgraph = kuratowski_subgraph(self.kernel_nodes,
+                                              self.kernel_edges)
+        nodes = self.nodes
+        subgraph = nx.Graph()
+        for v, w in kernel_subgraph.edges:
+            for x, y in self.expand_path(v, self.ports[v][w]):
+                subgraph.add_edge(nodes[x], nodes[y])
+        subgraph.graph.update(kernel_subgraph.graph)
+        return subgraph
+
+    def expand_embedding(self, kernel_embedding):
+        """Expand an embedding of the kernel to the input graph
+
+        Parameters
+        ----------
+        kernel_embedding : dict
+            A planar embedding of the kernel, keyed by the vertex indices in
+            kernel_nodes, as returned by :meth:`LRPlanarity.lr_planarity`
+            when these indices are used as node labels.
+
+        Returns
+        -------
+        embedding : dict
+            The planar embedding of the input graph with its node labels
+
+        Notes
+        -----
+        The rotations are cyclic linked lists of ports. They start with the
+        ports of the kernel vertices in the kernel embedding and the ports
+        of every removed vertex at the time it was removed, then the log is
+        replayed backwards:
+
+        - A removed leaf is inserted anywhere in the rotation of its
+          neighbor.
+        - A parallel path from a to b is inserted next to the edge (a, b),
+          so that it bounds a new face together with the edge.
+        - A cycle through a single vertex is inserted as two consecutive
+          ports.
+        """
+        n = len(self.nodes)
+        m = len(self.adj_edges) // 2
+        rot_next = array('i', [NONE]) * (2 * m)
+        rot_prev = array('i', [NONE]) * (2 * m)
+        rot_first = array('i', [NONE]) * n
+
+        def link(v, rotation):
+            prev = rotation[-1]
+            for p in rotation:
+                rot_next[prev] = p
+                rot_prev[p] = prev
+                prev = p
+            rot_first[v] = rotation[0]
+
+        ports = self.ports
+        for v, nbrs in kernel_embedding.items():
+            if nbrs:
+                link(v, [ports[v][w] for w in nbrs])
+        port1, port2 = self.port1, self.port2
+        for v in range(n):
+            if port1[v] != NONE:
+                if port2[v] != NONE:
+                    link(v, (port1[v], port2[v]))
+                else:
+                    link(v, (port1[v],))
+
+        log = self.log
+        for i in range(len(log) - 4, -1, -4):
+            v, p, ref, where = log[i], log[i + 1], log[i + 2], log[i + 3]
+            if rot_first[v] == NONE:
+                link(v, (p,))
+                continue
+            if ref == NONE:
+                ref = rot_first[v]
+            elif where == BEFORE:
+                ref = rot_prev[ref]
+            after = rot_next[ref]
+            rot_next[ref] = p
+            rot_prev[p] = ref
+            rot_next[p] = after
+            rot_prev[after] = p
+
+        nodes = self.nodes
+        adj_targets = self.adj_targets
+        embedding = {}
+        for v in range(n):
+            nbrs = []
+            first = p = rot_first[v]
+            while p != NONE:
+                nbrs.append(nodes[adj_targets[p]])
+                p = rot_next[p]
+                if p == first:
+                    break
+            embedding[nodes[v]] = nbrs
+        return embedding
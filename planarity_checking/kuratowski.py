@@ -0,0 +1,400 @@
+"""Kuratowski subgraphs from the DFS tree of the LR test
+
+A non planar graph G consists of a DFS forest T of its orientation phase
+and the back edges. Every subgraph T + X with a set X of back edges is
+planar if and only if its contraction is planar: only the endpoints of X
+and the lowest common ancestors of these endpoints are kept (the virtual
+tree of the endpoints), the tree paths between them become single edges
+and the rest of T is dropped, since removing leaves and suppressing
+vertices of degree two does not change planarity. The contraction has
+O(|X|) vertices and edges, so many subsets X can be tested for the cost of
+a few tests of G.
+
+:class:`TreeContraction` runs these tests, :func:`kuratowski_edges` and
+:func:`kuratowski_graph` use them to find a Kuratowski subgraph of a non
+planar graph from its planarity state.
+"""
+from array import array
+
+import networkx as nx
+
+from planarity_checking.lr_planarity import NONE, LRPlanarity, csr_from_edges
+
+
+def kuratowski_edges(planarity_state):
+    """Returns the edges of a Kuratowski subgraph of a non planar graph
+
+    Parameters
+    ----------
+    planarity_state : LRPlanarity
+        The state of the graph. It is oriented and tested first if this
+        has not been done yet, and a failed test is reused.
+
+    Returns
+    -------
+    edges : list of int
+        The ids of the edges of a subdivision of K5 or K3,3
+
+    Raises
+    ------
+    NetworkXException
+        If the graph is planar
+
+    See Also
+    --------
+    TreeContraction.kuratowski_edges
+    """
+    return TreeContraction(planarity_state).kuratowski_edges()
+
+
+def kuratowski_graph(planarity_state):
+    """Returns a Kuratowski subgraph of a non planar graph as NetworkX graph
+
+    Parameters
+    ----------
+    planarity_state : LRPlanarity
+        The state of the graph, see :func:`kuratowski_edges`
+
+    Returns
+    -------
+    subgraph : NetworkX graph
+        A Kuratowski subgraph with the node labels of the planarity state.
+        It is a subdivision of K5 or K3,3, the type is stored as ``'K5'``
+        or ``'K3,3'`` in ``subgraph.graph['kuratowski_type']``.
+
+    Raises
+    ------
+    NetworkXException
+        If the graph is planar
+    """
+    nodes = planarity_state.nodes
+    edge_source = planarity_state.edge_source
+    edge_target = planarity_state.edge_target
+    subgraph = nx.Graph()
+    for e in kuratowski_edges(planarity_state):
+        subgraph.add_edge(nodes[edge_source[e]], nodes[edge_target[e]])
+    branch_vertices = sum(1 for v in subgraph if subgraph.degree(v) > 2)
+    subgraph.graph['kuratowski_type'] = 'K5' if branch_vertices == 5 \
+        else 'K3,3'
+    return subgraph
+
+
+def edge_chains(edge_source, edge_target, edges):
+    """Split a graph into maximal paths whose inner vertices have degree 2
+
+    Parameters
+    ----------
+    edge_source, edge_target : arrays
+        The endpoints of the edges, as in :class:`LRPlanarity`
+    edges : iterable of int
+        The ids of the edges of the graph. Every cycle must contain a
+        vertex whose degree is not 2.
+
+    Returns
+    -------
+    chains : list of tuples
+        The chains (u, v, chain_edges) with the end vertices u and v and
+        the ids of the edges from u to v
+    """
+    incident = {}
+    for e in edges:
+        incident.setdefault(edge_source[e], []).append(e)
+        incident.setdefault(edge_target[e], []).append(e)
+
+    used = set()
+    chains = []
+    for v, start_edges in incident.items():
+        if len(start_edges) == 2:
+            continue
+        for e in start_edges:
+            if e in used:
+                continue
+            used.add(e)
+            chain = [e]
+            w = edge_target[e] if edge_source[e] == v else edge_source[e]
+            while len(incident[w]) == 2:
+                f, g = incident[w]
+                f = g if f == chain[-1] else f
+                used.add(f)
+                chain.append(f)
+                w = edge_target[f] if edge_source[f] == w else edge_source[f]
+            chains.append((v, w, chain))
+    return chains
+
+
+class TreeContraction(object):
+    """Planarity tests of subgraphs that contain the whole DFS forest
+
+    The DFS forest of the orientation phase is indexed once in O(n) time:
+    a preorder numbering with subtree sizes gives the ancestor test, and a
+    heavy path decomposition gives the lowest common ancestors in
+    O(log n) time. Then :meth:`is_planar` tests the forest together with
+    a set X of back edges on its contraction, see the module docstring.
+
+    The contraction reuses the orientation of the graph: its vertices are
+    numbered in preorder and the contracted tree edges come first in the
+    adjacency lists, so that the DFS of the test finds the contracted
+    forest again.
+
+    Parameters
+    ----------
+    planarity_state : LRPlanarity
+        The state of the graph, it is oriented first if necessary
+    """
+    def __init__(self, planarity_state):
+        dfs_index = planarity_state.get_dfs_index()
+        self.planarity_state = planarity_state
+        n = planarity_state.n
+        height = planarity_state.height
+        parent_edge = planarity_state.parent_edge
+        edge_source = planarity_state.edge_source
+
+        parent = array('i', [NONE]) * n
+        for v in range(n):
+            if parent_edge[v] != NONE:
+                parent[v] = edge_source[parent_edge[v]]
+
+        order = dfs_index.vertices_by_height()
+
+        # subtree sizes and the child with the largest subtree
+        size = array('i', [1]) * n
+        heavy = array('i', [NONE]) * n
+        for v in reversed(order):
+            p = parent[v]
+            if p != NONE:
+                size[p] += size[v]
+        for v in order:
+            p = parent[v]
+            if p != NONE and (heavy[p] == NONE or size[v] > size[heavy[p]]):
+                heavy[p] = v
+
+        # preorder numbers: the subtree of v gets the range pre[v], ...,
+        # pre[v] + size[v] - 1 and the children share it in any order
+        pre = array('i', [0]) * n
+        next_pre = array('i', [0]) * n
+        head = array('i', [0]) * n  # top vertex of the heavy path
+        k = 0
+        for v in order:
+            p = parent[v]
+            if p == NONE:
+                pre[v] = k
+                k += size[v]
+                head[v] = v
+            else:
+                pre[v] = next_pre[p]
+                next_pre[p] += size[v]
+                head[v] = head[p] if heavy[p] == v else v
+            next_pre[v] = pre[v] + 1
+
+        self.height = height
+        self.parent = parent
+        self.size = size
+        self.pre = pre
+        self.head = head
+
+    def lca(self, u, v):
+        """Return the lowest common ancestor of u and v, NONE if they are
+        in different DFS trees"""
+        head, parent, height = self.head, self.parent, self.height
+        while head[u] != head[v]:
+            if height[head[u]] > height[head[v]]:
+                u = parent[head[u]]
+                if u == NONE:
+                    return NONE
+            else:
+                v = parent[head[v]]
+                if v == NONE:
+                    return NONE
+        return u if height[u] < height[v] else v
+
+    def virtual_tree(self, marked):
+        """Return the contracted forest of a set of vertices
+
+        Returns
+        -------
+        vertices : list
+            The marked vertices and the lowest common ancestors of them, in
+            preorder
+        tree_edges : list of tuples
+            The pairs (a, d) such that a is the lowest ancestor of d in
+            vertices, in preorder of d
+        """
+        pre, size = self.pre, self.size
+        vertices = sorted(set(marked), key=pre.__getitem__)
+        ancestors = set()
+        for u, v in zip(vertices, vertices[1:]):
+            a = self.lca(u, v)
+            if a != NONE:
+                ancestors.add(a)
+        if not ancestors.issubset(vertices):
+            vertices = sorted(ancestors.union(vertices), key=pre.__getitem__)
+
+        tree_edges = []
+        stack = []
+        for v in vertices:
+            while stack and not (
+                    pre[stack[-1]] <= pre[v] < pre[stack[-1]] +
+                    size[stack[-1]]):
+                stack.pop()
+            if stack:
+                tree_edges.append((stack[-1], v))
+            stack.append(v)
+        return vertices, tree_edges
+
+    def is_planar(self, back_edges):
+        """Test the DFS forest together with some back edges
+
+        Parameters
+        ----------
+        back_edges : iterable of int
+            Ids of back edges of the planarity state
+
+        Returns
+        -------
+        Returns True if the DFS forest with the back edges is planar.
+        """
+        edge_source = self.planarity_state.edge_source
+        edge_target = self.planarity_state.edge_target
+        back_edges = list(back_edges)
+        marked = [v for e in back_edges
+                  for v in (edge_source[e], edge_target[e])]
+        vertices, tree_edges = self.virtual_tree(marked)
+        index = {v: i for i, v in enumerate(vertices)}
+        sources = array('i', (index[a] for a, d in tree_edges))
+        targets = array('i', (index[d] for a, d in tree_edges))
+        contracted = set(tree_edges)
+        for e in back_edges:
+            pair = (edge_target[e], edge_source[e])
+            if pair not in contracted:
+                # not parallel to a contracted tree path
+                contracted.add(pair)
+                sources.append(index[pair[0]])
+                targets.append(index[pair[1]])
+        return _is_planar(len(vertices), sources, targets)
+
+    def back_edges(self):
+        """Return the ids of the back edges in the order of the testing
+
+        The back edges entered by a failed testing phase come first, each
+        part is ordered by the height of the return point. Edges deleted
+        by :meth:`LRPlanarity.without_back_edges` are left out.
+        """
+        planarity_state = self.planarity_state
+        edge_source = planarity_state.edge_source
+        edge_target = planarity_state.edge_target
+        parent_edge = planarity_state.parent_edge
+        stack_bottom = planarity_state.stack_bottom
+        back_edges = [e for e in range(planarity_state.m)
+                      if parent_edge[edge_target[e]] != e and
+                      edge_source[e] != NONE]
+        return sorted(back_edges, key=lambda e: (
+            stack_bottom[e] == NONE, self.height[edge_target[e]]))
+
+    def kuratowski_edges(self):
+        """Return the edges of a Kuratowski subgraph
+
+        Returns
+        -------
+        edges : list of int
+            The ids of the edges of a subdivision of K5 or K3,3
+
+        Raises
+        ------
+        NetworkXException
+            If the graph is planar
+
+        Notes
+        -----
+        The extraction works in two phases:
+
+        1. A minimal set X of back edges is found such that the forest
+           with X is not planar. The back edges are ordered by their
+           return points, the edges entered by a failed testing phase
+           first, which puts the conflict close to the front. The shortest
+           non planar prefix is found by exponential and binary search,
+           its last edge belongs to X, and the search is repeated on the
+           edges before it until X alone is not planar. For b edges in X
+           and prefixes of length p this needs O(b log p) tests of size
+           O(b + p).
+        2. The forest is contracted to X, which leaves no vertices of
+           degree one, and split into chains (paths whose inner vertices
+           have degree two). Every chain that can be deleted without
+           making the rest planar is deleted, one test per chain. What
+           remains is an edge minimal non planar graph, which is a
+           Kuratowski subgraph.
+        """
+        planarity_state = self.planarity_state
+        edge_source = planarity_state.edge_source
+        edge_target = planarity_state.edge_target
+        if planarity_state.m > 0 and max(
+                planarity_state.stack_bottom) == NONE:
+            # the conflict of the testing phase narrows the search
+            if planarity_state.lr_testing():
+                raise nx.NetworkXException(
+                    "G is planar - no counter example.")
+        candidates = self.back_edges()
+        entered = sum(1 for e in candidates
+                      if planarity_state.stack_bottom[e] != NONE)
+        if entered < len(candidates) and not self.is_planar(
+                candidates[:entered]):
+            candidates = candidates[:entered]
+        elif self.is_planar(candidates):
+            raise nx.NetworkXException("G is planar - no counter example.")
+
+        # phase 1: a minimal set of back edges
+        essential = []
+        while self.is_planar(essential):
+            low, high, s = 0, len(candidates), 1
+            while s < high:
+                if not self.is_planar(essential + candidates[:s]):
+                    high = s
+                    break
+                low, s = s, 2 * s
+            while high - low > 1:
+                mid = (low + high) // 2
+                if self.is_planar(essential + candidates[:mid]):
+                    low = mid
+                else:
+                    high = mid
+            essential.append(candidates[high - 1])
+            candidates = candidates[:high - 1]
+
+        # the tree paths of the contracted forest
+        edges = list(essential)
+        marked = [v for e in essential
+                  for v in (edge_source[e], edge_target[e])]
+        parent_edge = planarity_state.parent_edge
+        for a, d in self.virtual_tree(marked)[1]:
+            while d != a:
+                e = parent_edge[d]
+                edges.append(e)
+                d = edge_source[e]
+
+        # phase 2: delete the chains that are not needed
+        chains = edge_chains(edge_source, edge_target, edges)
+        keep = [True] * len(chains)
+        for i in range(len(chains)):
+            keep[i] = False
+            pairs = set()
+            for j, (u, v, _) in enumerate(chains):
+                if keep[j] and u != v:
+                    pairs.add((u, v) if u < v else (v, u))
+            index = {}
+            sources = array('i')
+            targets = array('i')
+            for u, v in pairs:
+                sources.append(index.setdefault(u, len(index)))
+                targets.append(index.setdefault(v, len(index)))
+            if _is_planar(len(index), sources, targets):
+                keep[i] = True
+        return [e for j, (_, _, chain) in enumerate(chains) if keep[j]
+                for e in chain]
+
+
+def _is_planar(n, sources, targets):
+    """Run the orientation and testing phase on an edge list"""
+    if n > 2 and len(sources) > 3 * n - 6:
+        return False
+    planarity_state = LRPlanarity.from_csr(
+        *csr_from_edges(n, sources, targets))
+    return planarity_state.lr_testing()
@@ -0,0 +1,179 @@
+"""Read edge list files directly into the arrays of the planarity test
+
+The file is memory-mapped and parsed in chunks into integer arrays, no
+NetworkX graph is built. Every line holds one edge given by two integer
+vertex ids, further columns are ignored. Empty lines, comments starting
+with '#' and lines with a single number (the vertex and edge counts in the
+header of the .pg files used by benchmark.py) are skipped.
+"""
+import mmap
+import re
+from array import array
+from itertools import chain
+
+from planarity_checking.kuratowski import kuratowski_graph
+from planarity_checking.lr_planarity import (LRPlanarity, NONE,
+                                             csr_from_edges)
+
+# the first two columns of a line, if they are integers
+_EDGE = re.compile(br'^[ \t]*(-?\d+)[ \t]+(-?\d+)(?![^\s#])', re.M)
+
+
+def read_edge_arrays(path, chunk_size=1 << 24):
+    """Read an edge list file into two arrays
+
+    Parameters
+    ----------
+    path : str
+        The edge list file
+    chunk_size : int
+        Number of bytes parsed at once
+
+    Returns
+    -------
+    sources, targets : arrays
+        The vertex ids of the endpoints of the edges, in file order
+    """
+    sources = array('l')
+    targets = array('l')
+    with open(path, 'rb') as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return sources, targets  # empty file
+        with data:
+            size = len(data)
+            start = 0
+            while start < size:
+                end = data.find(b'\n', min(start + chunk_size, size) - 1)
+                end = size if end < 0 else end + 1
+                _parse_chunk(data[start:end], sources, targets)
+                start = end
+    return sources, targets
+
+
+def _parse_chunk(chunk, sources, targets):
+    """Append the edges of the complete lines in chunk to the arrays"""
+    ids = array('l', map(int, chain.from_iterable(_EDGE.findall(chunk))))
+    sources.extend(ids[0::2])
+    targets.extend(ids[1::2])
+
+
+def read_csr(path, chunk_size=1 << 24):
+    """Read an edge list file into the CSR arrays of :class:`LRPlanarity`
+
+    Self-loops and multiple edges (also in opposite directions) are
+    removed. The vertices are relabeled to 0, ..., n-1 in increasing order
+    of their ids, only ids that occur in an edge are vertices. The memory
+    needed is linear in the number of edges, also for large or sparse ids.
+
+    Parameters
+    ----------
+    path : str
+        The edge list file
+    chunk_size : int
+        Number of bytes parsed at once
+
+    Returns
+    -------
+    nodes : sequence of int
+        The vertex id of every vertex
+    adj_offsets, adj_targets, adj_edges : arrays
+        The adjacency lists in CSR form
+    """
+    sources, targets = read_edge_arrays(path, chunk_size)
+    if not sources:
+        return range(0), array('i', [0]), array('i'), array('i')
+
+    # relabel the vertex ids, ids that are already 0, ..., n-1 are kept
+    low = min(min(sources), min(targets))
+    high = max(max(sources), max(targets))
+    if high - low >= 2 * len(sources):
+        # sparse ids, e.g. hashes: the range would not fit into memory
+        nodes = array('l', sorted(set(chain(sources, targets))))
+        index = {v: i for i, v in enumerate(nodes)}
+        sources = array('i', (index[v] for v in sources))
+        targets = array('i', (index[v] for v in targets))
+        index = None
+    else:
+        used = bytearray(high - low + 1)
+        for v in sources:
+            used[v - low] = 1
+        for v in targets:
+            used[v - low] = 1
+        if low == 0 and used.count(0) == 0:
+            nodes = range(high + 1)
+            sources = array('i', sources)
+            targets = array('i', targets)
+        else:
+            nodes = array('l', (low + i for i, u in enumerate(used) if u))
+            index = array('i', [NONE]) * len(used)
+            for i, v in enumerate(nodes):
+                index[v - low] = i
+            sources = array('i', (index[v - low] for v in sources))
+            targets = array('i', (index[v - low] for v in targets))
+        used = index = None
+    n = len(nodes)
+
+    adj_offsets, adj_targets, adj_edges = csr_from_edges(n, sources,
+                                                         targets)
+    # keep the copy of every edge with the smallest id, a mark per vertex
+    # finds the repeated neighbors in every adjacency list
+    m = len(sources)
+    keep = bytearray(b'\x01') * m
+    mark = array('i', [NONE]) * n
+    first = array('i', [NONE]) * n
+    for v in range(n):
+        for i in range(adj_offsets[v], adj_offsets[v + 1]):
+            w = adj_targets[i]
+            e = adj_edges[i]
+            if w == v:
+                keep[e] = 0
+            elif mark[w] != v:
+                mark[w] = v
+                first[w] = e
+            elif e < first[w]:
+                keep[first[w]] = 0
+                first[w] = e
+            else:
+                keep[e] = 0
+    mark = first = None
+    if keep.count(0):
+        sources = array('i', (v for v, k in zip(sources, keep) if k))
+        targets = array('i', (w for w, k in zip(targets, keep) if k))
+        adj_offsets, adj_targets, adj_edges = csr_from_edges(n, sources,
+                                                             targets)
+    return nodes, adj_offsets, adj_targets, adj_edges
+
+
+def check_planarity_file(path, counterexample=False, compact=False,
+                         chunk_size=1 << 24):
+    """Checks planarity of the graph in an edge list file
+
+    Parameters
+    ----------
+    path : str
+        The edge list file, see :func:`read_csr`
+    counterexample : bool
+        A Kuratowski subgraph is returned for non planar graphs if set to
+        true.
+    compact : bool
+        If set, the embedding is returned as :class:`RotationSystem`
+    chunk_size : int
+        Number of bytes parsed at once
+
+    Returns
+    -------
+    is_planar, certificate :
+        See :func:`check_planarity`. The node labels are the integer vertex
+        ids of the file.
+    """
+    nodes, adj_offsets, adj_targets, adj_edges = read_csr(path, chunk_size)
+    planarity_state = LRPlanarity.from_csr(adj_offsets, adj_targets,
+                                           adj_edges, nodes)
+    embedding = planarity_state.lr_planarity(compact)
+    if embedding is not None:
+        return True, embedding
+    if not counterexample:
+        return False, None
+    return False, kuratowski_graph(planarity_state)
@@ -1,8 +1,14 @@
-from collections import defaultdict
+from array import array
+from contextlib import nullcontext
+from itertools import chain
 import networkx as nx
 
+# marks a missing edge or vertex in the integer arrays of LRPlanarity
+NONE = -1
 
-def check_planarity(G, counterexample=False):
+
+def check_planarity(G, counterexample=False, compact=False, stats=None,
+                    dfs_index=False):
     """Checks if a graph is planar and returns a counter example or an embedding
 
      A graph is said to be planar, if it can be drawn in the plane without
@@ -14,6 +20,14 @@ def check_planarity(G, counterexample=False):
     counterexample : bool
         A Kuratowski subgraph (to proof non planarity) is only returned if set
         to true
+    compact : bool
+        If set, the embedding is returned as :class:`RotationSystem` instead
+        of a dict
+    stats : PlanarityStats, optional
+        Records the time of every phase and counters of the test, see
+        :class:`planarity_checking.stats.PlanarityStats`
+    dfs_index : bool
+        If set, the DFS tree of the test is returned as third value
 
     Returns
     -------
@@ -21,10 +35,16 @@ def check_planarity(G, counterexample=False):
         Is true if the graph is planar
 
     certificate :
-        If the graph is planar this is a planar embedding (dict).
+        If the graph is planar this is a planar embedding (dict, or
+        RotationSystem if compact is set).
         If the graph is not planar and counterexample is true,
         this is a Kuratowski subgraph.
 
+    index : DFSIndex
+        Only returned if dfs_index is set. The DFS tree with heights,
+        parent edges and lowpoints, which gives the blocks, cut vertices
+        and bridges of G in linear time.
+
     Notes
     -----
     A (combinatorial) embedding consists of cyclic orderings of the incident
@@ -36,7 +56,8 @@ def check_planarity(G, counterexample=False):
     is based on the Left-Right Planarity Test [1].
 
     A counterexample is only generated if the corresponding parameter is set,
-    because the complexity of the counterexample generation is higher.
+    because the complexity of the counterexample generation is higher. It
+    reuses the DFS tree of the failed test, see :func:`get_counterexample`.
 
     References
     ----------
@@ -50,17 +71,22 @@ def check_planarity(G, counterexample=False):
         2004
     """
 
-    planarity_state = LRPlanarity(G)
-    embedding = planarity_state.lr_planarity()
+    planarity_state = LRPlanarity(G, stats)
+    embedding = planarity_state.lr_planarity(compact)
     if embedding is None:
         # graph is not planar
         if counterexample:
-            return False, get_counterexample(G)
+            from planarity_checking.kuratowski import kuratowski_graph
+            with planarity_state.phase('counterexample'):
+                result = False, kuratowski_graph(planarity_state)
         else:
-            return False, None
+            result = False, None
     else:
         # graph is planar
-        return True, embedding
+        result = True, embedding
+    if dfs_index:
+        return result + (planarity_state.get_dfs_index(),)
+    return result
 
 
 def get_counterexample(G):
@@ -68,10 +94,6 @@ def get_counterexample(G):
 
     Raises nx.NetworkXException if G is planar.
 
-    The function removes edges such that the graph is still not planar.
-    At some point the removal of any edge would make the graph planar.
-    This subgraph must be a Kuratowski subgraph.
-
     Parameters
     ----------
     G : NetworkX graph
@@ -79,332 +101,1085 @@ def get_counterexample(G):
     Returns
     -------
     subgraph : NetworkX graph
-        A Kuratowski subgraph that proves that G is not planar.
+        A Kuratowski subgraph that proves that G is not planar. It is a
+        subdivision of K5 or K3,3, the type is stored as ``'K5'`` or
+        ``'K3,3'`` in ``subgraph.graph['kuratowski_type']``.
 
+    Notes
+    -----
+    The LR test is run once on G. Its DFS tree is indexed in O(n) time
+    and the subgraph is found by planarity tests of the tree together with
+    subsets of the back edges, which run on the tree contracted to the
+    endpoints of these edges (see
+    :class:`planarity_checking.kuratowski.TreeContraction`). For b back
+    edges in the result, O(b log m) such tests are needed, each on
+    O(b + p) edges where p is the length of the tested prefix of the back
+    edges (ordered by return points, the ones seen by the failed test
+    first), plus one test per path of the result. In the worst case the
+    prefixes are long and this is O(b m log m) time, typically the
+    extraction costs a few times a single test of G.
     """
-    # copy graph
-    G = nx.Graph(G)
-
-    if check_planarity(G)[0]:
-        raise nx.NetworkXException("G is planar - no counter example.")
+    from planarity_checking.kuratowski import kuratowski_graph
+    return kuratowski_graph(LRPlanarity(G))
 
-    # find Kuratowski subgraph
-    subgraph = nx.Graph()
-    for u in G:
-        nbrs = list(G[u])
-        for v in nbrs:
-            G.remove_edge(u, v)
-            if check_planarity(G)[0]:
-                G.add_edge(u, v)
-                subgraph.add_edge(u, v)
 
-    return subgraph
+def kuratowski_subgraph(nodes, edges):
+    """Obtains a Kuratowski subgraph of a graph given by an edge list
 
+    Parameters
+    ----------
+    nodes : sequence
+        The node labels
+    edges : list of tuples
+        The edges (i, j) as indices into nodes, without self-loops and
+        multiple edges
 
-class Interval(object):
-    """Represents a set of return edges
-
-    All return edges in an interval induce a same constraint on the contained
-    edges, which means that all edges must either have a left orientation or
-    all edges must have a right orientation.
+    Returns
+    -------
+    subgraph : NetworkX graph
+        A Kuratowski subgraph, see :func:`get_counterexample`.
     """
-    def __init__(self, low=None, high=None):
-        self.low = low
-        self.high = high
+    from planarity_checking.kuratowski import kuratowski_graph
+    sources = array('i', (u for u, v in edges))
+    targets = array('i', (v for u, v in edges))
+    return kuratowski_graph(LRPlanarity.from_csr(
+        *csr_from_edges(len(nodes), sources, targets), nodes=nodes))
 
-    def empty(self):
-        """Check if the interval is empty"""
-        return self.low is None and self.high is None
 
-    def copy(self):
-        """Return a copy of this interval"""
-        return Interval(self.low, self.high)
+def csr_from_edges(n, sources, targets):
+    """Build the CSR adjacency arrays of a graph given by its edge list
 
-    def conflicting(self, b, planarity_state):
-        """Return True if interval I conflicts with edge b"""
-        return (not self.empty() and
-                planarity_state.lowpt[self.high] > planarity_state.lowpt[b])
-
-
-class ConflictPair(object):
-    """Represents a different constraint between two intervals
+    Parameters
+    ----------
+    n : int
+        Number of nodes, the nodes are 0, ..., n-1
+    sources, targets : sequences of int
+        Edge i is (sources[i], targets[i]) and gets the id i. Self-loops and
+        multiple edges must not be contained.
 
-    The edges in the left interval must have a different orientation than
-    the one in the right interval.
+    Returns
+    -------
+    adj_offsets, adj_targets, adj_edges : arrays
+        The adjacency lists in CSR form, see :class:`LRPlanarity`.
     """
-    def __init__(self, left=Interval(), right=Interval()):
-        self.left = left
-        self.right = right
-
-    def swap(self):
-        """Swap left and right intervals"""
-        temp = self.left
-        self.left = self.right
-        self.right = temp
-
-    def lowest(self, planarity_state):
-        """Return the lowest lowpoint of a conflict pair"""
-        if self.left.empty():
-            return planarity_state.lowpt[self.right.low]
-        if self.right.empty():
-            return planarity_state.lowpt[self.left.low]
-        return min(planarity_state.lowpt[self.left.low],
-                   planarity_state.lowpt[self.right.low])
-
+    m = len(sources)
+    adj_offsets = array('i', [0]) * (n + 1)
+    for v in sources:
+        adj_offsets[v + 1] += 1
+    for v in targets:
+        adj_offsets[v + 1] += 1
+    for v in range(n):
+        adj_offsets[v + 1] += adj_offsets[v]
+    adj_targets = array('i', [NONE]) * (2 * m)
+    adj_edges = array('i', [NONE]) * (2 * m)
+    pos = adj_offsets[:-1]
+    for e in range(m):
+        v, w = sources[e], targets[e]
+        adj_targets[pos[v]] = w
+        adj_edges[pos[v]] = e
+        pos[v] += 1
+        adj_targets[pos[w]] = v
+        adj_edges[pos[w]] = e
+        pos[w] += 1
+    return adj_offsets, adj_targets, adj_edges
+
+
+def csr_with_edge(adj_offsets, adj_targets, adj_edges, v, w):
+    """Return the CSR adjacency arrays with the new edge (v, w) added
+
+    The edge gets the id m and is appended to the adjacency lists of v and
+    w. The given arrays are not changed.
+    """
+    m = len(adj_edges) // 2
+    adj_offsets = array('i', (offset + (i > v) + (i > w)
+                              for i, offset in enumerate(adj_offsets)))
+    (i, x), (j, y) = sorted(((adj_offsets[v + 1] - 1, w),
+                             (adj_offsets[w + 1] - 1, v)))
+    # the positions are those in the new arrays
+    j -= 1
+    adj_targets = (adj_targets[:i] + array('i', [x]) + adj_targets[i:j] +
+                   array('i', [y]) + adj_targets[j:])
+    adj_edges = (adj_edges[:i] + array('i', [m]) + adj_edges[i:j] +
+                 array('i', [m]) + adj_edges[j:])
+    return adj_offsets, adj_targets, adj_edges
+
+
+def csr_from_graph(G):
+    """Build the CSR adjacency arrays of a NetworkX graph
+
+    The nodes are relabeled to 0, ..., n-1 in the order of G, self-loops and
+    multiple edges are left out and directed graphs are treated as
+    undirected.
 
-def top_of_stack(l):
-    """Returns the element on top of the stack."""
-    if not l:
-        return None
-    return l[-1]
+    Returns
+    -------
+    nodes : list
+        The node labels
+    adj_offsets, adj_targets, adj_edges : arrays
+        The adjacency lists in CSR form, see :class:`LRPlanarity`.
+    """
+    if G.is_directed():
+        # undirected view without copying the graph
+        G = G.to_undirected(as_view=True)
+    adj = G.adj
+
+    # relabel the nodes to 0, ..., n-1
+    nodes = list(G)
+    index = {v: i for i, v in enumerate(nodes)}
+    n = len(nodes)
+
+    # adjacency lists in CSR form, self-loops are left out
+    adj_offsets = array('i', [0]) * (n + 1)
+    for i, v in enumerate(nodes):
+        nbrs = adj[v]
+        adj_offsets[i + 1] = adj_offsets[i] + len(nbrs) - (v in nbrs)
+    m = adj_offsets[n] // 2
+    adj_targets = array('i', [NONE]) * (2 * m)
+    adj_edges = array('i', [NONE]) * (2 * m)
+    # every edge gets its id when it is seen from its first endpoint
+    pos = adj_offsets[:-1]
+    e = 0
+    for i, v in enumerate(nodes):
+        for w in adj[v]:
+            j = index[w]
+            if j <= i:
+                continue  # self-loop or edge already seen from w
+            adj_targets[pos[i]] = j
+            adj_edges[pos[i]] = e
+            pos[i] += 1
+            adj_targets[pos[j]] = i
+            adj_edges[pos[j]] = e
+            pos[j] += 1
+            e += 1
+    return nodes, adj_offsets, adj_targets, adj_edges
+
+
+class RotationSystem(object):
+    """A combinatorial embedding stored in flat integer arrays
+
+    The vertices are 0, ..., n-1 and ``nodes[v]`` is the label of v. The
+    half-edges leaving v are the positions ``offsets[v]``, ...,
+    ``offsets[v + 1] - 1`` in clockwise order. The half-edge at position i
+    points to the vertex ``targets[i]`` and ``twin[i]`` is the position of
+    the opposite half-edge.
+
+    The arrays are of type ``array('i')`` and support the buffer protocol,
+    e.g. ``numpy.frombuffer(rotation_system.targets, dtype=numpy.intc)``
+    gives a NumPy view without a copy.
+    """
+    def __init__(self, nodes, offsets, targets, twin):
+        self.nodes = nodes
+        self.offsets = offsets
+        self.targets = targets
+        self.twin = twin
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def number_of_edges(self):
+        """Return the number of (undirected) edges"""
+        return len(self.targets) // 2
+
+    def sources(self):
+        """Return an array with the start vertex of every half-edge"""
+        sources = array('i', [NONE]) * len(self.targets)
+        offsets = self.offsets
+        for v in range(len(offsets) - 1):
+            for i in range(offsets[v], offsets[v + 1]):
+                sources[i] = v
+        return sources
+
+    def face_next(self):
+        """Return an array with the next half-edge on the face of each one
+
+        As in :meth:`nx.PlanarEmbedding.traverse_face`, the half-edge
+        (v, w) is followed by (w, x) where x is the neighbor of w before v
+        in clockwise order.
+        """
+        offsets, targets, twin = self.offsets, self.targets, self.twin
+        face_next = array('i', [NONE]) * len(targets)
+        for i, w in enumerate(targets):
+            j = twin[i]
+            face_next[i] = j - 1 if j > offsets[w] else offsets[w + 1] - 1
+        return face_next
+
+    def to_dict(self):
+        """Return the embedding as dict in the format of check_planarity"""
+        nodes, offsets, targets = self.nodes, self.offsets, self.targets
+        return {nodes[v]: [nodes[w] for w in
+                           targets[offsets[v]:offsets[v + 1]]]
+                for v in range(len(offsets) - 1)}
+
+    def to_planar_embedding(self):
+        """Return the embedding as :class:`nx.PlanarEmbedding`
+
+        The half-edges are added in bulk with their 'cw' and 'ccw'
+        attributes instead of one insertion per half-edge.
+        """
+        nodes, offsets, targets = self.nodes, self.offsets, self.targets
+        embedding = nx.PlanarEmbedding()
+        embedding.add_nodes_from(nodes)
+
+        def half_edges():
+            for v in range(len(offsets) - 1):
+                nbrs = [nodes[w] for w in targets[offsets[v]:offsets[v + 1]]]
+                d = len(nbrs)
+                # the first neighbor is added last, PlanarEmbedding starts
+                # the clockwise order at the last neighbor in the adjacency
+                for k in range(1 - d, 1):
+                    yield (nodes[v], nbrs[k],
+                           {'cw': nbrs[(k + 1) % d], 'ccw': nbrs[k - 1]})
+        # PlanarEmbedding only allows single half-edge insertions
+        nx.DiGraph.add_edges_from(embedding, half_edges())
+        return embedding
 
 
 class LRPlanarity(object):
-    """A class to maintain the state during planarity check"""
-    def __init__(self, G):
-        # copy G without adding self-loops
-        self.G = nx.Graph()
-        self.G.add_nodes_from(G.nodes)
-        for v, w in G.edges:
-            if v != w:
-                self.G.add_edge(v, w)
+    """A class to maintain the state during planarity check
+
+    The vertices are relabeled to 0, ..., n-1 and the graph is stored in
+    compressed sparse row (CSR) form: the neighbors of vertex v are
+    ``adj_targets[adj_offsets[v]:adj_offsets[v + 1]]`` and
+    ``adj_edges`` holds the ids of the corresponding edges. Every edge has
+    an integer id in 0, ..., m-1, which is kept when the edge is oriented.
+    All per vertex and per edge state is stored in arrays indexed by these
+    ids, NONE marks a missing vertex or edge.
+
+    If a :class:`planarity_checking.stats.PlanarityStats` object is given as
+    stats, the phases are timed and counters are recorded. Otherwise only
+    a check per phase and per call of the stack operations is added.
+    """
+    def __init__(self, G, stats=None):
+        self.stats = stats
+        with self.phase('copy'):
+            nodes, adj_offsets, adj_targets, adj_edges = csr_from_graph(G)
+            self.init_state(nodes, adj_offsets, adj_targets, adj_edges)
+
+    @classmethod
+    def from_csr(cls, adj_offsets, adj_targets, adj_edges, nodes=None,
+                 stats=None):
+        """Create the planarity state for a graph given in CSR form
+
+        Parameters
+        ----------
+        adj_offsets, adj_targets, adj_edges : arrays
+            The adjacency lists in CSR form, see :class:`LRPlanarity`. Every
+            edge id in 0, ..., m-1 appears exactly twice in adj_edges and
+            there are no self-loops.
+        nodes : sequence, optional
+            The node labels used in the embedding, default 0, ..., n-1.
+        stats : PlanarityStats, optional
+            Records the phases and counters of the test
+        """
+        planarity_state = cls.__new__(cls)
+        planarity_state.stats = stats
+        if nodes is None:
+            nodes = range(len(adj_offsets) - 1)
+        with planarity_state.phase('copy'):
+            planarity_state.init_state(nodes, adj_offsets, adj_targets,
+                                       adj_edges)
+        return planarity_state
+
+    def init_state(self, nodes, adj_offsets, adj_targets, adj_edges):
+        """Store the graph and allocate the state arrays"""
+        self.nodes = nodes
+        self.n = n = len(adj_offsets) - 1
+        self.m = m = len(adj_edges) // 2
+        self.adj_offsets = adj_offsets
+        self.adj_targets = adj_targets
+        self.adj_edges = adj_edges
 
         self.roots = []
 
         # distance from tree root
-        self.height = defaultdict(lambda: None)
-
-        self.lowpt = {}  # height of lowest return point of an edge
-        self.lowpt2 = {}  # height of second lowest return point
-        self.nesting_depth = {}  # for nesting order
-
-        # None -> missing edge
-        self.parent_edge = defaultdict(lambda: None)
-
-        # oriented DFS graph
-        self.DG = nx.DiGraph()
-        self.DG.add_nodes_from(G.nodes)
-
-        self.ordered_adjs = {}
-
-        self.ref = defaultdict(lambda: None)
-        self.side = defaultdict(lambda: 1)
+        self.height = array('i', [NONE]) * n
+
+        # orientation of the edges, NONE -> edge not yet oriented
+        self.edge_source = array('i', [NONE]) * m
+        self.edge_target = array('i', [NONE]) * m
+
+        self.lowpt = array('i', [0]) * m  # height of lowest return point
+        self.lowpt2 = array('i', [0]) * m  # height of second lowest ret. point
+        self.nesting_depth = array('i', [0]) * m  # for nesting order
+
+        # NONE -> missing edge
+        self.parent_edge = array('i', [NONE]) * n
+
+        # outgoing edges ordered by nesting depth (CSR form)
+        self.ordered_offsets = None
+        self.ordered_edges = None
+
+        self.ref = array('i', [NONE]) * m
+        self.side = array('b', [1]) * m
+
+        # stack of conflict pairs in parallel arrays: pair k consists of the
+        # intervals of return edges from left_low[k] to left_high[k] and
+        # from right_low[k] to right_high[k], an empty interval has both
+        # bounds set to NONE. Every back edge pushes at most one pair.
+        self.left_low = array('i', [NONE]) * m
+        self.left_high = array('i', [NONE]) * m
+        self.right_low = array('i', [NONE]) * m
+        self.right_high = array('i', [NONE]) * m
+        self.stack_height = 0
+        # height of the stack of conflict pairs when an edge is entered,
+        # NONE -> the testing phase has not entered the edge (yet)
+        self.stack_bottom = array('i', [NONE]) * m
+        self.lowpt_edge = array('i', [NONE]) * m
+
+        # the embedding is a rotation system on half-edges: 2 * e is the
+        # half-edge of the oriented edge e at its source, 2 * e + 1 the one
+        # at its target. The half-edges at a vertex form a cyclic doubly
+        # linked list starting at rot_first.
+        self.rot_first = array('i', [NONE]) * n
+        self.rot_next = array('i', [NONE]) * (2 * m)
+        self.rot_prev = array('i', [NONE]) * (2 * m)
+
+        # leftmost and rightmost half-edge at a vertex placed so far
+        self.left_ref = array('i', [NONE]) * n
+        self.right_ref = array('i', [NONE]) * n
+
+        # position of the next edge to handle in the adjacency list of each
+        # node during the iterative DFS traversals, shared by all DFS roots
+        self.ind = None
+
+    def lr_planarity(self, compact=False):
+        """Execute the LR planarity test
+
+        Parameters
+        ----------
+        compact : bool
+            If set, the embedding is returned as :class:`RotationSystem`
+
+        Returns
+        -------
+        embedding : dict or RotationSystem
+            If the graph is planar an embedding is returned. Otherwise None.
+        """
+        if self.n > 2 and self.m > 3 * self.n - 6:
+            # graph is not planar
+            return None
 
-        # stack of conflict pairs
-        self.S = []
-        self.stack_bottom = {}
-        self.lowpt_edge = {}
+        if not self.lr_testing():
+            return None
 
-        self.left_ref = {}
-        self.right_ref = {}
+        with self.phase('sign'):
+            for e in range(self.m):
+                self.nesting_depth[e] = self.sign(e) * self.nesting_depth[e]
+        # sort the adjacency lists again
+        with self.phase('sorting'):
+            self.sort_adjacency_lists()
 
-        self.embedding = defaultdict(lambda: [])
+        # compute the complete embedding
+        with self.phase('embedding'):
+            self.init_embedding()
+            self.ind = self.ordered_offsets[:-1]
+            for v in self.roots:
+                self.dfs_embedding(v)
+
+        with self.phase('output'):
+            if compact:
+                return self.get_rotation_system()
+            return self.get_embedding()
+
+    def lr_testing(self):
+        """Orient the graph and test for an LR partition
+
+        This runs the orientation and the testing phase, but does not
+        compute an embedding. Adjacency lists that are already sorted,
+        e.g. by :meth:`with_back_edge`, are not sorted again.
+
+        Returns
+        -------
+        Returns True if the graph is planar, False otherwise.
+        """
+        # orientation of the graph by depth first search traversal
+        with self.phase('orientation'):
+            self.lr_orientation()
+        if self.stats is not None:
+            tree_edges = self.n - len(self.roots)
+            self.stats.count('tree_edges', tree_edges)
+            self.stats.count('back_edges', self.m - tree_edges)
 
-    def lr_planarity(self):
-        if self.G.order() > 2 and self.G.size() > 3 * self.G.order() - 6:
-            # graph is not planar
-            return None
+        # testing
+        if self.ordered_offsets is None:
+            with self.phase('sorting'):
+                self.sort_adjacency_lists()  # sort by nesting depth
+        with self.phase('testing'):
+            self.ind = self.ordered_offsets[:-1]
+            for v in self.roots:
+                if not self.dfs_testing(v):
+                    return False
+        return True
 
-        # orientation of the graph by depth first search traversal
-        for v in self.G:
-            if self.height[v] is None:
+    def phase(self, name):
+        """Return a context manager that records a phase in the stats
+
+        Without stats nothing is recorded.
+        """
+        if self.stats is None:
+            return nullcontext()
+        return self.stats.phase(name)
+
+    def lr_orientation(self, root=0):
+        """Orient the graph by DFS traversals from all roots
+
+        Computes heights, parent edges, lowpoints and nesting depths.
+
+        Parameters
+        ----------
+        root : int
+            The vertex the first DFS traversal starts from, the others
+            start from the unvisited vertices in the order of their ids.
+        """
+        self.ind = self.adj_offsets[:-1]
+        vertices = range(self.n)
+        if root:
+            vertices = chain([root], vertices)
+        for v in vertices:
+            if self.height[v] == NONE:
                 self.height[v] = 0
                 self.roots.append(v)
                 self.dfs_orientation(v)
 
-        self.G = None  # just unsetting this for correctness purposes
-
-        # testing
-        for v in self.DG:  # sort the adjacency lists by nesting depth
-            # note: this sorting leads to non linear time
-            self.ordered_adjs[v] = sorted(
-                self.DG[v], key=lambda w: self.nesting_depth[(v, w)])
-        for v in self.roots:
-            if not self.dfs_testing(v):
-                return None
-
-        for e in self.DG.edges:
-            self.nesting_depth[e] = self.sign(e) * self.nesting_depth[e]
-        for v in self.DG:
-            # sort the adjacency lists again
-            self.ordered_adjs[v] = sorted(
-                self.DG[v], key=lambda w: self.nesting_depth[(v, w)])
-            # initialize the embedding
-            self.embedding[v] = self.ordered_adjs[v].copy()
-
-        # compute the complete embedding
-        for v in self.roots:
-            self.dfs_embedding(v)
+    def biconnected_blocks(self):
+        """Assign the edges to the biconnected components (blocks)
+
+        Uses the state of the orientation phase, see
+        :meth:`DFSIndex.edge_blocks`.
+
+        Returns
+        -------
+        edge_block : array
+            The block id of every edge
+        num_blocks : int
+            The number of blocks
+        """
+        return self.get_dfs_index().edge_blocks()
+
+    def get_dfs_index(self):
+        """Return the DFS tree of the orientation phase as :class:`DFSIndex`
+
+        The orientation phase is run first if it has not been run yet. The
+        arrays are shared with the planarity state, not copied.
+        """
+        from planarity_checking.dfs_index import DFSIndex
+        if self.n > 0 and self.height[0] == NONE:
+            with self.phase('orientation'):
+                self.lr_orientation()
+        return DFSIndex(self.nodes, self.roots, self.height,
+                        self.parent_edge, self.edge_source, self.edge_target,
+                        self.lowpt, self.lowpt2)
+
+    def without_back_edges(self, edges):
+        """Return the planarity state of the graph without some back edges
+
+        The DFS tree of the orientation phase stays a DFS tree when back
+        edges are deleted, so the orientation is reused: only the lowpoints
+        and nesting depths of the tree edges between the endpoints of a
+        deleted back edge change and are recomputed. The new state is
+        oriented, :meth:`lr_testing` runs only the sorting and testing
+        phase. The edge ids are kept, the deleted edges are left out of the
+        adjacency lists of the testing phase.
+
+        Parameters
+        ----------
+        edges : iterable of int
+            Ids of back edges. The state must be oriented and no embedding
+            must have been computed, a failed test is fine.
+
+        Returns
+        -------
+        planarity_state : LRPlanarity
+        """
+        planarity_state = LRPlanarity.from_csr(
+            self.adj_offsets, self.adj_targets, self.adj_edges, self.nodes)
+        planarity_state.roots = list(self.roots)
+        planarity_state.height = height = self.height
+        planarity_state.parent_edge = parent_edge = self.parent_edge
+        planarity_state.edge_target = self.edge_target
+        planarity_state.edge_source = edge_source = array('i',
+                                                          self.edge_source)
+        planarity_state.lowpt = array('i', self.lowpt)
+        planarity_state.lowpt2 = array('i', self.lowpt2)
+        planarity_state.nesting_depth = array('i', self.nesting_depth)
+
+        # the tree edges from the source of a deleted edge up to its target
+        affected = []
+        reached = {}  # lowest target height walked to from a vertex
+        for e in edges:
+            v, h = edge_source[e], height[self.edge_target[e]]
+            edge_source[e] = NONE
+            while height[v] > h and reached.get(v, height[v]) > h:
+                reached[v] = h
+                affected.append(parent_edge[v])
+                v = edge_source[parent_edge[v]]
+
+        # recompute them bottom up from the remaining outgoing edges
+        lowpt, lowpt2 = planarity_state.lowpt, planarity_state.lowpt2
+        adj_offsets, adj_edges = self.adj_offsets, self.adj_edges
+        for e in sorted(set(affected), key=lambda e: -height[edge_source[e]]):
+            u, v = edge_source[e], self.edge_target[e]
+            lowpt[e] = lowpt2[e] = height[u]
+            for i in range(adj_offsets[v], adj_offsets[v + 1]):
+                f = adj_edges[i]
+                if edge_source[f] == v:
+                    planarity_state.update_lowpoints(e, f)
+            planarity_state.nesting_depth[e] = 2 * lowpt[e] + (
+                lowpt2[e] < height[u])
+        return planarity_state
+
+    def with_back_edge(self, v, w):
+        """Return the planarity state of the graph with the edge (v, w)
+
+        If w is an ancestor of v in the DFS tree of the orientation phase,
+        the tree stays a DFS tree with (v, w) as new back edge, so the
+        orientation is reused as in :meth:`without_back_edges`: only the
+        lowpoints and nesting depths of the tree edges from v up to w
+        change. The new edge gets the id m. If the adjacency lists of the
+        state are sorted by nesting depth, only those of the vertices on
+        the path are sorted again.
+
+        Parameters
+        ----------
+        v, w : int
+            Vertices that are not adjacent. The state must be oriented and
+            no embedding must have been computed.
+
+        Returns
+        -------
+        planarity_state : LRPlanarity or None
+            The oriented state, None if w is not an ancestor of v
+        """
+        height, parent_edge = self.height, self.parent_edge
+        edge_source = self.edge_source
+        path = []
+        x = v
+        while height[x] > height[w]:
+            path.append(parent_edge[x])
+            x = edge_source[parent_edge[x]]
+        if x != w:
+            return None
 
-        return dict(self.embedding)
+        planarity_state = LRPlanarity.from_csr(
+            *csr_with_edge(self.adj_offsets, self.adj_targets,
+                           self.adj_edges, v, w), nodes=self.nodes)
+        planarity_state.roots = list(self.roots)
+        planarity_state.height = height
+        planarity_state.parent_edge = parent_edge
+        planarity_state.edge_source = edge_source + array('i', [v])
+        planarity_state.edge_target = self.edge_target + array('i', [w])
+        lowpt = planarity_state.lowpt = self.lowpt + array('i', [height[w]])
+        lowpt2 = planarity_state.lowpt2 = self.lowpt2 + array('i',
+                                                              [height[v]])
+        nesting_depth = planarity_state.nesting_depth = \
+            self.nesting_depth + array('i', [2 * height[w]])
+
+        # the new return point is folded into the lowpoints of the path
+        vw = self.m
+        for e in path:
+            planarity_state.update_lowpoints(e, vw)
+            nesting_depth[e] = 2 * lowpt[e] + (
+                lowpt2[e] < height[edge_source[e]])
+
+        if self.ordered_offsets is not None:
+            ordered_offsets = array('i', (
+                offset + (x > v)
+                for x, offset in enumerate(self.ordered_offsets)))
+            i = self.ordered_offsets[v + 1]
+            ordered_edges = (self.ordered_edges[:i] + array('i', [vw]) +
+                             self.ordered_edges[i:])
+            for x in set([v]).union(edge_source[e] for e in path):
+                i, j = ordered_offsets[x], ordered_offsets[x + 1]
+                ordered_edges[i:j] = array('i', sorted(
+                    ordered_edges[i:j], key=nesting_depth.__getitem__))
+            planarity_state.ordered_offsets = ordered_offsets
+            planarity_state.ordered_edges = ordered_edges
+        return planarity_state
+
+    def sort_adjacency_lists(self):
+        """Order the outgoing edges of every vertex by nesting depth
+
+        The nesting depths are integers in a range of size O(n) (between
+        -2n-1 and 2n+1 after the signs are applied), so all adjacency lists
+        are ordered at once by a single bucket sort in O(n+m) time. The sort
+        is stable, i.e. edges with the same nesting depth keep the order of
+        the adjacency lists of the graph.
+
+        The result is stored in CSR form: the outgoing edges of vertex v are
+        ``ordered_edges[ordered_offsets[v]:ordered_offsets[v + 1]]``.
+        """
+        n, m = self.n, self.m
+        self.ordered_offsets = array('i', [0]) * (n + 1)
+        self.ordered_edges = array('i', [NONE]) * m
+        if m == 0:
+            return
+
+        # outgoing edges in the order of the adjacency lists
+        out_edges = array('i')
+        for v in range(n):
+            for i in range(self.adj_offsets[v], self.adj_offsets[v + 1]):
+                e = self.adj_edges[i]
+                if self.edge_source[e] == v:
+                    out_edges.append(e)
+                    self.ordered_offsets[v + 1] += 1
+        for v in range(n):
+            self.ordered_offsets[v + 1] += self.ordered_offsets[v]
+
+        # bucket sort by nesting depth
+        low = min(self.nesting_depth)
+        bucket_offsets = array('i', [0]) * (max(self.nesting_depth) - low + 2)
+        for e in out_edges:
+            bucket_offsets[self.nesting_depth[e] - low + 1] += 1
+        for i in range(len(bucket_offsets) - 1):
+            bucket_offsets[i + 1] += bucket_offsets[i]
+        sorted_edges = array('i', [NONE]) * len(out_edges)
+        for e in out_edges:
+            i = self.nesting_depth[e] - low
+            sorted_edges[bucket_offsets[i]] = e
+            bucket_offsets[i] += 1
+
+        # distribute the sorted edges to the adjacency lists
+        pos = self.ordered_offsets[:-1]
+        for e in sorted_edges:
+            v = self.edge_source[e]
+            self.ordered_edges[pos[v]] = e
+            pos[v] += 1
 
     # orient the graph by DFS-traversal, compute lowpoints and nesting order
     def dfs_orientation(self, v):
-        e = self.parent_edge[v]
-        for w in self.G[v]:
-            if (v, w) in self.DG.edges or (w, v) in self.DG.edges:
-                continue  # the edge was already oriented
-            vw = (v, w)
-            self.DG.add_edge(v, w)  # orient the edge
-
-            self.lowpt[vw] = self.height[v]
-            self.lowpt2[vw] = self.height[v]
-            if self.height[w] is None:  # (v, w) is a tree edge
-                self.parent_edge[w] = vw
-                self.height[w] = self.height[v] + 1
-                self.dfs_orientation(w)
-            else:  # (v, w) is a back edge
-                self.lowpt[vw] = self.height[w]
-
-            # determine nesting graph
-            self.nesting_depth[vw] = 2 * self.lowpt[vw]
-            if self.lowpt2[vw] < self.height[v]:  # chordal
-                self.nesting_depth[vw] += 1
-
-            # update lowpoints of parent edge e
-            if e is not None:
-                if self.lowpt[vw] < self.lowpt[e]:
-                    self.lowpt2[e] = min(self.lowpt[e], self.lowpt2[vw])
-                    self.lowpt[e] = self.lowpt[vw]
-                elif self.lowpt[vw] > self.lowpt[e]:
-                    self.lowpt2[e] = min(self.lowpt2[e], self.lowpt[vw])
-                else:
-                    self.lowpt2[e] = min(self.lowpt2[e], self.lowpt2[vw])
+        """Orient the graph by an iterative DFS traversal
+
+        Every vertex on the DFS path keeps a frame on the explicit stack.
+        The position of the next incidence to handle is stored in ``ind``,
+        so that the work for an edge is split into the part before descending
+        into a tree edge and the part after returning from it.
+        """
+        # the recursion stack
+        dfs_stack = [v]
+        # position of next edge to handle in adjacency list of each node
+        ind = self.ind
+        # the edge at ind[v] is a tree edge whose subtree was finished
+        returned = False
+
+        while dfs_stack:
+            v = dfs_stack.pop()
+            e = self.parent_edge[v]
+            end = self.adj_offsets[v + 1]
+
+            while ind[v] < end:
+                vw = self.adj_edges[ind[v]]
+
+                if not returned:
+                    if self.edge_source[vw] != NONE:
+                        ind[v] += 1
+                        continue  # the edge was already oriented
+
+                    w = self.adj_targets[ind[v]]
+                    self.edge_source[vw] = v  # orient the edge
+                    self.edge_target[vw] = w
+
+                    self.lowpt[vw] = self.height[v]
+                    self.lowpt2[vw] = self.height[v]
+                    if self.height[w] == NONE:  # (v, w) is a tree edge
+                        self.parent_edge[w] = vw
+                        self.height[w] = self.height[v] + 1
+
+                        dfs_stack.append(v)  # revisit v after finishing w
+                        dfs_stack.append(w)  # visit w next
+                        break  # handle next node in dfs_stack (i.e. w)
+                    else:  # (v, w) is a back edge
+                        self.lowpt[vw] = self.height[w]
+                returned = False
+
+                # determine nesting graph
+                self.nesting_depth[vw] = 2 * self.lowpt[vw]
+                if self.lowpt2[vw] < self.height[v]:  # chordal
+                    self.nesting_depth[vw] += 1
+
+                # update lowpoints of parent edge e
+                if e != NONE:
+                    self.update_lowpoints(e, vw)
+
+                ind[v] += 1
+            else:
+                # v is finished, continue with the tree edge to v at parent
+                returned = True
+
+    def update_lowpoints(self, e, vw):
+        """Update the lowpoints of the parent edge e with those of vw"""
+        lowpt, lowpt2 = self.lowpt, self.lowpt2
+        if lowpt[vw] < lowpt[e]:
+            lowpt2[e] = min(lowpt[e], lowpt2[vw])
+            lowpt[e] = lowpt[vw]
+        elif lowpt[vw] > lowpt[e]:
+            lowpt2[e] = min(lowpt2[e], lowpt[vw])
+        else:
+            lowpt2[e] = min(lowpt2[e], lowpt2[vw])
 
     def dfs_testing(self, v):
-        """Test for LR partition"""
-        e = self.parent_edge[v]
-        for w in self.ordered_adjs[v]:
-            ei = (v, w)
-            self.stack_bottom[ei] = top_of_stack(self.S)
-            if ei == self.parent_edge[w]:  # tree edge
-                if not self.dfs_testing(w):
-                    return False
-            else:  # back edge
-                self.lowpt_edge[ei] = ei
-                self.S.append(ConflictPair(right=Interval(ei, ei)))
-
-            # integrate new return edges
-            if self.lowpt[ei] < self.height[v]:
-                if w == self.ordered_adjs[v][0]:  # e_i has return edge
-                    self.lowpt_edge[e] = self.lowpt_edge[ei]
-                else:  # add constraints of e_i
-                    if not self.add_constraints(ei, e):
-                        # graph is not planar
-                        return False
-
-        # remove back edges returning to parent
-        if e is not None:  # v isn't root
-            self.remove_back_edges(e)
+        """Test for LR partition
+
+        Iterative version with an explicit stack, see
+        :meth:`dfs_orientation`.
+
+        Returns
+        -------
+        Returns True if the graph is planar, False otherwise.
+        """
+        # the recursion stack
+        dfs_stack = [v]
+        # position of next edge to handle in adjacency list of each node
+        ind = self.ind
+        # the edge at ind[v] is a tree edge whose subtree was finished
+        returned = False
+
+        while dfs_stack:
+            v = dfs_stack.pop()
+            e = self.parent_edge[v]
+            start = self.ordered_offsets[v]
+            end = self.ordered_offsets[v + 1]
+
+            while ind[v] < end:
+                ei = self.ordered_edges[ind[v]]
+
+                if not returned:
+                    self.stack_bottom[ei] = self.stack_height
+
+                    w = self.edge_target[ei]
+                    if ei == self.parent_edge[w]:  # tree edge
+                        dfs_stack.append(v)  # revisit v after finishing w
+                        dfs_stack.append(w)  # visit w next
+                        break  # handle next node in dfs_stack (i.e. w)
+                    else:  # back edge
+                        self.lowpt_edge[ei] = ei
+                        self.push_back_edge(ei)
+                returned = False
+
+                # integrate new return edges
+                if self.lowpt[ei] < self.height[v]:
+                    if ind[v] == start:  # e_i has return edge
+                        self.lowpt_edge[e] = self.lowpt_edge[ei]
+                    else:  # add constraints of e_i
+                        if not self.add_constraints(ei, e):
+                            # graph is not planar
+                            return False
+
+                ind[v] += 1
+            else:
+                # remove back edges returning to parent
+                if e != NONE:  # v isn't root
+                    self.remove_back_edges(e)
+                returned = True
+
         return True
 
+    def push_back_edge(self, ei):
+        """Push the conflict pair of the back edge ei onto the stack"""
+        k = self.stack_height
+        self.left_low[k] = self.left_high[k] = NONE
+        self.right_low[k] = self.right_high[k] = ei
+        self.stack_height = k + 1
+        if self.stats is not None:
+            self.stats.count('conflict_pairs_pushed')
+            self.stats.maximum('max_stack_height', k + 1)
+
+    def swap(self, k):
+        """Swap the left and right interval of conflict pair k"""
+        self.left_low[k], self.right_low[k] = \
+            self.right_low[k], self.left_low[k]
+        self.left_high[k], self.right_high[k] = \
+            self.right_high[k], self.left_high[k]
+
+    def lowest(self, k):
+        """Return the lowest lowpoint of conflict pair k"""
+        left_low, right_low = self.left_low[k], self.right_low[k]
+        if left_low == NONE and self.left_high[k] == NONE:
+            return self.lowpt[right_low]
+        if right_low == NONE and self.right_high[k] == NONE:
+            return self.lowpt[left_low]
+        return min(self.lowpt[left_low], self.lowpt[right_low])
+
     def add_constraints(self, ei, e):
-        P = ConflictPair()
+        lowpt, ref = self.lowpt, self.ref
+        left_low, left_high = self.left_low, self.left_high
+        right_low, right_high = self.right_low, self.right_high
+        # the intervals of the new conflict pair P
+        p_left_low = p_left_high = p_right_low = p_right_high = NONE
+        height = k = self.stack_height
         # merge return edges of e_i into P.right
         while True:
-            Q = self.S.pop()
-            if not Q.left.empty():
-                Q.swap()
-            if not Q.left.empty():  # not planar
+            k -= 1  # pop Q
+            if left_low[k] != NONE or left_high[k] != NONE:
+                self.swap(k)
+            if left_low[k] != NONE or left_high[k] != NONE:  # not planar
+                self.stack_height = k
                 return False
-            if self.lowpt[Q.right.low] > self.lowpt[e]:
+            if lowpt[right_low[k]] > lowpt[e]:
                 # merge intervals
-                if P.right.empty():  # topmost interval
-                    P.right = Q.right.copy()
+                if p_right_low == NONE and p_right_high == NONE:
+                    p_right_high = right_high[k]  # topmost interval
                 else:
-                    self.ref[P.right.low] = Q.right.high
-                P.right.low = Q.right.low
+                    ref[p_right_low] = right_high[k]
+                p_right_low = right_low[k]
             else:  # align
-                self.ref[Q.right.low] = self.lowpt_edge[e]
-            if top_of_stack(self.S) == self.stack_bottom[ei]:
+                ref[right_low[k]] = self.lowpt_edge[e]
+            if k == self.stack_bottom[ei]:
                 break
         # merge conflicting return edges of e_1,...,e_i-1 into P.L
-        while (top_of_stack(self.S).left.conflicting(ei, self) or
-               top_of_stack(self.S).right.conflicting(ei, self)):
-            Q = self.S.pop()
-            if Q.right.conflicting(ei, self):
-                Q.swap()
-            if Q.right.conflicting(ei, self):  # not planar
-                return False
+        lowpt_ei = lowpt[ei]
+        while k > 0:
+            left_conflicting = ((left_low[k - 1] != NONE or
+                                 left_high[k - 1] != NONE) and
+                                lowpt[left_high[k - 1]] > lowpt_ei)
+            right_conflicting = ((right_low[k - 1] != NONE or
+                                  right_high[k - 1] != NONE) and
+                                 lowpt[right_high[k - 1]] > lowpt_ei)
+            if not (left_conflicting or right_conflicting):
+                break
+            k -= 1  # pop Q
+            if right_conflicting:
+                if left_conflicting:  # not planar
+                    self.stack_height = k
+                    return False
+                self.swap(k)
             # merge interval below lowpt(e_i) into P.R
-            self.ref[P.right.low] = Q.right.high
-            if Q.right.low is not None:
-                P.right.low = Q.right.low
+            if p_right_low != NONE:
+                ref[p_right_low] = right_high[k]
+            if right_low[k] != NONE:
+                p_right_low = right_low[k]
 
-            if P.left.empty():  # topmost interval
-                P.left = Q.left.copy()
+            if p_left_low == NONE and p_left_high == NONE:
+                p_left_high = left_high[k]  # topmost interval
             else:
-                self.ref[P.left.low] = Q.left.high
-            P.left.low = Q.left.low
-
-        if not (P.left.empty() and P.right.empty()):
-            self.S.append(P)
+                ref[p_left_low] = left_high[k]
+            p_left_low = left_low[k]
+
+        if self.stats is not None:
+            self.stats.count('conflict_pairs_merged', height - k)
+        if not (p_left_low == NONE and p_left_high == NONE and
+                p_right_low == NONE and p_right_high == NONE):
+            left_low[k], left_high[k] = p_left_low, p_left_high
+            right_low[k], right_high[k] = p_right_low, p_right_high
+            if self.stats is not None:
+                self.stats.count('conflict_pairs_pushed')
+            k += 1
+        self.stack_height = k
         return True
 
     def remove_back_edges(self, e):
-        u = e[0]
+        ref, side, edge_target = self.ref, self.side, self.edge_target
+        left_low, left_high = self.left_low, self.left_high
+        right_low, right_high = self.right_low, self.right_high
+        u = self.edge_source[e]
+        height_u = self.height[u]
+        k = self.stack_height
         # trim back edges ending at parent u
         # drop entire conflict pairs
-        while self.S and top_of_stack(self.S).lowest(self) == self.height[u]:
-            P = self.S.pop()
-            if P.left.low is not None:
-                self.side[P.left.low] = -1
+        while k > 0 and self.lowest(k - 1) == height_u:
+            k -= 1
+            if left_low[k] != NONE:
+                side[left_low[k]] = -1
 
-        if self.S:  # one more conflict pair to consider
-            P = self.S.pop()
+        if k > 0:  # one more conflict pair to consider
+            t = k - 1
             # trim left interval
-            while P.left.high is not None and P.left.high[1] == u:
-                P.left.high = self.ref[P.left.high]
-            if P.left.high is None and P.left.low is not None:
+            h = left_high[t]
+            while h != NONE and edge_target[h] == u:
+                h = ref[h]
+            left_high[t] = h
+            if h == NONE and left_low[t] != NONE:
                 # just emptied
-                self.ref[P.left.low] = P.right.low
-                self.side[P.left.low] = -1
-                P.left.low = None
+                ref[left_low[t]] = right_low[t]
+                side[left_low[t]] = -1
+                left_low[t] = NONE
             # trim right interval
-            while P.right.high is not None and P.right.high[1] == u:
-                P.right.high = self.ref[P.right.high]
-            if P.right.high is None and P.right.low is not None:
+            h = right_high[t]
+            while h != NONE and edge_target[h] == u:
+                h = ref[h]
+            right_high[t] = h
+            if h == NONE and right_low[t] != NONE:
                 # just emptied
-                self.ref[P.right.low] = P.left.low
-                self.side[P.right.low] = -1
-                P.right.low = None
-            self.S.append(P)
+                ref[right_low[t]] = left_low[t]
+                side[right_low[t]] = -1
+                right_low[t] = NONE
+        self.stack_height = k
 
         # side of e is side of a highest return edge
-        if self.lowpt[e] < self.height[u]:  # e has return edge
-            hl = top_of_stack(self.S).left.high
-            hr = top_of_stack(self.S).right.high
+        if self.lowpt[e] < height_u:  # e has return edge
+            hl = left_high[k - 1]
+            hr = right_high[k - 1]
 
-            if hl is not None and (
-                    hr is None or self.lowpt[hl] > self.lowpt[hr]):
-                self.ref[e] = hl
+            if hl != NONE and (
+                    hr == NONE or self.lowpt[hl] > self.lowpt[hr]):
+                ref[e] = hl
             else:
-                self.ref[e] = hr
+                ref[e] = hr
+
+    def init_embedding(self):
+        """Initialize the embedding with the ordered outgoing edges"""
+        for v in range(self.n):
+            start = self.ordered_offsets[v]
+            end = self.ordered_offsets[v + 1]
+            if start == end:
+                continue
+            for i in range(start, end):
+                h = 2 * self.ordered_edges[i]
+                self.rot_next[h] = 2 * self.ordered_edges[i + 1] \
+                    if i + 1 < end else 2 * self.ordered_edges[start]
+                self.rot_prev[h] = 2 * self.ordered_edges[i - 1] \
+                    if i > start else 2 * self.ordered_edges[end - 1]
+            self.rot_first[v] = 2 * self.ordered_edges[start]
+
+    def half_edge_target(self, h):
+        """Return the vertex the half-edge h points to"""
+        if h & 1:
+            return self.edge_source[h >> 1]
+        return self.edge_target[h >> 1]
+
+    def get_embedding(self):
+        """Return the embedding as dict with the original node labels
+
+        The rotation system is flattened to one list of neighbors per node,
+        starting at the first half-edge of the node.
+        """
+        nodes = self.nodes
+        embedding = {}
+        for v in range(self.n):
+            nbrs = []
+            first = h = self.rot_first[v]
+            while h != NONE:
+                nbrs.append(nodes[self.half_edge_target(h)])
+                h = self.rot_next[h]
+                if h == first:
+                    break
+            embedding[nodes[v]] = nbrs
+        return embedding
+
+    def get_rotation_system(self):
+        """Return the embedding as :class:`RotationSystem`
+
+        The half-edges of every vertex are numbered consecutively, starting
+        at its first half-edge.
+        """
+        n, m = self.n, self.m
+        offsets = self.adj_offsets[:]  # the degrees do not change
+        targets = array('i', [NONE]) * (2 * m)
+        twin = array('i', [NONE]) * (2 * m)
+        # position of every half-edge h of the rotation system
+        position = array('i', [NONE]) * (2 * m)
+        rot_first, rot_next = self.rot_first, self.rot_next
+        edge_source, edge_target = self.edge_source, self.edge_target
+        for v in range(n):
+            i = offsets[v]
+            first = h = rot_first[v]
+            while h != NONE:
+                if h & 1:
+                    targets[i] = edge_source[h >> 1]
+                else:
+                    targets[i] = edge_target[h >> 1]
+                position[h] = i
+                j = position[h ^ 1]
+                if j != NONE:
+                    twin[i] = j
+                    twin[j] = i
+                i += 1
+                h = rot_next[h]
+                if h == first:
+                    break
+        return RotationSystem(self.nodes, offsets, targets, twin)
+
+    def add_half_edge_first(self, h, v):
+        """Make h the first half-edge in the rotation of v"""
+        first = self.rot_first[v]
+        if first == NONE:
+            self.rot_next[h] = self.rot_prev[h] = h
+        else:
+            self.add_half_edge_before(h, first)
+        self.rot_first[v] = h
+
+    def add_half_edge_before(self, h, ref):
+        """Place h directly before the half-edge ref in its rotation"""
+        prev = self.rot_prev[ref]
+        self.rot_prev[h] = prev
+        self.rot_next[h] = ref
+        self.rot_next[prev] = h
+        self.rot_prev[ref] = h
+
+    def add_half_edge_after(self, h, ref):
+        """Place h directly after the half-edge ref in its rotation"""
+        nxt = self.rot_next[ref]
+        self.rot_prev[h] = ref
+        self.rot_next[h] = nxt
+        self.rot_prev[nxt] = h
+        self.rot_next[ref] = h
 
     # complete the embedding
     def dfs_embedding(self, v):
-        for w in self.ordered_adjs[v]:
-            ei = (v, w)
-            if ei == self.parent_edge[w]:  # tree edge
-                # make v the first node in embedding list of w
-                self.embedding[w].insert(0, v)
-                self.left_ref[v] = w
-                self.right_ref[v] = w
-                self.dfs_embedding(w)
-            else:  # back edge
-                if self.side[ei] == 1:
-                    # place v directly after right_ref[w] in embed. list of w
-                    self.embedding[w].insert(
-                        self.embedding[w].index(self.right_ref[w]) + 1, v)
-                else:
-                    # place v directly before left_ref[w] in embed. list of w
-                    self.embedding[w].insert(
-                        self.embedding[w].index(self.left_ref[w]), v)
-                    self.left_ref[w] = v
+        """Complete the embedding by an iterative DFS traversal"""
+        # the recursion stack
+        dfs_stack = [v]
+        # position of next edge to handle in adjacency list of each node
+        ind = self.ind
+
+        while dfs_stack:
+            v = dfs_stack.pop()
+            end = self.ordered_offsets[v + 1]
+
+            while ind[v] < end:
+                ei = self.ordered_edges[ind[v]]
+                ind[v] += 1
+                w = self.edge_target[ei]
+
+                if ei == self.parent_edge[w]:  # tree edge
+                    # make v the first node in embedding list of w
+                    self.add_half_edge_first(2 * ei + 1, w)
+                    self.left_ref[v] = 2 * ei
+                    self.right_ref[v] = 2 * ei
+
+                    dfs_stack.append(v)  # revisit v after finishing w
+                    dfs_stack.append(w)  # visit w next
+                    break  # handle next node in dfs_stack (i.e. w)
+                else:  # back edge
+                    self.add_back_edge_to_embedding(ei)
+
+    def add_back_edge_to_embedding(self, ei):
+        """Place the back edge ei = (v, w) in the embedding list of w"""
+        w = self.edge_target[ei]
+        h = 2 * ei + 1
+        if self.side[ei] == 1:
+            # place v directly after right_ref[w] in embed. list of w
+            self.add_half_edge_after(h, self.right_ref[w])
+        else:
+            # place v directly before left_ref[w] in embed. list of w
+            ref = self.left_ref[w]
+            self.add_half_edge_before(h, ref)
+            if self.rot_first[w] == ref:
+                self.rot_first[w] = h
+            self.left_ref[w] = h
 
     # function to resolve the relative side of an edge to the absolute side
     def sign(self, e):
-        if self.ref[e] is not None:
-            self.side[e] = self.side[e] * self.sign(self.ref[e])
-            self.ref[e] = None
+        """Resolve the relative side of an edge to the absolute side
+
+        The chain of reference edges is followed with an explicit stack and
+        the signs are multiplied while unwinding it. Each resolved edge has
+        its reference removed, so every chain is only traversed once.
+        """
+        # the chain of edges with unresolved references
+        chain = []
+        while self.ref[e] != NONE:
+            chain.append(e)
+            e = self.ref[e]
+
+        if self.stats is not None:
+            self.stats.count('ref_chain_steps', len(chain))
+            self.stats.maximum('max_ref_chain', len(chain))
+
+        # unwind the chain
+        while chain:
+            f = chain.pop()
+            self.side[f] = self.side[f] * self.side[e]
+            self.ref[f] = NONE
+            e = f
+
         return self.side[e]
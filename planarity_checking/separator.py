@@ -0,0 +1,573 @@
+"""Balanced vertex separators of planar graphs
+
+:func:`planar_separator` splits a planar graph into two sides A and B of at
+most 2n/3 vertices each and a separator S of at most 2 sqrt(2) sqrt(n)
+vertices, such that no edge joins A and B. It follows Lipton and Tarjan
+[1] and works on the rotation system of a planar embedding, as returned
+by :func:`check_planarity` with compact set. :func:`separator_tree`
+applies it recursively.
+
+References
+----------
+.. [1] Richard J. Lipton, Robert E. Tarjan:
+    A separator theorem for planar graphs
+    SIAM Journal on Applied Mathematics 36(2), 1979
+"""
+from array import array
+
+import networkx as nx
+
+from planarity_checking.faces import face_index
+from planarity_checking.lr_planarity import (NONE, RotationSystem,
+                                             check_planarity)
+from planarity_checking.verify import rotation_system_from_dict
+
+
+def planar_separator(G, embedding=None):
+    """Returns a balanced separator of a planar graph
+
+    Parameters
+    ----------
+    G : NetworkX graph
+    embedding : RotationSystem or dict, optional
+        A planar embedding of G as returned by :func:`check_planarity`. It
+        is computed if not given.
+
+    Returns
+    -------
+    A, B, S : sets of nodes
+        A partition of the nodes of G. No edge joins A and B, both have at
+        most 2n/3 nodes and S has at most 2 sqrt(2) sqrt(n) nodes.
+
+    Raises
+    ------
+    NetworkXException
+        If no embedding is given and G is not planar
+
+    Notes
+    -----
+    If no connected component has more than 2n/3 nodes, S is empty.
+    Otherwise the largest component is split as described by Lipton and
+    Tarjan: the BFS levels L0, L1, ... from a root are cut at two levels
+    with few vertices below and above the median level. If the levels
+    between them are still too large, the levels below are contracted to
+    the root, the levels above are deleted, the faces of the remaining
+    embedding are triangulated and a fundamental cycle of the BFS tree
+    with at most 2/3 of the vertices on each side is added to S. The
+    weights of the sides are found for all fundamental cycles at once
+    from subtree sums of the dual tree and the lowest common ancestors of
+    the non tree edges. Everything takes O(n) time.
+    """
+    rotation_system = _rotation_system(G, embedding)
+    nodes = rotation_system.nodes
+    a, b, s = _separate(rotation_system)
+    return ({nodes[v] for v in a}, {nodes[v] for v in b},
+            {nodes[v] for v in s})
+
+
+def separator_tree(G, embedding=None, leaf_size=64):
+    """Returns a recursive separator decomposition of a planar graph
+
+    Parameters
+    ----------
+    G : NetworkX graph
+    embedding : RotationSystem or dict, optional
+        A planar embedding of G as returned by :func:`check_planarity`
+    leaf_size : int
+        Parts with at most this many nodes are not split any further
+
+    Returns
+    -------
+    tree : nx.DiGraph
+        A rooted tree with the root 0 and edges from parents to children.
+        The attribute 'nodes' of an inner tree node is the separator of its
+        part, the parts of its two children are the sides of the separator.
+        A leaf holds all nodes of its part. Every node of G belongs to
+        exactly one tree node.
+
+    Notes
+    -----
+    The embedding of a part is the restriction of the embedding of G, so
+    the planarity test runs at most once. Every level of the tree takes
+    O(n) time, there are O(log n) levels.
+    """
+    rotation_system = _rotation_system(G, embedding)
+    tree = nx.DiGraph()
+    stack = [(rotation_system, None)]
+    while stack:
+        rotation_system, parent = stack.pop()
+        node = len(tree)
+        nodes = rotation_system.nodes
+        if len(rotation_system) <= leaf_size:
+            tree.add_node(node, nodes=set(nodes))
+        else:
+            a, b, s = _separate(rotation_system)
+            tree.add_node(node, nodes={nodes[v] for v in s})
+            for side in (b, a):
+                if side:
+                    stack.append((_restrict(rotation_system, side), node))
+        if parent is not None:
+            tree.add_edge(parent, node)
+    return tree
+
+
+def _rotation_system(G, embedding):
+    """Return the embedding of G as RotationSystem"""
+    if embedding is None:
+        is_planar, embedding = check_planarity(G, compact=True)
+        if not is_planar:
+            raise nx.NetworkXException("G is not planar.")
+    elif isinstance(embedding, dict):
+        embedding = rotation_system_from_dict(embedding)
+    return embedding
+
+
+def _restrict(rotation_system, vertices):
+    """Return the rotation system induced by a list of vertices"""
+    offsets, targets, twin = (rotation_system.offsets,
+                              rotation_system.targets, rotation_system.twin)
+    index = array('i', [NONE]) * len(rotation_system)
+    for i, v in enumerate(vertices):
+        index[v] = i
+    position = array('i', [NONE]) * len(targets)
+    sub_offsets = array('i', [0]) * (len(vertices) + 1)
+    sub_targets = array('i')
+    for i, v in enumerate(vertices):
+        for j in range(offsets[v], offsets[v + 1]):
+            if index[targets[j]] != NONE:
+                position[j] = len(sub_targets)
+                sub_targets.append(index[targets[j]])
+        sub_offsets[i + 1] = len(sub_targets)
+    sub_twin = array('i', [NONE]) * len(sub_targets)
+    for j, p in enumerate(position):
+        if p != NONE:
+            sub_twin[p] = position[twin[j]]
+    nodes = rotation_system.nodes
+    return RotationSystem([nodes[v] for v in vertices], sub_offsets,
+                          sub_targets, sub_twin)
+
+
+def _separate(rotation_system):
+    """Separate the vertices of a rotation system
+
+    Returns
+    -------
+    a, b, s : lists of vertices
+    """
+    n = len(rotation_system)
+    offsets, targets = rotation_system.offsets, rotation_system.targets
+
+    # connected components in BFS order, with the BFS levels and the
+    # half-edge from the BFS parent to each vertex
+    level = array('i', [NONE]) * n
+    parent_half = array('i', [NONE]) * n
+    components = []
+    for r in range(n):
+        if level[r] != NONE:
+            continue
+        level[r] = 0
+        component = [r]
+        for v in component:
+            for i in range(offsets[v], offsets[v + 1]):
+                w = targets[i]
+                if level[w] == NONE:
+                    level[w] = level[v] + 1
+                    parent_half[w] = i
+                    component.append(w)
+        components.append(component)
+
+    big = max(components, key=len, default=[])
+    if 3 * len(big) <= 2 * n:
+        a, b = _combine(components, n)
+        return a, b, []
+    pieces = [c for c in components if c is not big]
+    separator = _separate_component(rotation_system, big, level,
+                                    parent_half, pieces)
+    a, b = _combine(pieces, n)
+    return a, b, separator
+
+
+def _combine(pieces, n):
+    """Join pieces of at most 2n/3 vertices to two sides of at most 2n/3
+
+    A piece with at least n/3 vertices forms one side alone, otherwise
+    every piece goes to the smaller side, largest pieces first.
+    """
+    pieces = sorted(pieces, key=len, reverse=True)
+    if pieces and 3 * len(pieces[0]) >= n:
+        return pieces[0], [v for piece in pieces[1:] for v in piece]
+    a, b = [], []
+    for piece in pieces:
+        if len(a) <= len(b):
+            a.extend(piece)
+        else:
+            b.extend(piece)
+    return a, b
+
+
+def _separate_component(rotation_system, component, level, parent_half,
+                        pieces):
+    """Separate a connected component given in BFS order
+
+    The pieces the component falls into are appended to pieces, the
+    separator is returned.
+    """
+    k = len(component)
+    depth = level[component[-1]]
+    count = array('i', [0]) * (depth + 2)  # count[depth + 1] stays 0
+    for v in component:
+        count[level[v]] += 1
+
+    # the median level l1, a small level l0 <= l1 and a small level l2 > l1
+    below = 0
+    l1 = 0
+    while 2 * (below + count[l1]) < k:
+        below += count[l1]
+        l1 += 1
+    l0 = min(range(-1, l1 + 1),
+             key=lambda lvl: (count[lvl] if lvl >= 0 else 0) +
+             2 * (l1 - lvl))
+    l2 = min(range(l1 + 1, depth + 2),
+             key=lambda lvl: count[lvl] + 2 * (lvl - l1 - 1))
+
+    separator = [v for v in component if level[v] == l0 or level[v] == l2]
+    low = [v for v in component if level[v] < l0]
+    high = [v for v in component if level[v] > l2]
+    middle = [v for v in component if l0 < level[v] < l2]
+    pieces.extend(piece for piece in (low, high) if piece)
+    if 3 * len(middle) <= 2 * k:
+        if middle:
+            pieces.append(middle)
+        return separator
+
+    inside, outside, cycle = _cycle_separator(
+        rotation_system, component, level, parent_half, l0, l2)
+    pieces.extend(piece for piece in (inside, outside) if piece)
+    separator.extend(cycle)
+    return separator
+
+
+def _cycle_separator(rotation_system, component, level, parent_half, l0,
+                     l2):
+    """Split the levels between l0 and l2 by a fundamental cycle
+
+    Returns
+    -------
+    inside, outside, cycle : lists of vertices
+        The middle vertices inside and outside of the cycle and on it
+    """
+    offsets, targets, twin = (rotation_system.offsets,
+                              rotation_system.targets, rotation_system.twin)
+    # H is the graph of the middle levels, with the levels up to l0
+    # contracted to the root 0. H vertex h stands for the vertex label[h]
+    # of the rotation system (NONE for the contracted root and the vertices
+    # added to triangulate the faces). rot[h] holds the half-edges of the
+    # rotation system that become the half-edges of h, in clockwise order.
+    hv = array('i', [NONE]) * len(rotation_system)
+    label = array('i', [NONE] if l0 >= 0 else [])
+    for v in component:
+        if level[v] <= l0:
+            hv[v] = 0
+        elif level[v] < l2:
+            hv[v] = len(label)
+            label.append(v)
+    rot = [[] for _ in label]
+
+    # the contracted root: its edges are met in clockwise order by a walk
+    # around the BFS tree of the levels up to l0
+    if l0 >= 0:
+        r = component[0]
+        walk = [(r, offsets[r], offsets[r + 1] - offsets[r])]
+        while walk:
+            v, i, remaining = walk.pop()
+            while remaining:
+                remaining -= 1
+                w = targets[i]
+                j = i
+                i = i + 1 if i + 1 < offsets[v + 1] else offsets[v]
+                if level[w] == l0 + 1:
+                    rot[0].append(j)
+                elif parent_half[w] == j:
+                    # continue after the tree edge when w is finished
+                    walk.append((v, i, remaining))
+                    t = twin[j]
+                    walk.append((w, t + 1 if t + 1 < offsets[w + 1]
+                                 else offsets[w], offsets[w + 1] -
+                                 offsets[w] - 1))
+                    break
+    for v in component:
+        h = hv[v]
+        if h == NONE or (h == 0 and l0 >= 0):
+            continue
+        for i in range(offsets[v], offsets[v + 1]):
+            if hv[targets[i]] != NONE:
+                rot[h].append(i)
+
+    # H as RotationSystem, position[i] is the H half-edge of i
+    position = array('i', [NONE]) * len(targets)
+    h_offsets = array('i', [0])
+    h_targets = array('i')
+    for halves in rot:
+        for i in halves:
+            position[i] = len(h_targets)
+            h_targets.append(hv[targets[i]])
+        h_offsets.append(len(h_targets))
+    if not h_targets:
+        return [], [], ([] if l0 >= 0 else [component[0]])
+    h_twin = array('i', [NONE]) * len(h_targets)
+    for halves in rot:
+        for i in halves:
+            h_twin[position[i]] = position[twin[i]]
+    H = RotationSystem(label, h_offsets, h_targets, h_twin)
+
+    # the H half-edges of the BFS tree, from the parents
+    tree_half = array('i', [NONE]) * len(label)
+    for h in range(1, len(label)):
+        tree_half[h] = position[parent_half[label[h]]]
+
+    H, tree_half = _triangulate(H, tree_half)
+    return _fundamental_cycle(H, tree_half)
+
+
+def _triangulate(H, tree_half):
+    """Put a new vertex into every face that is not a triangle
+
+    The new vertex is joined to all corners of the face, its edge from the
+    first corner becomes its tree edge.
+
+    Returns
+    -------
+    triangulation : RotationSystem
+        The node of a new vertex is NONE
+    tree_half : array
+        The half-edge from the parent of every vertex in the triangulation
+    """
+    offsets, targets, twin = H.offsets, H.targets, H.twin
+    faces = face_index(H)
+    n, m = len(H), len(targets)
+    # the new edge e has the half-edge m + 2e from its corner ends[2e] to
+    # the new vertex ends[2e + 1] and m + 2e + 1 back. It comes right
+    # before the half-edge insert[i] at the corner, every corner gets at
+    # most one.
+    nodes = array('i', H.nodes)
+    tree_half = array('i', tree_half)
+    insert = array('i', [NONE]) * m
+    ends = array('i')
+    star = []
+    for f in range(len(faces)):
+        if faces.sizes[f] == 3:
+            continue
+        x = len(nodes)
+        nodes.append(NONE)
+        tree_half.append(m + len(ends))
+        edges = array('i')
+        for h in faces.half_edges[faces.offsets[f]:faces.offsets[f + 1]]:
+            insert[twin[h]] = m + len(ends)
+            edges.append(m + len(ends) + 1)
+            ends.extend((targets[h], x))
+        star.append(edges)
+
+    # the half-edges in their new positions
+    order = array('i')
+    new_offsets = array('i', [0])
+    for v in range(n):
+        for i in range(offsets[v], offsets[v + 1]):
+            if insert[i] != NONE:
+                order.append(insert[i])
+            order.append(i)
+        new_offsets.append(len(order))
+    for edges in star:
+        order.extend(edges)
+        new_offsets.append(len(order))
+    position = array('i', [NONE]) * len(order)
+    for p, i in enumerate(order):
+        position[i] = p
+    new_targets = array('i', [NONE]) * len(order)
+    new_twin = array('i', [NONE]) * len(order)
+    for p, i in enumerate(order):
+        if i < m:
+            new_targets[p] = targets[i]
+            new_twin[p] = position[twin[i]]
+        else:
+            new_targets[p] = ends[(i - m) ^ 1]
+            new_twin[p] = position[m + ((i - m) ^ 1)]
+    for h, i in enumerate(tree_half):
+        if i != NONE:
+            tree_half[h] = position[i]
+    return (RotationSystem(nodes, new_offsets, new_targets, new_twin),
+            tree_half)
+
+
+def _fundamental_cycle(H, tree_half):
+    """Find the fundamental cycle of a triangulation with the best balance
+
+    The vertices with a label have weight one. Every vertex but the root
+    is assigned to the face of the half-edge from its parent, the root to
+    the face of its first half-edge. A vertex that is not on a cycle lies
+    on the same side as its face. For the cycle of the non tree edge from
+    x to y whose face lies in the dual subtree T, the weight inside is the
+    weight of the vertices assigned to T minus the weight of the cycle
+    vertices assigned to T. Those are the vertices below the lowest common
+    ancestor on the path to x, and possibly the ancestor itself.
+    """
+    offsets, targets, twin = H.offsets, H.targets, H.twin
+    label = H.nodes
+    sources = H.sources()
+    num_vertices = len(H)
+    faces = face_index(H)
+    face, face_offsets, face_halves = (faces.face, faces.offsets,
+                                       faces.half_edges)
+    num_faces = len(faces)
+    is_tree = bytearray(len(targets))
+    parent = array('i', [NONE]) * num_vertices
+    weight = array('i', [0]) * num_vertices
+    for h in range(num_vertices):
+        i = tree_half[h]
+        if i != NONE:
+            is_tree[i] = is_tree[twin[i]] = 1
+            parent[h] = sources[i]
+        if label[h] != NONE:
+            weight[h] = 1
+
+    # the tree in CSR form and its vertices in BFS order
+    child_offsets = array('i', [0]) * (num_vertices + 1)
+    for h in range(num_vertices):
+        if parent[h] != NONE:
+            child_offsets[parent[h] + 1] += 1
+    for h in range(num_vertices):
+        child_offsets[h + 1] += child_offsets[h]
+    children = array('i', [NONE]) * (num_vertices - 1)
+    pos = child_offsets[:-1]
+    for h in range(num_vertices):
+        if parent[h] != NONE:
+            children[pos[parent[h]]] = h
+            pos[parent[h]] += 1
+    order = [0]
+    for h in order:
+        order.extend(children[child_offsets[h]:child_offsets[h + 1]])
+
+    # weights of the root paths and the assigned faces
+    path_weight = array('i', [0]) * num_vertices
+    assigned = array('i', [NONE]) * num_vertices
+    for h in order:
+        i = tree_half[h]
+        if i == NONE:
+            path_weight[h] = weight[h]
+            assigned[h] = face[offsets[h]]
+        else:
+            path_weight[h] = path_weight[parent[h]] + weight[h]
+            assigned[h] = face[i]
+
+    # the dual tree of the non tree edges by DFS, with preorder numbers,
+    # subtree sizes and the weight assigned to every subtree. The dual
+    # tree edge to face g is the half-edge dual_edge[g] of its parent face.
+    dual_edge = array('i', [NONE]) * num_faces
+    pre = array('i', [NONE]) * num_faces
+    size = array('i', [1]) * num_faces
+    face_weight = array('i', [0]) * num_faces
+    for h in range(num_vertices):
+        face_weight[assigned[h]] += weight[h]
+    pre[0] = 0
+    preorder = [0]
+    dfs_stack = [(0, face_offsets[0])]
+    while dfs_stack:
+        f, i = dfs_stack.pop()
+        while i < face_offsets[f + 1]:
+            h = face_halves[i]
+            i += 1
+            g = face[twin[h]]
+            if is_tree[h] or pre[g] != NONE:
+                continue
+            dual_edge[g] = h
+            pre[g] = len(preorder)
+            preorder.append(g)
+            dfs_stack.append((f, i))
+            dfs_stack.append((g, face_offsets[g]))
+            break
+    dual_parent = array('i', [NONE]) * num_faces
+    for f in preorder:
+        h = dual_edge[f]
+        if h != NONE:
+            dual_parent[f] = face[h]
+    for f in reversed(preorder):
+        g = dual_parent[f]
+        if g != NONE:
+            size[g] += size[f]
+            face_weight[g] += face_weight[f]
+
+    # lowest common ancestors of the non tree edges (Tarjan's offline
+    # algorithm), an edge is given by its half-edge i < twin[i] and asked
+    # for at both ends
+    queries = [[] for _ in range(num_vertices)]
+    for i in range(len(targets)):
+        if i < twin[i] and not is_tree[i]:
+            queries[sources[i]].append(i)
+            queries[targets[i]].append(i)
+    lca = array('i', [NONE]) * len(targets)
+    leader = array('i', range(num_vertices))
+    ancestor = array('i', range(num_vertices))
+    finished = bytearray(num_vertices)
+
+    def find(h):
+        while leader[h] != h:
+            leader[h] = leader[leader[h]]
+            h = leader[h]
+        return h
+
+    dfs_stack = [(0, child_offsets[0])]
+    while dfs_stack:
+        h, i = dfs_stack.pop()
+        if i < child_offsets[h + 1]:
+            dfs_stack.append((h, i + 1))
+            dfs_stack.append((children[i], child_offsets[children[i]]))
+            continue
+        finished[h] = 1
+        for i in queries[h]:
+            other = sources[i] + targets[i] - h
+            if finished[other]:
+                lca[i] = ancestor[find(other)]
+        p = parent[h]
+        if p != NONE:
+            leader[find(h)] = find(p)
+            ancestor[find(p)] = p
+
+    # the balance of every fundamental cycle
+    total = sum(weight)
+    best = None
+    for i in range(len(targets)):
+        if is_tree[i] or twin[i] < i:
+            continue
+        # h is the half-edge of the edge in the child face c
+        h = i if dual_edge[face[i]] == twin[i] else twin[i]
+        c = face[h]
+        x, y = sources[h], targets[h]
+        z = lca[i]
+        on_cycle = path_weight[x] + path_weight[y] - 2 * path_weight[z] + \
+            weight[z]
+        inside = face_weight[c] - path_weight[x] + path_weight[z]
+        if pre[c] <= pre[assigned[z]] < pre[c] + size[c]:
+            inside -= weight[z]
+        outside = total - inside - on_cycle
+        key = (max(inside, outside), on_cycle)
+        if best is None or key < best[0]:
+            best = key, i, c
+
+    _, i, c = best
+    cycle_vertex = bytearray(num_vertices)
+    z = lca[i]
+    for h in (sources[i], targets[i]):
+        while h != z:
+            cycle_vertex[h] = 1
+            h = parent[h]
+    cycle_vertex[z] = 1
+    inside, outside, cycle = [], [], []
+    for h in range(num_vertices):
+        if label[h] == NONE:
+            continue
+        if cycle_vertex[h]:
+            cycle.append(label[h])
+        elif pre[c] <= pre[assigned[h]] < pre[c] + size[c]:
+            inside.append(label[h])
+        else:
+            outside.append(label[h])
+    return inside, outside, cycle
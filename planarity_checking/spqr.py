@@ -0,0 +1,696 @@
+"""SPQR trees of biconnected graphs
+
+A biconnected graph is decomposed at its separation pairs into triconnected
+components: cycles (S-nodes), bonds of parallel edges (P-nodes) and
+triconnected simple graphs (R-nodes). Every component contains virtual
+edges that stand for the rest of the graph, and the components sharing a
+virtual edge are adjacent in the SPQR tree.
+
+The components are found by the path search of Hopcroft and Tarjan [1] in
+the corrected version of Gutwenger and Mutzel [2], which runs in O(n + m)
+time. Its first DFS is the orientation phase of the LR planarity test: the
+heights, lowpoints and the orientation of the edges into tree edges and
+back edges (fronds) form the palm tree the path search works on.
+
+References
+----------
+.. [1] John E. Hopcroft, Robert E. Tarjan:
+    Dividing a graph into triconnected components
+    SIAM Journal on Computing 2(3), 1973
+.. [2] Carsten Gutwenger, Petra Mutzel:
+    A linear time implementation of SPQR-trees
+    Graph Drawing 2000, LNCS 1984
+"""
+from array import array
+
+import networkx as nx
+
+from planarity_checking.lr_planarity import LRPlanarity, NONE
+
+# types of the nodes of the SPQR tree
+SERIES, PARALLEL, RIGID = range(3)
+
+# types of the edges of the palm tree
+TREE, FROND = 1, 2
+
+# marks the end of the triples of a path on the stack of type-2 pairs
+EOS = -1
+
+
+def spqr_tree(G):
+    """Returns the SPQR tree of a biconnected graph
+
+    Parameters
+    ----------
+    G : NetworkX graph
+        A biconnected graph with at least three nodes. Self-loops and
+        multiple edges are ignored, like in :func:`check_planarity`.
+
+    Returns
+    -------
+    tree : SPQRTree
+        The triconnected components of G in flat integer arrays
+
+    Raises
+    ------
+    NetworkXException
+        If G is not biconnected or has less than three nodes
+
+    Examples
+    --------
+    >>> tree = spqr_tree(nx.cycle_graph(5))
+    >>> len(tree), tree.types[0] == SERIES
+    (1, True)
+    """
+    planarity_state = LRPlanarity(G)
+    planarity_state.lr_orientation()
+    _, num_blocks = planarity_state.biconnected_blocks()
+    if planarity_state.n < 3 or num_blocks != 1:
+        raise nx.NetworkXException(
+            "G is not biconnected or has less than three nodes.")
+    path_search = PathSearch(planarity_state)
+    path_search.run()
+    return path_search.spqr_tree()
+
+
+class SPQRTree(object):
+    """The triconnected components of a graph stored in flat integer arrays
+
+    The vertices are 0, ..., n-1 and ``nodes[v]`` is the label of v. The
+    edges 0, ..., m-1 are the edges of the graph, the edges m, m+1, ... are
+    virtual edges. Edge e joins ``edge_source[e]`` and ``edge_target[e]``.
+
+    Tree node i has the type ``types[i]`` (SERIES, PARALLEL or RIGID) and
+    its skeleton consists of the edges ``edges[offsets[i]:offsets[i + 1]]``.
+    Every edge of the graph is contained in one skeleton, every virtual
+    edge m + j in the two skeletons ``tree_source[j]`` and
+    ``tree_target[j]``, which are adjacent in the tree.
+    """
+    def __init__(self, nodes, edge_source, edge_target, types, offsets,
+                 edges, tree_source, tree_target):
+        self.nodes = nodes
+        self.edge_source = edge_source
+        self.edge_target = edge_target
+        self.types = types
+        self.offsets = offsets
+        self.edges = edges
+        self.tree_source = tree_source
+        self.tree_target = tree_target
+
+    def __len__(self):
+        return len(self.types)
+
+    def number_of_edges(self):
+        """Return the number of edges of the graph, without virtual edges"""
+        return len(self.edge_source) - len(self.tree_source)
+
+    def skeleton(self, i):
+        """Return the skeleton of tree node i as nx.MultiGraph
+
+        Every edge has the attribute 'virtual', the virtual edges also the
+        attribute 'node', the tree node on the other side.
+        """
+        m = self.number_of_edges()
+        nodes = self.nodes
+        skeleton = nx.MultiGraph()
+        for e in self.edges[self.offsets[i]:self.offsets[i + 1]]:
+            u, v = nodes[self.edge_source[e]], nodes[self.edge_target[e]]
+            if e < m:
+                skeleton.add_edge(u, v, virtual=False)
+            else:
+                j = e - m
+                other = self.tree_source[j] if self.tree_target[j] == i \
+                    else self.tree_target[j]
+                skeleton.add_edge(u, v, virtual=True, node=other)
+        return skeleton
+
+    def to_networkx(self):
+        """Return the tree as nx.Graph
+
+        The tree nodes are 0, ..., len(self) - 1 with the attribute 'type'
+        ('S', 'P' or 'R'), every tree edge has the attribute 'pair', the
+        separation pair of its virtual edge.
+        """
+        names = 'SPR'
+        nodes = self.nodes
+        m = self.number_of_edges()
+        tree = nx.Graph()
+        tree.add_nodes_from((i, {'type': names[t]})
+                            for i, t in enumerate(self.types))
+        for j in range(len(self.tree_source)):
+            pair = (nodes[self.edge_source[m + j]],
+                    nodes[self.edge_target[m + j]])
+            tree.add_edge(self.tree_source[j], self.tree_target[j],
+                          pair=pair)
+        return tree
+
+
+class PathSearch(object):
+    """State of the path search that splits off the triconnected components
+
+    It is set up from the orientation phase of an :class:`LRPlanarity`
+    object. Tree edges point from the parent to the child, fronds from a
+    vertex to an ancestor. Virtual edges are appended to the edge arrays
+    when they are created. The adjacency lists hold the outgoing edges of
+    every vertex in doubly linked lists of slots, so that edges can be
+    removed and a slot can be taken over by a virtual edge.
+    """
+    def __init__(self, planarity_state):
+        self.nodes = planarity_state.nodes
+        self.n = n = planarity_state.n
+        self.m = m = planarity_state.m
+        self.root = planarity_state.roots[0]
+        height = planarity_state.height
+
+        self.source = planarity_state.edge_source[:]
+        self.target = planarity_state.edge_target[:]
+        self.edge_type = array('b', [FROND]) * m
+        self.parent = array('i', [NONE]) * n
+        self.tree_arc = planarity_state.parent_edge[:]
+        for v in range(n):
+            e = self.tree_arc[v]
+            if e != NONE:
+                self.edge_type[e] = TREE
+                self.parent[v] = self.source[e]
+
+        self.degree = array('i', [0]) * n
+        for e in range(m):
+            self.degree[self.source[e]] += 1
+            self.degree[self.target[e]] += 1
+
+        # number of descendants, by decreasing height
+        self.nd = array('i', [1]) * n
+        by_height = planarity_state.get_dfs_index().vertices_by_height()
+        for v in reversed(by_height):
+            if self.parent[v] != NONE:
+                self.nd[self.parent[v]] += self.nd[v]
+
+        # lowpoints of the vertices as heights, the lowpoints of the parent
+        # edge include the height of the parent. This does not change any
+        # comparison of the path search, the graph is biconnected.
+        self.lowpt1 = array('i', [0]) * n
+        self.lowpt2 = array('i', [0]) * n
+        for v in range(n):
+            e = self.tree_arc[v]
+            if e != NONE:
+                self.lowpt1[v] = planarity_state.lowpt[e]
+                self.lowpt2[v] = planarity_state.lowpt2[e]
+        self.height = height
+
+        # the adjacency lists ordered by phi (bucket sort): tree edges
+        # (v, w) with lowpt2[w] < height[v] first, then fronds, then the
+        # other tree edges, each by the height of the lowest point
+        phi = array('i', [0]) * m
+        for e in range(m):
+            w = self.target[e]
+            if self.edge_type[e] == FROND:
+                phi[e] = 3 * height[w] + 1
+            elif self.lowpt2[w] < height[self.source[e]]:
+                phi[e] = 3 * self.lowpt1[w]
+            else:
+                phi[e] = 3 * self.lowpt1[w] + 2
+        bucket_offsets = array('i', [0]) * (3 * n + 2)
+        for e in range(m):
+            bucket_offsets[phi[e] + 1] += 1
+        for i in range(3 * n + 1):
+            bucket_offsets[i + 1] += bucket_offsets[i]
+        ordered = array('i', [NONE]) * m
+        for e in range(m):
+            ordered[bucket_offsets[phi[e]]] = e
+            bucket_offsets[phi[e]] += 1
+
+        self.adj_head = array('i', [NONE]) * n
+        adj_tail = array('i', [NONE]) * n
+        self.slot_edge = array('i', [NONE]) * m
+        self.slot_next = array('i', [NONE]) * m
+        self.slot_prev = array('i', [NONE]) * m
+        self.in_adj = array('i', [NONE]) * m
+        for s, e in enumerate(ordered):
+            v = self.source[e]
+            self.slot_edge[s] = e
+            self.in_adj[e] = s
+            if adj_tail[v] == NONE:
+                self.adj_head[v] = s
+            else:
+                self.slot_next[adj_tail[v]] = s
+                self.slot_prev[s] = adj_tail[v]
+            adj_tail[v] = s
+
+        # the fronds ending at each vertex in doubly linked lists of items,
+        # holding the number of the source of the frond
+        self.high_head = array('i', [NONE]) * n
+        self.high_tail = array('i', [NONE]) * n
+        self.high_value = array('i')
+        self.high_next = array('i')
+        self.high_prev = array('i')
+        self.in_high = array('i', [NONE]) * m
+
+        self.starts_path = bytearray(m)
+        self.newnum = array('i', [0]) * n
+        self.node_at = array('i', [NONE]) * (n + 1)
+
+        # stack of triples (h, a, b) for type-2 pairs, EOS separates paths
+        self.t_stack_h = array('i', [0])
+        self.t_stack_a = array('i', [EOS])
+        self.t_stack_b = array('i', [0])
+        self.e_stack = array('i')
+
+        # components as lists of edges, with their types
+        self.components = []
+        self.component_types = []
+
+    def run(self):
+        """Find the triconnected components"""
+        self.path_finder()
+        self.path_search()
+        # the rest of the graph forms the last component
+        edges = list(self.e_stack)
+        self.add_component(RIGID if len(edges) > 4 else SERIES, edges)
+
+    def new_virtual_edge(self, u, v):
+        """Add a virtual edge (u, v) and return its id"""
+        e = len(self.source)
+        self.source.append(u)
+        self.target.append(v)
+        self.edge_type.append(0)
+        self.in_adj.append(NONE)
+        self.in_high.append(NONE)
+        self.starts_path.append(0)
+        return e
+
+    def add_component(self, component_type, edges):
+        self.components.append(edges)
+        self.component_types.append(component_type)
+
+    def finish_rigid_or_series(self, edges, e_virt):
+        """Add a component closed by the virtual edge e_virt"""
+        edges.append(e_virt)
+        self.add_component(RIGID if len(edges) >= 4 else SERIES, edges)
+
+    def adj_remove(self, s):
+        """Remove slot s from the adjacency list of its edge's source"""
+        prev, next_ = self.slot_prev[s], self.slot_next[s]
+        if prev == NONE:
+            self.adj_head[self.source[self.slot_edge[s]]] = next_
+        else:
+            self.slot_next[prev] = next_
+        if next_ != NONE:
+            self.slot_prev[next_] = prev
+
+    def high(self, v):
+        """Return the number of the first visited frond source ending at v"""
+        item = self.high_head[v]
+        return 0 if item == NONE else self.high_value[item]
+
+    def high_insert(self, v, value, front):
+        """Insert an item into the frond list of v and return it"""
+        item = len(self.high_value)
+        self.high_value.append(value)
+        if self.high_head[v] == NONE:
+            self.high_next.append(NONE)
+            self.high_prev.append(NONE)
+            self.high_head[v] = self.high_tail[v] = item
+        elif front:
+            self.high_next.append(self.high_head[v])
+            self.high_prev.append(NONE)
+            self.high_prev[self.high_head[v]] = item
+            self.high_head[v] = item
+        else:
+            self.high_next.append(NONE)
+            self.high_prev.append(self.high_tail[v])
+            self.high_next[self.high_tail[v]] = item
+            self.high_tail[v] = item
+        return item
+
+    def del_high(self, e):
+        """Remove the frond e from the frond list of its target"""
+        item = self.in_high[e]
+        if item == NONE:
+            return
+        self.in_high[e] = NONE
+        v = self.target[e]
+        prev, next_ = self.high_prev[item], self.high_next[item]
+        if prev == NONE:
+            self.high_head[v] = next_
+        else:
+            self.high_next[prev] = next_
+        if next_ == NONE:
+            self.high_tail[v] = prev
+        else:
+            self.high_prev[next_] = prev
+
+    def path_finder(self):
+        """Number the vertices and mark the edges that start a path
+
+        The vertices are numbered such that the subtree of v has the numbers
+        newnum[v], ..., newnum[v] + nd[v] - 1, and the children visited
+        first get the highest numbers. The lowpoints are converted from
+        heights to these numbers and the frond lists are built.
+        """
+        n = self.n
+        newnum, nd = self.newnum, self.nd
+        slot_edge, slot_next = self.slot_edge, self.slot_next
+        path = array('i', [NONE]) * n  # vertex on the DFS path by height
+        cur = self.adj_head[:]
+        counter = n
+        new_path = True
+
+        root = self.root
+        path[0] = root
+        newnum[root] = 1
+        dfs_stack = [root]
+        returned = False
+        while dfs_stack:
+            v = dfs_stack[-1]
+            if returned:
+                counter -= 1
+                cur[v] = slot_next[cur[v]]
+                returned = False
+            while cur[v] != NONE:
+                e = slot_edge[cur[v]]
+                w = self.target[e]
+                if new_path:
+                    new_path = False
+                    self.starts_path[e] = 1
+                if self.edge_type[e] == TREE:
+                    path[self.height[w]] = w
+                    newnum[w] = counter - nd[w] + 1
+                    self.lowpt1[w] = newnum[path[self.lowpt1[w]]]
+                    self.lowpt2[w] = newnum[path[self.lowpt2[w]]]
+                    dfs_stack.append(w)
+                    break
+                self.in_high[e] = self.high_insert(w, newnum[v], False)
+                new_path = True
+                cur[v] = slot_next[cur[v]]
+            else:
+                dfs_stack.pop()
+                returned = True
+
+        for v in range(n):
+            self.node_at[newnum[v]] = v
+
+    def t_stack_push(self, h, a, b):
+        self.t_stack_h.append(h)
+        self.t_stack_a.append(a)
+        self.t_stack_b.append(b)
+
+    def t_stack_pop(self):
+        self.t_stack_h.pop()
+        self.t_stack_a.pop()
+        self.t_stack_b.pop()
+
+    def t_stack_update(self, a_new, y, h_new, vnum):
+        """Replace the triples with a > a_new by one triple for a new path
+
+        The new triple gets the largest h of the removed triples and y. If
+        no triple is removed, (h_new, a_new, vnum) is pushed instead.
+        """
+        if self.t_stack_a[-1] > a_new:
+            while self.t_stack_a[-1] > a_new:
+                y = max(y, self.t_stack_h[-1])
+                b = self.t_stack_b[-1]
+                self.t_stack_pop()
+            self.t_stack_push(y, a_new, b)
+        else:
+            self.t_stack_push(h_new, a_new, vnum)
+
+    def path_search(self):
+        """Split off the components at the separation pairs
+
+        An iterative DFS over the adjacency lists. The position in the
+        adjacency list of every vertex on the DFS path is kept in cur, the
+        edge taken there in cur_edge and the position after it in nxt,
+        since the slot of cur may be removed or taken over by a virtual
+        edge while the subtree is handled.
+        """
+        n = self.n
+        newnum, nd = self.newnum, self.nd
+        slot_edge, slot_next = self.slot_edge, self.slot_next
+        cur = self.adj_head[:]
+        nxt = array('i', [NONE]) * n
+        cur_edge = array('i', [NONE]) * n
+        # number of edges not yet handled in the adjacency list
+        outv = array('i', [0]) * n
+
+        def enter(v):
+            count = 0
+            s = self.adj_head[v]
+            while s != NONE:
+                count += 1
+                s = slot_next[s]
+            outv[v] = count
+            cur[v] = self.adj_head[v]
+
+        enter(self.root)
+        dfs_stack = [self.root]
+        returned = False
+        while dfs_stack:
+            v = dfs_stack[-1]
+            vnum = newnum[v]
+            if returned:
+                self.tree_arc_returned(v, cur[v], cur_edge[v], outv[v])
+                outv[v] -= 1
+                cur[v] = nxt[v]
+                returned = False
+            while cur[v] != NONE:
+                e = slot_edge[cur[v]]
+                nxt[v] = slot_next[cur[v]]
+                cur_edge[v] = e
+                w = self.target[e]
+                wnum = newnum[w]
+                if self.edge_type[e] == TREE:
+                    if self.starts_path[e]:
+                        h = wnum + nd[w] - 1
+                        self.t_stack_update(self.lowpt1[w], h, h, vnum)
+                        self.t_stack_push(0, EOS, 0)
+                    enter(w)
+                    dfs_stack.append(w)
+                    break
+                if self.starts_path[e]:
+                    self.t_stack_update(wnum, 0, vnum, vnum)
+                self.e_stack.append(e)
+                cur[v] = nxt[v]
+            else:
+                dfs_stack.pop()
+                returned = True
+
+    def first_child_num(self, w):
+        """Return the number of the target of the first edge of w"""
+        s = self.adj_head[w]
+        return 0 if s == NONE else self.newnum[self.target[self.slot_edge[s]]]
+
+    def tree_arc_returned(self, v, it, e, outv):
+        """Check for separation pairs after returning from the tree arc e
+
+        it is the slot of e in the adjacency list of v, outv the number of
+        edges of v not handled before e.
+        """
+        newnum, nd = self.newnum, self.nd
+        source, target = self.source, self.target
+        degree, e_stack = self.degree, self.e_stack
+        t_stack_a, t_stack_b = self.t_stack_a, self.t_stack_b
+        node_at = self.node_at
+        vnum = newnum[v]
+        w = target[e]
+        wnum = newnum[w]
+
+        e_stack.append(self.tree_arc[w])
+
+        # type-2 pairs
+        while vnum != 1 and (
+                t_stack_a[-1] == vnum or
+                (degree[w] == 2 and self.first_child_num(w) > wnum)):
+            a, b = t_stack_a[-1], t_stack_b[-1]
+            if a == vnum and self.parent[node_at[b]] == node_at[a]:
+                self.t_stack_pop()
+                continue
+            e_ab = NONE
+            if degree[w] == 2 and self.first_child_num(w) > wnum:
+                # w has only the edges (v, w) and (w, x)
+                e1 = e_stack.pop()
+                e2 = e_stack.pop()
+                self.adj_remove(self.in_adj[e2])
+                x = target[e2]
+                e_virt = self.new_virtual_edge(v, x)
+                degree[v] -= 1
+                degree[x] -= 1
+                self.add_component(SERIES, [e1, e2, e_virt])
+                if e_stack:
+                    e1 = e_stack[-1]
+                    if source[e1] == x and target[e1] == v:
+                        e_ab = e_stack.pop()
+                        self.adj_remove(self.in_adj[e_ab])
+                        self.del_high(e_ab)
+            else:
+                h = self.t_stack_h[-1]
+                self.t_stack_pop()
+                edges = []
+                while e_stack:
+                    xy = e_stack[-1]
+                    x, y = source[xy], target[xy]
+                    if not (vnum <= newnum[x] <= h and vnum <= newnum[y] <= h):
+                        break
+                    if (newnum[x] == a and newnum[y] == b) or \
+                            (newnum[y] == a and newnum[x] == b):
+                        e_ab = e_stack.pop()
+                        self.adj_remove(self.in_adj[e_ab])
+                        self.del_high(e_ab)
+                    else:
+                        eh = e_stack.pop()
+                        if it != self.in_adj[eh]:
+                            self.adj_remove(self.in_adj[eh])
+                            self.del_high(eh)
+                        edges.append(eh)
+                        degree[x] -= 1
+                        degree[y] -= 1
+                e_virt = self.new_virtual_edge(node_at[a], node_at[b])
+                self.finish_rigid_or_series(edges, e_virt)
+                x = node_at[b]
+
+            if e_ab != NONE:
+                e_bond = self.new_virtual_edge(v, x)
+                self.add_component(PARALLEL, [e_ab, e_virt, e_bond])
+                e_virt = e_bond
+                degree[x] -= 1
+                degree[v] -= 1
+
+            e_stack.append(e_virt)
+            self.slot_edge[it] = e_virt
+            self.in_adj[e_virt] = it
+            degree[x] += 1
+            degree[v] += 1
+            self.parent[x] = v
+            self.tree_arc[x] = e_virt
+            self.edge_type[e_virt] = TREE
+            w = x
+            wnum = newnum[w]
+
+        # type-1 pair
+        low = self.lowpt1[w]
+        if self.lowpt2[w] >= vnum and low < vnum and \
+                (self.parent[v] != self.root or outv >= 2):
+            edges = []
+            xnum = ynum = NONE
+            while e_stack:
+                xy = e_stack[-1]
+                x, y = source[xy], target[xy]
+                xnum, ynum = newnum[x], newnum[y]
+                if not (wnum <= xnum < wnum + nd[w] or
+                        wnum <= ynum < wnum + nd[w]):
+                    break
+                edges.append(e_stack.pop())
+                self.del_high(xy)
+                degree[x] -= 1
+                degree[y] -= 1
+            u = node_at[low]
+            e_virt = self.new_virtual_edge(v, u)
+            self.finish_rigid_or_series(edges, e_virt)
+
+            if (xnum == vnum and ynum == low) or \
+                    (ynum == vnum and xnum == low):
+                # the edge (v, u) on the stack is parallel to e_virt
+                eh = e_stack.pop()
+                if it != self.in_adj[eh]:
+                    self.adj_remove(self.in_adj[eh])
+                e_bond = self.new_virtual_edge(v, u)
+                self.add_component(PARALLEL, [eh, e_virt, e_bond])
+                self.in_high[e_bond] = self.in_high[eh]
+                e_virt = e_bond
+                degree[v] -= 1
+                degree[u] -= 1
+
+            if u != self.parent[v]:
+                e_stack.append(e_virt)
+                self.slot_edge[it] = e_virt
+                self.in_adj[e_virt] = it
+                if self.in_high[e_virt] == NONE and self.high(u) < vnum:
+                    self.in_high[e_virt] = self.high_insert(u, vnum, True)
+                degree[v] += 1
+                degree[u] += 1
+            else:
+                # e_virt is parallel to the tree arc (u, v)
+                self.adj_remove(it)
+                e_bond = self.new_virtual_edge(u, v)
+                eh = self.tree_arc[v]
+                self.add_component(PARALLEL, [e_virt, e_bond, eh])
+                self.tree_arc[v] = e_bond
+                self.edge_type[e_bond] = TREE
+                self.in_adj[e_bond] = self.in_adj[eh]
+                self.slot_edge[self.in_adj[eh]] = e_bond
+
+        if self.starts_path[e]:
+            while t_stack_a[-1] != EOS:
+                self.t_stack_pop()
+            self.t_stack_pop()
+        while t_stack_a[-1] != EOS and t_stack_b[-1] != vnum and \
+                t_stack_a[-1] != vnum and self.high(v) > self.t_stack_h[-1]:
+            self.t_stack_pop()
+
+    def spqr_tree(self):
+        """Merge adjacent bonds and adjacent polygons into the SPQR tree"""
+        m = self.m
+        num_edges = len(self.source)
+        # the two components of every virtual edge
+        first = array('i', [NONE]) * num_edges
+        second = array('i', [NONE]) * num_edges
+        for c, edges in enumerate(self.components):
+            for e in edges:
+                if first[e] == NONE:
+                    first[e] = c
+                else:
+                    second[e] = c
+
+        # merge components of the same type along virtual edges
+        types = self.component_types
+        leader = list(range(len(self.components)))
+
+        def find(c):
+            while leader[c] != c:
+                leader[c] = leader[leader[c]]
+                c = leader[c]
+            return c
+
+        merged = bytearray(num_edges)
+        for e in range(m, num_edges):
+            c, d = first[e], second[e]
+            if types[c] == types[d] and types[c] != RIGID:
+                merged[e] = 1
+                leader[find(c)] = find(d)
+
+        # renumber the tree nodes and the remaining virtual edges
+        node_id = array('i', [NONE]) * len(self.components)
+        tree_types = array('b')
+        for c in range(len(self.components)):
+            if find(c) == c:
+                node_id[c] = len(tree_types)
+                tree_types.append(types[c])
+        edge_id = array('i', range(m)) + array('i', [NONE]) * (num_edges - m)
+        edge_source = self.source[:m]
+        edge_target = self.target[:m]
+        tree_source = array('i')
+        tree_target = array('i')
+        for e in range(m, num_edges):
+            if not merged[e]:
+                edge_id[e] = len(edge_source)
+                edge_source.append(self.source[e])
+                edge_target.append(self.target[e])
+                tree_source.append(node_id[find(first[e])])
+                tree_target.append(node_id[find(second[e])])
+
+        offsets = array('i', [0]) * (len(tree_types) + 1)
+        for c, edges in enumerate(self.components):
+            i = node_id[find(c)]
+            offsets[i + 1] += sum(1 for e in edges if not merged[e])
+        for i in range(len(tree_types)):
+            offsets[i + 1] += offsets[i]
+        tree_edges = array('i', [NONE]) * offsets[-1]
+        pos = offsets[:-1]
+        for c, edges in enumerate(self.components):
+            i = node_id[find(c)]
+            for e in edges:
+                if not merged[e]:
+                    tree_edges[pos[i]] = edge_id[e]
+                    pos[i] += 1
+
+        return SPQRTree(self.nodes, edge_source, edge_target, tree_types,
+                        offsets, tree_edges, tree_source, tree_target)
@@ -0,0 +1,127 @@
+"""Timings and counters of a planarity test
+
+A :class:`PlanarityStats` object is passed to :func:`check_planarity` or
+:class:`LRPlanarity` to record the time of every phase of the LR test and
+counters of the testing phase. Without it nothing is recorded.
+"""
+import json
+import tracemalloc
+from contextlib import contextmanager
+from timeit import default_timer as timer
+
+
+class PlanarityStats(object):
+    """Records the phases and counters of planarity tests
+
+    The phases are the ones of :class:`LRPlanarity`:
+
+    - copy: building the CSR arrays and allocating the state
+    - orientation: the DFS orientation with lowpoints and nesting depths
+    - sorting: ordering the adjacency lists (once for the testing phase and
+      once for the embedding)
+    - testing: the LR partition test with the conflict-pair stack
+    - sign: resolving the relative sides along the ref chains
+    - embedding: building the rotation system
+    - output: converting the rotation system to the returned embedding
+    - counterexample: extracting a Kuratowski subgraph
+
+    The counters are the numbers of tree and back edges, conflict pairs
+    pushed and merged, the maximum height of the conflict-pair stack and
+    the total and maximum length of the ref chains followed while
+    resolving the signs.
+
+    If the same object is used for several tests, times and counters are
+    summed up and maxima are kept. Phases may be nested, e.g. an
+    orientation run while extracting a counterexample. The time and peak
+    memory of an outer phase include those of its inner phases.
+
+    Parameters
+    ----------
+    trace_memory : bool
+        If set, the peak memory allocated during every phase is recorded
+        with :mod:`tracemalloc`. This slows down the test considerably.
+
+    Attributes
+    ----------
+    phases : dict
+        Maps the phase names to dicts with the total 'time' in seconds, the
+        number of 'calls' and, if memory is traced, the 'peak_memory' in
+        bytes
+    counters : dict
+        Maps the counter names to their values
+    """
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.phases = {}
+        self.counters = {}
+        # the time of the top-level phases and the absolute peak memory
+        # seen so far by every open phase, innermost last
+        self.top_level_time = 0.0
+        self._open_peaks = []
+
+    @contextmanager
+    def phase(self, name):
+        """Context manager recording the time (and memory) of a phase"""
+        open_peaks = self._open_peaks
+        top_level = not open_peaks
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            # the reset would lose the peak of the enclosing phase
+            if open_peaks:
+                open_peaks[-1] = max(open_peaks[-1],
+                                     tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        open_peaks.append(0)
+        start = timer()
+        try:
+            yield
+        finally:
+            elapsed = timer() - start
+            peak = open_peaks.pop()
+            record = self.phases.setdefault(name, {'time': 0.0, 'calls': 0})
+            record['time'] += elapsed
+            record['calls'] += 1
+            if top_level:
+                self.top_level_time += elapsed
+            if self.trace_memory:
+                peak = max(peak, tracemalloc.get_traced_memory()[1])
+                if open_peaks:
+                    open_peaks[-1] = max(open_peaks[-1], peak)
+                record['peak_memory'] = max(record.get('peak_memory', 0),
+                                            peak - base)
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def count(self, name, k=1):
+        """Add k to a counter"""
+        self.counters[name] = self.counters.get(name, 0) + k
+
+    def maximum(self, name, value):
+        """Raise a counter to value if it is lower"""
+        if value > self.counters.get(name, 0):
+            self.counters[name] = value
+
+    def total_time(self):
+        """Return the sum of the times of all top-level phases
+
+        The time of a nested phase is already part of the time of the
+        phase enclosing it and is not counted again.
+        """
+        return self.top_level_time
+
+    def as_dict(self):
+        """Return the phases and counters as dict of plain values"""
+        return {'phases': {name: dict(record)
+                           for name, record in self.phases.items()},
+                'counters': dict(self.counters)}
+
+    def to_json(self, **kwargs):
+        """Return the phases and counters as JSON string
+
+        The keyword arguments are passed to :func:`json.dumps`.
+        """
+        return json.dumps(self.as_dict(), **kwargs)
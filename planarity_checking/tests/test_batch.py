@@ -0,0 +1,79 @@
+from itertools import count
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true
+from planarity_checking import lr_planarity, batch
+from test_lr_planarity import check_counterexample
+
+
+class TestBatch:
+    """Unit tests for :mod:`planarity_checking.batch`."""
+
+    @staticmethod
+    def graphs():
+        graphs = [nx.gnm_random_graph(20, m, seed=m) for m in range(0, 60, 3)]
+        graphs += [nx.complete_graph(5), nx.grid_2d_graph(5, 5),
+                   nx.Graph([(1, 1), (1, 2)]), nx.empty_graph(3)]
+        return graphs
+
+    def check_results(self, graphs, results, counterexample):
+        assert_equals(len(results), len(graphs))
+        for G, (is_planar, certificate) in zip(graphs, results):
+            assert_equals(is_planar, lr_planarity.check_planarity(G)[0])
+            if is_planar:
+                embedding = nx.PlanarEmbedding()
+                embedding.set_data(certificate)
+                embedding.check_structure()
+                assert_equals(set(certificate), set(G))
+            elif counterexample:
+                check_counterexample(certificate, certificate)
+            else:
+                assert_equals(certificate, None)
+
+    def test_single_worker(self):
+        graphs = self.graphs()
+        results = list(batch.check_planarity_many(graphs, workers=1))
+        self.check_results(graphs, results, False)
+
+    def test_process_pool(self):
+        graphs = self.graphs()
+        results = list(batch.check_planarity_many(
+            graphs, counterexample=True, workers=2, chunksize=3))
+        self.check_results(graphs, results, True)
+
+    def test_same_embedding(self):
+        # the workers produce the embedding of check_planarity
+        graphs = self.graphs()
+        for G, result in zip(graphs, batch.check_planarity_many(graphs,
+                                                                workers=2)):
+            assert_equals(result, lr_planarity.check_planarity(G))
+
+    def test_stream(self):
+        # the input is consumed lazily
+        graphs = (nx.cycle_graph(n) for n in range(3, 100))
+        results = batch.check_planarity_many(graphs, workers=2)
+        for _ in range(10):
+            is_planar, _ = next(results)
+            assert_true(is_planar)
+
+    def test_bounded_read_ahead(self):
+        # an endless stream is read only a few chunks ahead
+        consumed = []
+
+        def graphs():
+            for n in count(3):
+                consumed.append(n)
+                yield nx.cycle_graph(n)
+
+        results = batch.check_planarity_many(graphs(), workers=2,
+                                             chunksize=4)
+        for _ in range(20):
+            assert_true(next(results)[0])
+        assert_true(len(consumed) <= 20 + 4 * 4)
+        results.close()
+
+    def test_edge_arrays(self):
+        G = nx.MultiGraph([(1, 2), (2, 1), (2, 2), (2, 3)])
+        nodes, sources, targets = batch.graph_to_edge_arrays(G)
+        assert_equals(nodes, [1, 2, 3])
+        assert_equals(list(zip(sources, targets)), [(0, 1), (1, 2)])
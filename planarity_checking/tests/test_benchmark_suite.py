@@ -0,0 +1,43 @@
+import copy
+
+from nose.tools import assert_equals, assert_true, assert_false
+from planarity_checking.benchmark_suite import (FAMILIES, run_case,
+                                                run_suite, compare)
+
+
+class TestBenchmarkSuite:
+    """Unit tests for :mod:`planarity_checking.benchmark_suite`."""
+
+    def test_run_case(self):
+        result = run_case('apollonian', 500)
+        assert_equals(result['n'], 500)
+        assert_equals(result['m'], 3 * 500 - 6)
+        assert_true(result['planar'])
+        for phase in ['copy', 'orientation', 'sorting', 'testing', 'sign',
+                      'embedding', 'output']:
+            assert_true(result['phases'][phase]['time'] >= 0)
+            assert_true(result['phases'][phase]['peak_memory'] >= 0)
+        assert_equals(result['peak_memory'],
+                      max(p['peak_memory']
+                          for p in result['phases'].values()))
+        assert_equals(result['counters']['back_edges'], 3 * 500 - 6 - 499)
+
+    def test_compare(self):
+        results = run_suite(sizes=[200], trace_memory=False)
+        assert_equals(len(results['cases']), len(FAMILIES))
+        assert_false(results['cases']['planted_k5/200']['planar'])
+        assert_equals(compare(results, results), [])
+
+        # a faster and smaller baseline, and a different result
+        baseline = copy.deepcopy(results)
+        case = baseline['cases']['grid/200']
+        case['total_time'] = results['cases']['grid/200']['total_time'] / 4
+        case['planar'] = False
+        results['cases']['grid/200']['total_time'] = 1.0
+        results['cases']['grid/200']['peak_memory'] = 2000
+        case['peak_memory'] = 1000
+        # cases missing in the baseline are ignored
+        del baseline['cases']['heavy_wheel/200']
+        regressions = compare(results, baseline)
+        assert_equals(len(regressions), 3)
+        assert_true(all(r.startswith('grid/200') for r in regressions))
@@ -0,0 +1,93 @@
+import networkx as nx
+from nose.tools import assert_equals, assert_true
+from planarity_checking import lr_planarity, blocks
+from test_lr_planarity import check_counterexample
+
+
+def block_graph(parts):
+    """Glue the given graphs together at single vertices (a tree of blocks)"""
+    G = nx.Graph()
+    offset = 0
+    for i, H in enumerate(parts):
+        H = nx.convert_node_labels_to_integers(H, first_label=offset)
+        G.add_edges_from(H.edges)
+        if i > 0:
+            # identify the first node of H with a node of the graph so far
+            G = nx.contracted_nodes(G, offset // 2, offset, self_loops=False)
+        offset += H.number_of_nodes()
+    return G
+
+
+class TestBlocks:
+    """Unit tests for :mod:`planarity_checking.blocks`."""
+
+    @staticmethod
+    def check(G, is_planar, counterexample=True, **kwargs):
+        result, certificate = blocks.check_planarity_blocks(
+            G, counterexample=counterexample, **kwargs)
+        assert_equals(result, is_planar)
+        assert_equals(result, lr_planarity.check_planarity(G)[0])
+        if result:
+            assert_equals(set(certificate), set(G))
+            embedding = nx.PlanarEmbedding()
+            embedding.set_data(certificate)
+            embedding.check_structure()
+            assert_equals(embedding.number_of_edges(),
+                          2 * (G.number_of_edges() -
+                               nx.number_of_selfloops(G)))
+        elif counterexample:
+            for u, v in certificate.edges:
+                assert_true(G.has_edge(u, v))
+            check_counterexample(certificate, certificate)
+
+    def test_planar_blocks(self):
+        G = block_graph([nx.wheel_graph(6), nx.cycle_graph(5),
+                         nx.grid_2d_graph(3, 3), nx.path_graph(4),
+                         nx.octahedral_graph()])
+        self.check(G, True)
+
+    def test_non_planar_block(self):
+        G = block_graph([nx.wheel_graph(6), nx.petersen_graph(),
+                         nx.cycle_graph(5)])
+        self.check(G, False)
+
+    def test_dense_block(self):
+        G = block_graph([nx.cycle_graph(5), nx.complete_graph(7)])
+        self.check(G, False)
+
+    def test_forest_and_isolated_nodes(self):
+        G = nx.Graph([(1, 2), (2, 3), (4, 5), (6, 6)])
+        G.add_node(7)
+        self.check(G, True)
+
+    def test_random_graphs(self):
+        for seed in range(40):
+            G = nx.gnm_random_graph(30, 35 + seed, seed=seed)
+            is_planar = lr_planarity.check_planarity(G)[0]
+            self.check(G, is_planar)
+
+    def test_parallel_blocks(self):
+        G = block_graph([nx.grid_2d_graph(4, 4), nx.wheel_graph(20),
+                         nx.octahedral_graph(), nx.grid_2d_graph(5, 3)])
+        self.check(G, True, workers=2, parallel_block_size=10)
+        G = block_graph([nx.grid_2d_graph(4, 4), nx.complete_graph(5),
+                         nx.grid_2d_graph(5, 3)])
+        self.check(G, False, workers=2, parallel_block_size=1)
+
+    def test_block_partition(self):
+        for seed in range(20):
+            G = nx.gnm_random_graph(25, 30, seed=seed)
+            planarity_state = lr_planarity.LRPlanarity(G)
+            planarity_state.lr_orientation()
+            edge_block, num_blocks = planarity_state.biconnected_blocks()
+            found = {}
+            for e, b in enumerate(edge_block):
+                u = planarity_state.nodes[planarity_state.edge_source[e]]
+                v = planarity_state.nodes[planarity_state.edge_target[e]]
+                found.setdefault(b, set()).add(frozenset((u, v)))
+            expected = set(
+                frozenset(frozenset(e) for e in component)
+                for component in nx.biconnected_component_edges(G))
+            assert_equals(len(found), num_blocks)
+            assert_equals(set(frozenset(s) for s in found.values()),
+                          expected)
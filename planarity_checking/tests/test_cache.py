@@ -0,0 +1,136 @@
+import shutil
+import tempfile
+from contextlib import contextmanager
+from multiprocessing import Pool
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true, assert_false, \
+    assert_not_equal
+from planarity_checking.cache import PlanarityCache, graph_key
+from planarity_checking.tests.test_lr_planarity import check_embedding, \
+    check_counterexample
+
+
+@contextmanager
+def cache_directory():
+    """Yield a temporary directory that is removed afterwards"""
+    path = tempfile.mkdtemp()
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path)
+
+
+def check_in_directory(args):
+    """Check the planarity of a wheel with a shared cache directory"""
+    path, size = args
+    cache = PlanarityCache(path=path)
+    is_planar, embedding = cache.check_planarity(nx.wheel_graph(size))
+    return is_planar, cache.info()
+
+
+class TestPlanarityCache:
+    """Unit tests for :mod:`planarity_checking.cache`."""
+
+    def test_graph_key(self):
+        G = nx.Graph([(0, 1), (1, 2), (2, 0)])
+        H = nx.Graph([(2, 1), (0, 2), (1, 0)])
+        H.add_edge(1, 1)
+        assert_equals(graph_key(G), graph_key(H))
+        assert_equals(graph_key(G), graph_key(nx.DiGraph([(0, 1), (2, 1),
+                                                          (2, 0)])))
+        H.add_node(3)
+        assert_not_equal(graph_key(G), graph_key(H))
+        assert_not_equal(graph_key(G), graph_key(nx.path_graph(3)))
+        assert_not_equal(graph_key(nx.Graph([('1', 2)])),
+                         graph_key(nx.Graph([(1, '2')])))
+
+    def test_hits_and_misses(self):
+        cache = PlanarityCache()
+        G = nx.grid_2d_graph(5, 5)
+        is_planar, embedding = cache.check_planarity(G)
+        assert_true(is_planar)
+        check_embedding(G, embedding)
+        # modifying the result does not change the cache
+        embedding.clear()
+        H = nx.Graph(list(G.edges)[::-1])
+        is_planar, embedding = cache.check_planarity(H)
+        check_embedding(G, embedding)
+        assert_equals((cache.hits, cache.misses), (1, 1))
+
+        is_planar, rotation_system = cache.check_planarity(G, compact=True)
+        assert_true(is_planar)
+        assert_equals(rotation_system.to_dict(), embedding)
+        assert_equals(cache.hits, 2)
+
+    def test_counterexample(self):
+        cache = PlanarityCache()
+        G = nx.petersen_graph()
+        assert_equals(cache.check_planarity(G), (False, None))
+        # the certificate is computed when it is needed the first time
+        is_planar, subgraph = cache.check_planarity(G, counterexample=True)
+        assert_false(is_planar)
+        assert_true(all(G.has_edge(u, v) for u, v in subgraph.edges))
+        check_counterexample(subgraph, subgraph)
+        assert_equals((cache.hits, cache.misses), (0, 2))
+        subgraph.clear()
+        is_planar, subgraph = cache.check_planarity(G, counterexample=True)
+        check_counterexample(subgraph, subgraph)
+        assert_true(subgraph.graph['kuratowski_type'] in ('K5', 'K3,3'))
+        assert_equals(cache.check_planarity(G), (False, None))
+        assert_equals((cache.hits, cache.misses), (2, 2))
+
+    def test_lru(self):
+        cache = PlanarityCache(maxsize=2)
+        graphs = [nx.cycle_graph(k) for k in (3, 4, 5)]
+        cache.check_planarity(graphs[0])
+        cache.check_planarity(graphs[1])
+        cache.check_planarity(graphs[0])  # 1 is least recently used now
+        cache.check_planarity(graphs[2])
+        assert_equals(cache.info()['size'], 2)
+        cache.check_planarity(graphs[0])
+        assert_equals((cache.hits, cache.misses), (2, 3))
+        cache.check_planarity(graphs[1])
+        assert_equals((cache.hits, cache.misses), (2, 4))
+
+    def test_directory(self):
+        with cache_directory() as path:
+            G = nx.wheel_graph(12)
+            cache = PlanarityCache(path=path)
+            cache.check_planarity(G)
+            other = PlanarityCache(maxsize=1, path=path)
+            is_planar, embedding = other.check_planarity(G)
+            check_embedding(G, embedding)
+            assert_equals(other.info(), {'hits': 1, 'disk_hits': 1,
+                                         'misses': 0, 'maxsize': 1,
+                                         'size': 1})
+
+    def test_directory_without_counterexample(self):
+        with cache_directory() as path:
+            G = nx.complete_graph(5)
+            PlanarityCache(path=path).check_planarity(G)
+            # the stored entry has no certificate, the test runs again
+            cache = PlanarityCache(path=path)
+            is_planar, subgraph = cache.check_planarity(G, True)
+            assert_equals(set(map(frozenset, subgraph.edges)),
+                          set(map(frozenset, G.edges)))
+            assert_equals((cache.hits, cache.disk_hits, cache.misses),
+                          (0, 0, 1))
+            # the new entry with the certificate replaced the old one
+            other = PlanarityCache(path=path)
+            other.check_planarity(G, True)
+            assert_equals((other.hits, other.disk_hits, other.misses),
+                          (1, 1, 0))
+
+    def test_processes(self):
+        with cache_directory() as path:
+            with Pool(2) as pool:
+                results = pool.map(check_in_directory,
+                                   [(path, k % 3 + 5) for k in range(12)])
+            assert_true(all(is_planar for is_planar, _ in results))
+            cache = PlanarityCache(path=path)
+            for k in range(5, 8):
+                is_planar, embedding = cache.check_planarity(
+                    nx.wheel_graph(k))
+                check_embedding(nx.wheel_graph(k), embedding)
+            assert_equals(cache.disk_hits, 3)
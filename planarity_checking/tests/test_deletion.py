@@ -0,0 +1,82 @@
+import random
+
+import networkx as nx
+from nose.tools import assert_equals, raises
+from planarity_checking import lr_planarity
+from planarity_checking.deletion import check_planarity_deletions
+
+
+def brute_force(G, edges):
+    result = []
+    for u, v in edges:
+        H = G.copy()
+        H.remove_edge(u, v)
+        result.append(lr_planarity.check_planarity(H)[0])
+    return result
+
+
+class TestDeletion:
+    """Unit tests for :mod:`planarity_checking.deletion`."""
+
+    @staticmethod
+    def check(G, edges=None):
+        if edges is None:
+            edges = list(G.edges)
+        assert_equals(check_planarity_deletions(G, edges),
+                      brute_force(G, edges))
+
+    def test_planar(self):
+        G = nx.grid_2d_graph(4, 4)
+        assert_equals(check_planarity_deletions(G, G.edges),
+                      [True] * G.number_of_edges())
+
+    def test_kuratowski(self):
+        self.check(nx.complete_graph(5))
+        self.check(nx.complete_bipartite_graph(3, 3))
+        self.check(nx.petersen_graph())
+
+    def test_dense(self):
+        G = nx.complete_graph(6)
+        assert_equals(check_planarity_deletions(G, G.edges),
+                      [False] * G.number_of_edges())
+
+    def test_subdivision_in_grid(self):
+        # a subdivided K3,3 glued into a grid, some edges are critical
+        G = nx.convert_node_labels_to_integers(nx.grid_2d_graph(4, 4))
+        H = nx.complete_bipartite_graph(3, 3)
+        H = nx.relabel_nodes(H, {v: v + 100 for v in H})
+        for u, v in list(H.edges):
+            nx.add_path(G, [u, (u, v), v])
+        G.add_edge(100, 5)
+        G.add_edge(103, 6)
+        self.check(G)
+
+    def test_two_nonplanar_blocks(self):
+        G = nx.disjoint_union(nx.complete_graph(5),
+                              nx.complete_bipartite_graph(3, 3))
+        G.add_edge(0, 5)
+        self.check(G)
+
+    def test_random(self):
+        rnd = random.Random(1)
+        for _ in range(30):
+            n = rnd.randint(5, 12)
+            G = nx.gnm_random_graph(n, rnd.randint(n, 3 * n - 3),
+                                    seed=rnd.randint(0, 10 ** 6))
+            self.check(G)
+
+    def test_self_loop(self):
+        G = nx.complete_graph(5)
+        G.add_edge(0, 0)
+        assert_equals(check_planarity_deletions(G, [(0, 0), (0, 1)]),
+                      [False, True])
+
+    @raises(nx.NetworkXError)
+    def test_missing_edge(self):
+        check_planarity_deletions(nx.path_graph(3), [(0, 2)])
+
+    def test_grid_with_chords(self):
+        # many Kuratowski subgraphs, only two edges lie on all of them
+        G = nx.convert_node_labels_to_integers(nx.grid_2d_graph(6, 6))
+        G.add_edges_from([(0, 35), (5, 30), (0, 30)])
+        self.check(G)
@@ -0,0 +1,53 @@
+import random
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true, assert_false
+from planarity_checking.lr_planarity import LRPlanarity, check_planarity
+
+
+class TestDFSIndex:
+    """Unit tests for :class:`planarity_checking.dfs_index.DFSIndex`."""
+
+    @staticmethod
+    def check(G):
+        is_planar, _, index = check_planarity(G, dfs_index=True)
+        assert_equals(is_planar, check_planarity(G)[0])
+        assert_equals(len(index), len(G))
+        assert_equals(index.number_of_edges(), G.number_of_edges())
+        assert_equals(
+            sorted(map(sorted, index.biconnected_components())),
+            sorted(map(sorted, nx.biconnected_components(G))))
+        assert_equals(set(index.articulation_points()),
+                      set(nx.articulation_points(G)))
+        bridges = list(index.bridges())
+        assert_equals(set(map(frozenset, bridges)),
+                      set(map(frozenset, nx.bridges(G))))
+        for u, v in bridges:
+            assert_true(G.has_edge(u, v))
+
+    def test_random(self):
+        rnd = random.Random(2)
+        for _ in range(40):
+            n = rnd.randint(1, 30)
+            G = nx.gnm_random_graph(n, rnd.randint(0, 2 * n),
+                                    seed=rnd.randint(0, 10 ** 6))
+            self.check(G)
+
+    def test_special(self):
+        self.check(nx.empty_graph(3))
+        self.check(nx.path_graph(5))
+        self.check(nx.star_graph(4))
+        self.check(nx.barbell_graph(4, 2))
+        # dense graphs are rejected before the orientation phase
+        self.check(nx.complete_graph(7))
+
+    def test_tree_edges(self):
+        G = nx.cycle_graph(5)
+        planarity_state = LRPlanarity(G)
+        index = planarity_state.get_dfs_index()
+        tree_edges = [e for e in range(5) if index.is_tree_edge(e)]
+        assert_equals(len(tree_edges), 4)
+        assert_equals(index.roots, [0])
+        back_edge = next(e for e in range(5) if not index.is_tree_edge(e))
+        assert_equals(index.lowpt[back_edge], 0)
+        assert_false(list(index.articulation_points()))
@@ -0,0 +1,96 @@
+import random
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true
+from planarity_checking import generators
+from planarity_checking.faces import face_index
+from planarity_checking.lr_planarity import check_planarity
+from planarity_checking.verify import check_rotation_system
+
+
+def canonical(cycle):
+    """Return the smallest rotation of a node sequence"""
+    return min((tuple(cycle[k:] + cycle[:k]) for k in range(len(cycle))),
+               key=lambda rotation: list(map(repr, rotation)))
+
+
+class TestFaceIndex:
+    """Unit tests for :class:`planarity_checking.faces.FaceIndex`."""
+
+    @staticmethod
+    def check(G):
+        is_planar, rotation_system = check_planarity(G, compact=True)
+        assert_true(is_planar)
+        faces = face_index(rotation_system)
+        embedding = rotation_system.to_planar_embedding()
+        expected = set()
+        for v, w in embedding.edges:
+            expected.add(canonical(embedding.traverse_face(v, w)))
+        found = set(canonical(faces.boundary(f)) for f in range(len(faces)))
+        assert_equals(found, expected)
+        assert_equals(sum(faces.sizes), 2 * G.number_of_edges())
+        # Euler's formula for every component with an edge
+        components = [c for c in nx.connected_components(G) if len(c) > 1]
+        assert_equals(len(faces), G.number_of_edges() -
+                      sum(len(c) for c in components) + 2 * len(components))
+        for f in range(len(faces)):
+            for k in range(faces.offsets[f], faces.offsets[f + 1]):
+                assert_equals(faces.face[faces.half_edges[k]], f)
+        return faces
+
+    def test_grid(self):
+        faces = self.check(nx.grid_2d_graph(5, 6))
+        assert_equals(sorted(faces.sizes), [4] * 20 + [18])
+
+    def test_tree(self):
+        faces = self.check(nx.path_graph(5))
+        assert_equals(len(faces), 1)
+        assert_equals(list(faces.sizes), [8])
+
+    def test_disconnected(self):
+        G = nx.disjoint_union(nx.cycle_graph(4), nx.complete_graph(4))
+        G.add_node('isolated')
+        self.check(G)
+
+    def test_random(self):
+        rnd = random.Random(3)
+        for _ in range(20):
+            G = generators.to_networkx(*generators.triangulation_edges(
+                rnd.randint(3, 60), rnd.randint(0, 10 ** 6)))
+            G.remove_edges_from(rnd.sample(list(G.edges),
+                                           G.number_of_edges() // 3))
+            self.check(G)
+
+    def test_dual(self):
+        G = nx.grid_2d_graph(3, 4)
+        faces = self.check(G)
+        rotation_system = faces.rotation_system
+        nodes, targets = rotation_system.nodes, rotation_system.targets
+        sources = rotation_system.sources()
+        face_of = {(nodes[sources[i]], nodes[targets[i]]): faces.face[i]
+                   for i in range(len(targets))}
+        dual = faces.dual_graph()
+        assert_equals(len(dual), len(faces))
+        assert_equals(dual.number_of_edges(), G.number_of_edges())
+        for f, g, (u, v) in dual.edges(data='edge'):
+            assert_equals({face_of[u, v], face_of[v, u]}, {f, g})
+
+    def test_dual_of_triangulation(self):
+        # the dual of a triangulation is a 3-regular 3-connected planar
+        # graph and its dual is the triangulation again
+        G = generators.to_networkx(*generators.triangulation_edges(40, 5))
+        faces = self.check(G)
+        dual = faces.dual()
+        check_rotation_system(dual)
+        assert_true(all(dual.offsets[f + 1] - dual.offsets[f] == 3
+                        for f in range(len(dual))))
+        double_dual = face_index(dual)
+        assert_equals(len(double_dual), len(G))
+        H = double_dual.dual_graph()
+        assert_true(nx.is_isomorphic(nx.Graph(H), G))
+
+    def test_bridge(self):
+        faces = self.check(nx.path_graph(3))
+        dual = faces.dual_graph()
+        assert_equals(list(dual.edges(data='edge')),
+                      [(0, 0, (0, 1)), (0, 0, (1, 2))])
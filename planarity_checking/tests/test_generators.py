@@ -0,0 +1,41 @@
+import networkx as nx
+from nose.tools import assert_equals, assert_true
+from planarity_checking import generators
+
+
+class TestGenerators:
+    """Unit tests for :mod:`planarity_checking.generators`."""
+
+    @staticmethod
+    def check_family(generator, is_planar, maximal=False,
+                     biconnected=False):
+        n, sources, targets = generator(300)
+        assert_equals(len(sources), len(targets))
+        G = generators.to_networkx(n, sources, targets)
+        # no self-loops and multiple edges
+        assert_equals(G.number_of_edges(), len(sources))
+        assert_equals(nx.number_of_selfloops(G), 0)
+        assert_true(nx.is_connected(G))
+        assert_equals(nx.check_planarity(G)[0], is_planar)
+        if maximal:
+            assert_equals(G.number_of_edges(), 3 * n - 6)
+        if biconnected:
+            assert_true(nx.is_biconnected(G))
+
+    def test_families(self):
+        self.check_family(generators.grid_edges, True)
+        self.check_family(
+            lambda n: generators.triangulation_edges(n, seed=1), True, True)
+        self.check_family(
+            lambda n: generators.apollonian_edges(n, seed=1), True, True)
+        self.check_family(generators.heavy_wheel_edges, True)
+        for kind in ['K5', 'K3,3']:
+            self.check_family(
+                lambda n: generators.planted_kuratowski_edges(n, kind),
+                False, biconnected=True)
+
+    def test_deterministic(self):
+        assert_equals(generators.apollonian_edges(100, seed=3),
+                      generators.apollonian_edges(100, seed=3))
+        assert_equals(generators.triangulation_edges(100, seed=3),
+                      generators.triangulation_edges(100, seed=3))
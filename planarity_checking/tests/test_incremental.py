@@ -0,0 +1,179 @@
+import random
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true, assert_false, \
+    assert_raises
+from planarity_checking import lr_planarity
+from planarity_checking.incremental import IncrementalPlanarity
+
+
+def check_state(oracle, G):
+    """Check the embedding and the face numbers of the oracle"""
+    assert_equals(set(map(frozenset, oracle.graph.edges)),
+                  set(map(frozenset, G.edges)))
+    embedding = nx.PlanarEmbedding()
+    embedding.set_data(oracle.get_embedding())
+    embedding.check_structure()
+    assert_equals(embedding.number_of_edges(), 2 * G.number_of_edges())
+    seen = set()
+    for v, rotation in oracle.cw.items():
+        for w in rotation:
+            if (v, w) in seen:
+                continue
+            half_edges = oracle._traverse(v, w)
+            seen.update(half_edges)
+            faces = set(oracle.face[x][y] for x, y in half_edges)
+            assert_equals(len(faces), 1)
+            assert_equals(oracle.face_size[faces.pop()], len(half_edges))
+    # the blocks of the spanning forest
+    blocks = {}
+    for v, x in oracle.tree_parent.items():
+        if x is not None:
+            assert_true(G.has_edge(v, x))
+            b = oracle._find_block(oracle.parent_block[v])
+            blocks.setdefault(b, {oracle.block_head[b]}).add(v)
+    assert_equals(set(map(frozenset, blocks.values())),
+                  set(map(frozenset, nx.biconnected_components(G))))
+    for b, nodes in blocks.items():
+        assert_equals(set(oracle.block_nodes[b]), nodes)
+
+
+class TestIncrementalPlanarity:
+    """Unit tests for :mod:`planarity_checking.incremental`."""
+
+    def test_build_triangulation(self):
+        oracle = IncrementalPlanarity()
+        G = nx.Graph()
+        # a cycle and chords from its first vertex, then the other side
+        edges = [(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 0), (0, 2),
+                 (0, 3), (0, 4), (1, 3), (3, 5), (5, 1)]
+        for u, v in edges:
+            assert_true(oracle.add_edge(u, v))
+            G.add_edge(u, v)
+            check_state(oracle, G)
+        assert_equals(oracle.retests, 0)
+        assert_equals(G.number_of_edges(), 3 * 6 - 6)
+        # the graph is maximal planar
+        assert_false(oracle.can_add_edge(2, 4))
+        assert_false(oracle.try_add_edge(2, 4))
+        assert_true(oracle.is_planar())
+        check_state(oracle, G)
+
+    def test_retest_changes_embedding(self):
+        # two faces of the cycle (a 2-cut) have to be flipped
+        G = nx.cycle_graph(6)
+        G.add_edges_from([(0, 6), (6, 3), (1, 7), (7, 4)])
+        oracle = IncrementalPlanarity(G)
+        for u, v in [(6, 2), (7, 5)]:
+            expected = lr_planarity.check_planarity(
+                nx.Graph(list(G.edges) + [(u, v)]))[0]
+            assert_equals(oracle.try_add_edge(u, v), expected)
+            if expected:
+                G.add_edge(u, v)
+            check_state(oracle, G)
+
+    def test_retest_blocks(self):
+        # only the block of the new edge is tested again
+        G = nx.complete_bipartite_graph(3, 3)
+        G.remove_edge(0, 5)
+        G.add_edges_from(nx.grid_2d_graph(6, 6).edges)
+        G.add_edge(1, (0, 0))
+        G.add_edges_from([((5, 5), 'a'), ('a', 'b'), ('b', (5, 5))])
+        oracle = IncrementalPlanarity(G)
+        check_state(oracle, G)
+        assert_false(oracle.can_add_edge(0, 5))
+        assert_equals(oracle.retests, 1)
+        assert_equals(oracle.retested_edges, 9)
+        # edges across the bridge merge the blocks on the path
+        for u, v in [('a', (4, 5)), (1, (1, 0)), ('b', (3, 5))]:
+            assert_true(oracle.try_add_edge(u, v))
+            G.add_edge(u, v)
+            check_state(oracle, G)
+
+    def test_blocks_tested_one_by_one(self):
+        # a cube with a path hanging from vertex 0, 6 is opposite to 0
+        G = nx.cubical_graph()
+        nx.add_path(G, [0, 'a', 'b', 'c'])
+        oracle = IncrementalPlanarity(G)
+        assert_false(oracle.can_add_edge(6, 'b'))
+        assert_equals(oracle.retests, 1)
+        assert_equals(oracle.retested_edges, 13)
+        # the answer of the cube for 6 and 0 is reused
+        assert_false(oracle.try_add_edge(6, 'c'))
+        assert_equals(oracle.retests, 1)
+        assert_true(oracle.try_add_edge(1, 'c'))
+        G.add_edge(1, 'c')
+        check_state(oracle, G)
+
+    def test_non_planar_input(self):
+        oracle = IncrementalPlanarity(nx.complete_bipartite_graph(3, 3))
+        assert_false(oracle.is_planar())
+        assert_false(oracle.add_edge(0, 1))
+        assert_true(oracle.graph.has_edge(0, 1))
+        assert_raises(nx.NetworkXException, oracle.get_embedding)
+
+    def test_non_planar_after_insertion(self):
+        G = nx.complete_bipartite_graph(3, 3)
+        G.remove_edge(0, 5)
+        oracle = IncrementalPlanarity(G)
+        assert_true(oracle.is_planar())
+        assert_false(oracle.can_add_edge(0, 5))
+        assert_true(oracle.is_planar())
+        assert_false(oracle.add_edge(0, 5))
+        assert_false(oracle.is_planar())
+        assert_false(oracle.try_add_edge(1, 2))
+
+    def test_components(self):
+        oracle = IncrementalPlanarity(nx.disjoint_union(
+            nx.octahedral_graph(), nx.octahedral_graph()))
+        G = oracle.graph.copy()
+        for u, v in [(0, 6), (1, 'a'), ('b', 'c'), ('c', 7), (1, 7)]:
+            assert_true(oracle.try_add_edge(u, v))
+            G.add_edge(u, v)
+            check_state(oracle, G)
+        # 0 and 5 are opposite vertices of the octahedron
+        assert_false(oracle.try_add_edge(5, 11))
+        check_state(oracle, G)
+
+    def test_random_insertions(self):
+        for seed in range(40):
+            rnd = random.Random(seed)
+            n = rnd.randint(2, 20)
+            G = nx.gnm_random_graph(n, rnd.randint(0, n), seed=seed)
+            oracle = IncrementalPlanarity(G)
+            for _ in range(3 * n):
+                u, v = rnd.randrange(n + 2), rnd.randrange(n + 2)
+                H = G.copy()
+                H.add_edge(u, v)
+                expected = lr_planarity.check_planarity(H)[0]
+                assert_equals(oracle.can_add_edge(u, v), expected)
+                assert_equals(oracle.try_add_edge(u, v), expected)
+                if expected:
+                    G = H
+                    G.remove_edges_from(nx.selfloop_edges(G))
+                check_state(oracle, G)
+
+    def test_cached_block_state(self):
+        # the queries inside a block share its state until it changes
+        G = nx.grid_2d_graph(5, 5)
+        oracle = IncrementalPlanarity(G)
+        rnd = random.Random(4)
+        nodes = list(G)
+        for _ in range(30):
+            u, v = rnd.sample(nodes, 2)
+            expected = lr_planarity.check_planarity(
+                nx.Graph(list(G.edges) + [(u, v)]))[0]
+            assert_equals(oracle.can_add_edge(u, v), expected)
+            assert_equals(len(oracle.block_states), 1)
+        assert_true(oracle.try_add_edge((0, 0), (1, 1)))
+        assert_equals(oracle.block_states, {})
+        G.add_edge((0, 0), (1, 1))
+        check_state(oracle, G)
+        for _ in range(30):
+            u, v = rnd.sample(nodes, 2)
+            H = nx.Graph(list(G.edges) + [(u, v)])
+            expected = lr_planarity.check_planarity(H)[0]
+            assert_equals(oracle.try_add_edge(u, v), expected)
+            if expected:
+                G = H
+            check_state(oracle, G)
@@ -0,0 +1,91 @@
+import random
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true, assert_false
+from planarity_checking import kernel, lr_planarity
+from test_lr_planarity import check_counterexample
+
+
+def subdivide(G, fraction, seed):
+    """Replace a fraction of the edges of G by paths of length 2 to 4"""
+    rnd = random.Random(seed)
+    H = G.copy()
+    for i, (u, v) in enumerate(list(G.edges)):
+        if rnd.random() < fraction:
+            H.remove_edge(u, v)
+            path = [('s', i, k) for k in range(rnd.randint(1, 3))]
+            nx.add_path(H, [u] + path + [v])
+    return H
+
+
+class TestKernel:
+    """Unit tests for :mod:`planarity_checking.kernel`."""
+
+    @staticmethod
+    def check(G, is_planar):
+        result, certificate = kernel.check_planarity_kernel(
+            G, counterexample=True)
+        assert_equals(result, is_planar)
+        if result:
+            assert_equals(set(certificate), set(G))
+            embedding = nx.PlanarEmbedding()
+            embedding.set_data(certificate)
+            embedding.check_structure()
+            assert_equals(embedding.number_of_edges(),
+                          2 * (G.number_of_edges() -
+                               nx.number_of_selfloops(G)))
+        else:
+            for u, v in certificate.edges:
+                assert_true(G.has_edge(u, v))
+            check_counterexample(certificate, certificate)
+
+    def test_kernel_size(self):
+        G = subdivide(nx.grid_2d_graph(6, 6), 1.0, 0)
+        G.add_edges_from([((0, 0), 'leaf'), ('leaf', 'leaf2')])
+        reduced = kernel.PlanarityKernel(G)
+        # the corners of the grid have degree two as well
+        assert_equals(len(reduced.kernel_nodes), 32)
+        assert_equals(len(reduced.kernel_edges), 56)
+        self.check(G, True)
+
+    def test_trees_and_cycles(self):
+        self.check(nx.balanced_tree(3, 4), True)
+        self.check(nx.cycle_graph(10), True)
+        self.check(nx.disjoint_union(nx.path_graph(3), nx.cycle_graph(3)),
+                   True)
+        self.check(nx.empty_graph(5), True)
+
+    def test_cycles_at_one_vertex(self):
+        # cycles that are contracted to loops and to parallel edges
+        G = nx.wheel_graph(6)
+        nx.add_cycle(G, [0, 'a', 'b', 'c'])
+        nx.add_cycle(G, [1, 'd', 'e'])
+        nx.add_path(G, [2, 'f', 'g', 3])
+        nx.add_path(G, [4, 'h', 5])
+        self.check(G, True)
+
+    def test_subdivided_kuratowski_graphs(self):
+        for seed, G in enumerate([nx.complete_graph(5),
+                                  nx.complete_bipartite_graph(3, 3),
+                                  nx.petersen_graph()]):
+            H = subdivide(G, 1.0, seed)
+            H.add_edges_from([(0, 'x'), ('x', 'y')])
+            self.check(H, False)
+
+    def test_triangle_free_bound(self):
+        G = nx.complete_bipartite_graph(4, 5)
+        reduced = kernel.PlanarityKernel(G)
+        assert_false(reduced.has_triangle())
+        assert_false(reduced.satisfies_edge_bounds())
+        self.check(G, False)
+        reduced = kernel.PlanarityKernel(nx.octahedral_graph())
+        assert_true(reduced.satisfies_edge_bounds())
+
+    def test_random_graphs(self):
+        for seed in range(60):
+            rnd = random.Random(seed)
+            n = rnd.randint(1, 30)
+            G = nx.gnm_random_graph(n, rnd.randint(0, int(1.6 * n)),
+                                    seed=seed)
+            G = subdivide(G, 0.3, seed)
+            self.check(G, lr_planarity.check_planarity(G)[0])
@@ -0,0 +1,139 @@
+import random
+
+import networkx as nx
+from nose.tools import assert_equals, assert_raises, assert_true
+from planarity_checking import generators
+from planarity_checking.kuratowski import (TreeContraction, edge_chains,
+                                           kuratowski_edges, kuratowski_graph)
+from planarity_checking.lr_planarity import LRPlanarity, check_planarity
+from test_lr_planarity import check_counterexample
+
+
+def check_kuratowski_edges(G, planarity_state):
+    """Check that the edges form a minimal non planar subgraph of G"""
+    nodes = planarity_state.nodes
+    subgraph = nx.Graph()
+    for e in kuratowski_edges(planarity_state):
+        u = nodes[planarity_state.edge_source[e]]
+        v = nodes[planarity_state.edge_target[e]]
+        assert_true(G.has_edge(u, v))
+        subgraph.add_edge(u, v)
+    check_counterexample(subgraph, subgraph)
+    for u, v in list(subgraph.edges):
+        H = nx.Graph(subgraph)
+        H.remove_edge(u, v)
+        assert_true(check_planarity(H)[0])
+
+
+class TestKuratowskiEdges:
+    """Unit tests for :func:`kuratowski_edges`."""
+
+    def test_complete_graphs(self):
+        for G in (nx.complete_graph(5), nx.complete_bipartite_graph(3, 3),
+                  nx.complete_graph(8), nx.petersen_graph()):
+            check_kuratowski_edges(G, LRPlanarity(G))
+
+    def test_planar(self):
+        for G in (nx.empty_graph(3), nx.path_graph(5), nx.wheel_graph(10),
+                  nx.grid_2d_graph(5, 5)):
+            assert_raises(nx.NetworkXException, kuratowski_edges,
+                          LRPlanarity(G))
+
+    def test_planarity_states(self):
+        # untouched, only oriented, failed test and too many edges
+        G = nx.grid_2d_graph(10, 10)
+        G.add_edges_from([((0, 0), (9, 9)), ((0, 9), (9, 0)),
+                          ((5, 0), (5, 9))])
+        check_kuratowski_edges(G, LRPlanarity(G))
+        planarity_state = LRPlanarity(G)
+        planarity_state.lr_orientation()
+        check_kuratowski_edges(G, planarity_state)
+        planarity_state = LRPlanarity(G)
+        assert_equals(planarity_state.lr_planarity(), None)
+        check_kuratowski_edges(G, planarity_state)
+        G = nx.complete_graph(10)
+        planarity_state = LRPlanarity(G)
+        assert_equals(planarity_state.lr_planarity(), None)
+        check_kuratowski_edges(G, planarity_state)
+
+    def test_disconnected(self):
+        G = nx.disjoint_union(nx.wheel_graph(8), nx.complete_graph(5))
+        G.add_edges_from([(20, 21), (21, 22)])
+        check_kuratowski_edges(G, LRPlanarity(G))
+
+    def test_random(self):
+        rnd = random.Random(3)
+        for seed in range(40):
+            if seed % 2:
+                G = generators.to_networkx(
+                    *generators.planted_kuratowski_edges(
+                        rnd.randint(10, 200), rnd.choice(('K5', 'K3,3'))))
+            else:
+                n = rnd.randint(5, 30)
+                G = nx.gnm_random_graph(n, rnd.randint(n, 4 * n), seed=seed)
+            if check_planarity(G)[0]:
+                continue
+            check_kuratowski_edges(G, LRPlanarity(G))
+
+    def test_kuratowski_graph(self):
+        # the grid around a planted K5 may also give a K3,3
+        G = generators.to_networkx(
+            *generators.planted_kuratowski_edges(100, 'K5'))
+        subgraph = kuratowski_graph(LRPlanarity(G))
+        check_counterexample(subgraph, subgraph)
+        branch = sum(1 for v in subgraph if subgraph.degree(v) > 2)
+        assert_equals(subgraph.graph['kuratowski_type'],
+                      'K5' if branch == 5 else 'K3,3')
+        G = nx.complete_graph(5)
+        for u, v in list(G.edges):
+            G.remove_edge(u, v)
+            nx.add_path(G, [u, (u, v), v])
+        subgraph = kuratowski_graph(LRPlanarity(G))
+        assert_equals(subgraph.graph['kuratowski_type'], 'K5')
+        assert_equals(subgraph.number_of_edges(), 20)
+
+
+class TestTreeContraction:
+    """Unit tests for :class:`TreeContraction`."""
+
+    def test_back_edges(self):
+        # the forest with any set of back edges is tested like the subgraph
+        rnd = random.Random(1)
+        for seed in range(20):
+            G = nx.gnm_random_graph(12, 30, seed=seed)
+            planarity_state = LRPlanarity(G)
+            contraction = TreeContraction(planarity_state)
+            back_edges = contraction.back_edges()
+            tree_edges = set(range(planarity_state.m)) - set(back_edges)
+            for _ in range(5):
+                subset = rnd.sample(back_edges,
+                                    rnd.randint(0, len(back_edges)))
+                H = nx.Graph()
+                for e in tree_edges.union(subset):
+                    H.add_edge(planarity_state.edge_source[e],
+                               planarity_state.edge_target[e])
+                assert_equals(contraction.is_planar(subset),
+                              check_planarity(H)[0])
+
+    def test_lca(self):
+        G = nx.balanced_tree(2, 4)
+        G.add_edge(31, 32)
+        contraction = TreeContraction(LRPlanarity(G))
+        assert_equals(contraction.lca(7, 8), 3)
+        assert_equals(contraction.lca(7, 10), 1)
+        assert_equals(contraction.lca(7, 3), 3)
+        assert_equals(contraction.lca(7, 30), 0)
+        assert_equals(contraction.lca(7, 32), -1)
+
+
+def test_edge_chains():
+    G = nx.cycle_graph(6)
+    G.add_edges_from([(0, 3), (6, 7)])
+    planarity_state = LRPlanarity(G)
+    planarity_state.lr_orientation()
+    chains = edge_chains(planarity_state.edge_source,
+                         planarity_state.edge_target,
+                         range(planarity_state.m))
+    ends = sorted(tuple(sorted((u, v))) for u, v, _ in chains)
+    assert_equals(ends, [(0, 3), (0, 3), (0, 3), (6, 7)])
+    assert_equals(sorted(len(chain) for _, _, chain in chains), [1, 1, 3, 3])
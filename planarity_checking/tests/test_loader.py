@@ -0,0 +1,93 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true, assert_false
+from planarity_checking import loader
+
+
+@contextmanager
+def edge_list_file(text):
+    """Write text to a temporary file and yield its path"""
+    fd, path = tempfile.mkstemp(suffix='.pg')
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    try:
+        yield path
+    finally:
+        os.remove(path)
+
+
+def read_graph(text, chunk_size=1 << 24):
+    """Read text as edge list with :func:`loader.read_csr`"""
+    with edge_list_file(text) as path:
+        nodes, adj_offsets, adj_targets, adj_edges = loader.read_csr(
+            path, chunk_size)
+    assert_equals(len(adj_edges), len(adj_targets))
+    assert_equals(sorted(adj_edges), sorted(list(range(
+        len(adj_edges) // 2)) * 2))
+    G = nx.Graph()
+    G.add_nodes_from(nodes)
+    for v in range(len(nodes)):
+        for i in range(adj_offsets[v], adj_offsets[v + 1]):
+            G.add_edge(nodes[v], nodes[adj_targets[i]])
+    return G
+
+
+class TestLoader:
+    """Unit tests for :mod:`planarity_checking.loader`."""
+
+    def test_pg_header(self):
+        G = read_graph("4\n5\n0 1\n1 2\n2 3\n3 0\n0 2\n")
+        assert_equals(sorted(G), [0, 1, 2, 3])
+        assert_equals(G.number_of_edges(), 5)
+
+    def test_comments_and_columns(self):
+        G = read_graph("# a comment\n\n10 20 1.5\n20 30 # edge\n"
+                       "30\n 10\t30\n5 7.5\n")
+        assert_equals(sorted(G), [10, 20, 30])
+        assert_equals(G.number_of_edges(), 3)
+
+    def test_loops_and_multiple_edges(self):
+        G = read_graph("0 1\n1 0\n1 1\n1 2\n0 1\n2 1\n2 0")
+        assert_equals(sorted(G.edges), [(0, 1), (0, 2), (1, 2)])
+
+    def test_sparse_ids(self):
+        # 64-bit ids are relabeled without allocating their range
+        ids = [-2 ** 62, 17, 2 ** 40, 2 ** 62 + 5]
+        G = read_graph("%d %d\n%d %d\n%d %d\n%d %d\n" % (
+            ids[0], ids[1], ids[1], ids[2], ids[2], ids[3], ids[3], ids[0]))
+        assert_equals(sorted(G), ids)
+        assert_equals(set(map(frozenset, G.edges)),
+                      set(map(frozenset, zip(ids, ids[1:] + ids[:1]))))
+
+    def test_small_chunks(self):
+        G = nx.convert_node_labels_to_integers(nx.grid_2d_graph(5, 7))
+        text = "".join("%d %d\n" % e for e in G.edges)
+        for chunk_size in (1, 3, 10, 1000):
+            H = read_graph(text, chunk_size)
+            assert_equals(set(map(frozenset, G.edges)),
+                          set(map(frozenset, H.edges)))
+
+    def test_empty_file(self):
+        assert_equals(read_graph("").number_of_nodes(), 0)
+        with edge_list_file("") as path:
+            assert_equals(loader.check_planarity_file(path), (True, {}))
+
+    def test_check_planarity_file(self):
+        G = nx.convert_node_labels_to_integers(
+            nx.triangular_lattice_graph(5, 6), first_label=1)
+        with edge_list_file("".join("%d %d\n" % e for e in G.edges)) as path:
+            is_planar, embedding = loader.check_planarity_file(path)
+        assert_true(is_planar)
+        assert_equals(set(embedding), set(G))
+        planar_embedding = nx.PlanarEmbedding()
+        planar_embedding.set_data(embedding)
+        planar_embedding.check_structure()
+
+        G.add_edges_from(nx.complete_graph(5).edges)
+        with edge_list_file("".join("%d %d\n" % e for e in G.edges)) as path:
+            is_planar, subgraph = loader.check_planarity_file(path, True)
+        assert_false(is_planar)
+        assert_true(all(G.has_edge(u, v) for u, v in subgraph.edges))
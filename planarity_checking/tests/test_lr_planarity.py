@@ -1,5 +1,7 @@
+import random
+
 import networkx as nx
-from nose.tools import assert_equals
+from nose.tools import assert_equals, assert_true, assert_raises
 from planarity_checking import lr_planarity  #TODO: Change this to the nx import
 
 
@@ -116,6 +118,367 @@ class TestLRPlanarity:
         G.add_node(1)
         self.check_graph(G, is_planar=True)
 
+    def test_long_cycle(self):
+        # the DFS path is much longer than the default recursion limit
+        G = nx.cycle_graph(20000)
+        self.check_graph(G, is_planar=True)
+
+    def test_long_cycle_with_chords(self):
+        # long DFS path with back edges that have to be resolved by sign
+        G = nx.cycle_graph(20000)
+        G.add_edges_from((i, i + 2) for i in range(0, 19998, 2))
+        self.check_graph(G, is_planar=True)
+
+    def test_deep_non_planar(self):
+        # non planar component at the end of a long path
+        G = nx.path_graph(20000)
+        G.add_edges_from(nx.complete_graph(range(19995, 20000)).edges)
+        is_planar, _ = lr_planarity.check_planarity(G)
+        assert_equals(is_planar, False)
+
+    def test_wheel_with_heavy_hub(self):
+        # the adjacency list of the hub contains all other nodes
+        self.check_graph(nx.wheel_graph(5000), is_planar=True)
+
+    def test_non_integer_labels(self):
+        # nodes are relabeled internally and mapped back in the embedding
+        G = nx.grid_2d_graph(10, 10)
+        G.add_edge("a", (0, 0))
+        G.add_edge("a", (0, 9))
+        self.check_graph(G, is_planar=True)
+
+    def test_directed_input(self):
+        # edges in both directions are treated as one undirected edge
+        G = nx.DiGraph([(1, 2), (2, 1), (2, 3), (3, 4), (4, 1), (1, 1)])
+        self.check_graph(G.to_undirected(), is_planar=True)
+        is_planar, embedding = lr_planarity.check_planarity(G)
+        check_embedding(G.to_undirected(), embedding)
+        G = nx.DiGraph(nx.complete_graph(5))
+        assert_equals(lr_planarity.check_planarity(G)[0], False)
+
+    def test_multigraph_input(self):
+        # parallel edges are treated as a single edge
+        G = nx.MultiGraph([(1, 2), (1, 2), (2, 3), (3, 1), (3, 3)])
+        is_planar, embedding = lr_planarity.check_planarity(G)
+        assert_equals(is_planar, True)
+        check_embedding(nx.Graph(G), embedding)
+        G = nx.MultiGraph(nx.complete_bipartite_graph(3, 3))
+        G.add_edges_from(nx.complete_bipartite_graph(3, 3).edges)
+        assert_equals(lr_planarity.check_planarity(G)[0], False)
+
+    def test_rotation_system_links(self):
+        # next and prev links of the half-edge rotation system are inverse
+        G = nx.wheel_graph(50)
+        planarity_state = lr_planarity.LRPlanarity(G)
+        embedding = planarity_state.lr_planarity()
+        check_embedding(G, embedding)
+        for h in range(2 * planarity_state.m):
+            assert_equals(planarity_state.rot_prev[
+                planarity_state.rot_next[h]], h)
+            assert_equals(planarity_state.rot_next[
+                planarity_state.rot_prev[h]], h)
+
+    def test_conflict_pair_stack(self):
+        # all conflict pairs are removed again when the testing ends
+        G = nx.triangular_lattice_graph(10, 10)
+        planarity_state = lr_planarity.LRPlanarity(G)
+        assert_true(planarity_state.lr_testing())
+        assert_equals(planarity_state.stack_height, 0)
+        planarity_state = lr_planarity.LRPlanarity(nx.complete_graph(5))
+        assert_equals(planarity_state.lr_testing(), False)
+
+    def test_compact_embedding(self):
+        G = nx.disjoint_union(nx.wheel_graph(20), nx.path_graph(3))
+        G.add_nodes_from(['a', 'b'])
+        G.add_edge('a', 0)
+        is_planar, embedding = lr_planarity.check_planarity(G)
+        is_planar, rotation_system = lr_planarity.check_planarity(
+            G, compact=True)
+        assert_true(is_planar)
+        assert_equals(len(rotation_system), len(G))
+        assert_equals(rotation_system.number_of_edges(), len(G.edges))
+        assert_equals(rotation_system.to_dict(), embedding)
+        planar_embedding = rotation_system.to_planar_embedding()
+        planar_embedding.check_structure()
+        assert_equals(planar_embedding.get_data(), embedding)
+
+        # the twin and face arrays agree with the PlanarEmbedding
+        nodes = rotation_system.nodes
+        sources = rotation_system.sources()
+        targets = rotation_system.targets
+        twin = rotation_system.twin
+        face_next = rotation_system.face_next()
+        for i in range(len(targets)):
+            assert_equals(twin[twin[i]], i)
+            assert_equals(targets[twin[i]], sources[i])
+            v, w = nodes[sources[i]], nodes[targets[i]]
+            j = face_next[i]
+            assert_equals((nodes[sources[j]], nodes[targets[j]]),
+                          planar_embedding.next_face_half_edge(v, w))
+
+    def test_compact_non_planar(self):
+        assert_equals(lr_planarity.check_planarity(
+            nx.complete_graph(5), compact=True), (False, None))
+
+    def test_many_components(self):
+        # every component is a DFS root
+        G = nx.empty_graph(2000)
+        G.add_edges_from((2 * i, 2 * i + 1) for i in range(500))
+        self.check_graph(G, is_planar=True)
+
+    def test_kuratowski_type(self):
+        _, subgraph = lr_planarity.check_planarity(nx.complete_graph(5), True)
+        assert_equals(subgraph.graph['kuratowski_type'], 'K5')
+        _, subgraph = lr_planarity.check_planarity(
+            nx.complete_bipartite_graph(3, 3), True)
+        assert_equals(subgraph.graph['kuratowski_type'], 'K3,3')
+        # the petersen graph is cubic, so it contains no subdivided K5
+        _, subgraph = lr_planarity.check_planarity(nx.petersen_graph(), True)
+        assert_equals(subgraph.graph['kuratowski_type'], 'K3,3')
+        check_counterexample(subgraph, subgraph)
+
+    def test_random_counterexamples(self):
+        # the counterexample is a minimal non planar subgraph
+        for seed in range(30):
+            G = nx.gnm_random_graph(15, 40, seed=seed)
+            is_planar, subgraph = lr_planarity.check_planarity(G, True)
+            if is_planar:
+                continue
+            for u, v in subgraph.edges:
+                assert_true(G.has_edge(u, v))
+            check_counterexample(subgraph, subgraph)
+            for u, v in list(subgraph.edges):
+                H = nx.Graph(subgraph)
+                H.remove_edge(u, v)
+                assert_true(lr_planarity.check_planarity(H)[0])
+
+    def test_counterexample_in_large_planar_graph(self):
+        # a subdivided K3,3 hidden in a large planar graph
+        G = nx.grid_2d_graph(40, 40)
+        G.add_edges_from([((0, 0), (39, 39)), ((0, 39), (39, 0)),
+                          ((20, 0), (20, 39))])
+        is_planar, subgraph = lr_planarity.check_planarity(G, True)
+        assert_equals(is_planar, False)
+        for u, v in subgraph.edges:
+            assert_true(G.has_edge(u, v))
+        check_counterexample(subgraph, subgraph)
+
+    def test_get_counterexample_planar(self):
+        assert_raises(nx.NetworkXException, lr_planarity.get_counterexample,
+                      nx.wheel_graph(10))
+
+    def test_iterative_equals_recursive(self):
+        # the iterative phases produce the same embedding as the recursive
+        for seed in range(50):
+            G = nx.gnp_random_graph(30, 0.1, seed=seed)
+            is_planar, embedding = lr_planarity.check_planarity(G)
+            is_planar_rec, embedding_rec = \
+                check_planarity_recursive(G)
+            assert_equals(is_planar, is_planar_rec)
+            assert_equals(embedding, embedding_rec)
+
+    def test_without_back_edges(self):
+        # the reused orientation gives the lowpoints and the test result of
+        # the graph without the back edges
+        rnd = random.Random(2)
+        for seed in range(30):
+            G = nx.gnm_random_graph(12, rnd.randint(15, 30), seed=seed)
+            planarity_state = lr_planarity.LRPlanarity(G)
+            planarity_state.lr_testing()
+            height = planarity_state.height
+            parent_edge = planarity_state.parent_edge
+            edge_target = planarity_state.edge_target
+            back_edges = [e for e in range(planarity_state.m)
+                          if parent_edge[edge_target[e]] != e]
+            deleted = rnd.sample(back_edges, rnd.randint(0, len(back_edges)))
+            state = planarity_state.without_back_edges(deleted)
+            edge_source = state.edge_source
+            H = nx.Graph()
+            H.add_nodes_from(range(planarity_state.n))
+            H.add_edges_from((edge_source[e], edge_target[e])
+                             for e in range(planarity_state.m)
+                             if edge_source[e] != lr_planarity.NONE)
+            tree = nx.DiGraph()
+            tree.add_edges_from((edge_source[f], edge_target[f])
+                                for f in parent_edge
+                                if f != lr_planarity.NONE)
+            for e in range(planarity_state.m):
+                if parent_edge[edge_target[e]] != e:
+                    continue
+                # the lowest return point of the subtree below e
+                subtree = nx.descendants(tree, edge_target[e])
+                subtree.add(edge_target[e])
+                returns = [height[w] for v in subtree for w in H[v]]
+                assert_equals(state.lowpt[e],
+                              min(returns + [height[edge_source[e]]]))
+            assert_equals(state.lr_testing(),
+                          lr_planarity.check_planarity(H)[0])
+
+    def test_with_back_edge(self):
+        # a new back edge reuses the orientation and the sorted lists
+        rnd = random.Random(3)
+        for seed in range(40):
+            G = nx.gnm_random_graph(12, rnd.randint(11, 25), seed=seed)
+            planarity_state = lr_planarity.LRPlanarity(G)
+            planarity_state.lr_orientation()
+            if seed % 2:
+                planarity_state.sort_adjacency_lists()
+            height = planarity_state.height
+            pairs = [(v, w) for v in G for w in G
+                     if height[v] > height[w] and not G.has_edge(v, w)]
+            if not pairs:
+                continue
+            v, w = rnd.choice(pairs)
+            state = planarity_state.with_back_edge(v, w)
+            H = nx.Graph(G)
+            H.add_edge(v, w)
+            if state is None:
+                # w is not an ancestor of v
+                assert_true(height[v] > height[w])
+                continue
+            assert_equals(state.m, planarity_state.m + 1)
+            for x in range(state.n):
+                assert_equals(
+                    sorted(state.adj_targets[state.adj_offsets[x]:
+                                             state.adj_offsets[x + 1]]),
+                    sorted(H[x]))
+            is_planar = lr_planarity.check_planarity(H)[0]
+            assert_equals(state.lr_testing(), is_planar)
+            embedding = planarity_state.with_back_edge(v, w).lr_planarity()
+            assert_equals(embedding is not None, is_planar)
+            if is_planar:
+                planar_embedding = nx.PlanarEmbedding()
+                planar_embedding.set_data(embedding)
+                planar_embedding.check_structure()
+                assert_equals(planar_embedding.number_of_edges(),
+                              2 * H.number_of_edges())
+
+
+class RecursiveLRPlanarity(lr_planarity.LRPlanarity):
+    """The LR planarity test with recursive phases
+
+    A straightforward reference implementation for the iterative phases of
+    :class:`LRPlanarity`. It produces the same embeddings, but can hit the
+    recursion limit on graphs with long DFS paths.
+    """
+
+    def lr_planarity_recursive(self):
+        """Recursive version of :meth:`lr_planarity`."""
+        if self.n > 2 and self.m > 3 * self.n - 6:
+            # graph is not planar
+            return None
+
+        # orientation of the graph by depth first search traversal
+        for v in range(self.n):
+            if self.height[v] == lr_planarity.NONE:
+                self.height[v] = 0
+                self.roots.append(v)
+                self.dfs_orientation_recursive(v)
+
+        # testing
+        self.sort_adjacency_lists()  # sort by nesting depth
+        for v in self.roots:
+            if not self.dfs_testing_recursive(v):
+                return None
+
+        for e in range(self.m):
+            self.nesting_depth[e] = (self.sign_recursive(e) *
+                                     self.nesting_depth[e])
+        # sort the adjacency lists again
+        self.sort_adjacency_lists()
+        self.init_embedding()
+
+        # compute the complete embedding
+        for v in self.roots:
+            self.dfs_embedding_recursive(v)
+
+        return self.get_embedding()
+
+    def dfs_orientation_recursive(self, v):
+        """Recursive version of :meth:`dfs_orientation`."""
+        e = self.parent_edge[v]
+        for i in range(self.adj_offsets[v], self.adj_offsets[v + 1]):
+            vw = self.adj_edges[i]
+            if self.edge_source[vw] != lr_planarity.NONE:
+                continue  # the edge was already oriented
+            w = self.adj_targets[i]
+            self.edge_source[vw] = v  # orient the edge
+            self.edge_target[vw] = w
+
+            self.lowpt[vw] = self.height[v]
+            self.lowpt2[vw] = self.height[v]
+            if self.height[w] == lr_planarity.NONE:  # (v, w) is a tree edge
+                self.parent_edge[w] = vw
+                self.height[w] = self.height[v] + 1
+                self.dfs_orientation_recursive(w)
+            else:  # (v, w) is a back edge
+                self.lowpt[vw] = self.height[w]
+
+            # determine nesting graph
+            self.nesting_depth[vw] = 2 * self.lowpt[vw]
+            if self.lowpt2[vw] < self.height[v]:  # chordal
+                self.nesting_depth[vw] += 1
+
+            # update lowpoints of parent edge e
+            if e != lr_planarity.NONE:
+                self.update_lowpoints(e, vw)
+
+    def dfs_testing_recursive(self, v):
+        """Recursive version of :meth:`dfs_testing`."""
+        e = self.parent_edge[v]
+        start = self.ordered_offsets[v]
+        for i in range(start, self.ordered_offsets[v + 1]):
+            ei = self.ordered_edges[i]
+            self.stack_bottom[ei] = self.stack_height
+            w = self.edge_target[ei]
+            if ei == self.parent_edge[w]:  # tree edge
+                if not self.dfs_testing_recursive(w):
+                    return False
+            else:  # back edge
+                self.lowpt_edge[ei] = ei
+                self.push_back_edge(ei)
+
+            # integrate new return edges
+            if self.lowpt[ei] < self.height[v]:
+                if i == start:  # e_i has return edge
+                    self.lowpt_edge[e] = self.lowpt_edge[ei]
+                else:  # add constraints of e_i
+                    if not self.add_constraints(ei, e):
+                        # graph is not planar
+                        return False
+
+        # remove back edges returning to parent
+        if e != lr_planarity.NONE:  # v isn't root
+            self.remove_back_edges(e)
+        return True
+
+    def dfs_embedding_recursive(self, v):
+        """Recursive version of :meth:`dfs_embedding`."""
+        for i in range(self.ordered_offsets[v], self.ordered_offsets[v + 1]):
+            ei = self.ordered_edges[i]
+            w = self.edge_target[ei]
+            if ei == self.parent_edge[w]:  # tree edge
+                # make v the first node in embedding list of w
+                self.add_half_edge_first(2 * ei + 1, w)
+                self.left_ref[v] = 2 * ei
+                self.right_ref[v] = 2 * ei
+                self.dfs_embedding_recursive(w)
+            else:  # back edge
+                self.add_back_edge_to_embedding(ei)
+
+    def sign_recursive(self, e):
+        """Recursive version of :meth:`sign`."""
+        if self.ref[e] != lr_planarity.NONE:
+            self.side[e] = self.side[e] * self.sign_recursive(self.ref[e])
+            self.ref[e] = lr_planarity.NONE
+        return self.side[e]
+
+
+def check_planarity_recursive(G):
+    """Recursive version of :func:`check_planarity`"""
+    embedding = RecursiveLRPlanarity(G).lr_planarity_recursive()
+    return embedding is not None, embedding
+
 
 def check_embedding(G, embedding):
     """Raises an exception if the combinatorial embedding is not correct
@@ -381,3 +744,17 @@ if __name__ == '__main__':
     t.test_loop()
     t.test_comp()
     t.test_single_component()
+    t.test_long_cycle()
+    t.test_long_cycle_with_chords()
+    t.test_deep_non_planar()
+    t.test_wheel_with_heavy_hub()
+    t.test_non_integer_labels()
+    t.test_directed_input()
+    t.test_multigraph_input()
+    t.test_rotation_system_links()
+    t.test_many_components()
+    t.test_kuratowski_type()
+    t.test_random_counterexamples()
+    t.test_counterexample_in_large_planar_graph()
+    t.test_get_counterexample_planar()
+    t.test_iterative_equals_recursive()
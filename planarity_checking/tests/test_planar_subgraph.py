@@ -0,0 +1,152 @@
+import random
+from itertools import combinations
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true, assert_false
+from planarity_checking import lr_planarity
+from planarity_checking.lr_planarity import csr_from_graph
+from planarity_checking.planar_subgraph import (maximal_planar_subgraph,
+                                                LRPlanarization)
+
+
+def check_subgraph(G, subgraph, embedding):
+    """Check that subgraph is a planar spanning subgraph of G"""
+    assert_equals(set(subgraph), set(G))
+    for u, v in subgraph.edges:
+        assert_true(G.has_edge(u, v))
+    planar_embedding = nx.PlanarEmbedding()
+    planar_embedding.set_data(embedding)
+    planar_embedding.check_structure()
+    assert_equals(set(embedding), set(G))
+    assert_equals(planar_embedding.number_of_edges(),
+                  2 * subgraph.number_of_edges())
+    for u, v in subgraph.edges:
+        assert_true(planar_embedding.has_edge(u, v))
+
+
+def check_face_maximal(G, subgraph, embedding):
+    """Check that no other edge of G fits into a face of the embedding"""
+    planar_embedding = nx.PlanarEmbedding()
+    planar_embedding.set_data(embedding)
+    face_of = {}
+    faces = 0
+    for v, w in planar_embedding.edges:
+        if (v, w) not in face_of:
+            face = planar_embedding.traverse_face(v, w)
+            for x, y in zip(face, face[1:] + face[:1]):
+                face_of[x, y] = faces
+            faces += 1
+    components = {}
+    for i, c in enumerate(nx.connected_components(subgraph)):
+        components.update(dict.fromkeys(c, i))
+    for u, v in G.edges:
+        if u == v or subgraph.has_edge(u, v):
+            continue
+        assert_equals(components[u], components[v])
+        faces_u = set(face_of[u, w] for w in planar_embedding[u])
+        faces_v = set(face_of[v, w] for w in planar_embedding[v])
+        assert_false(faces_u & faces_v)
+
+
+def check_maximal(G, subgraph):
+    """Check that no other edge of G can be added to the subgraph"""
+    for u, v in G.edges:
+        if u == v or subgraph.has_edge(u, v):
+            continue
+        H = nx.Graph(subgraph)
+        H.add_edge(u, v)
+        assert_false(lr_planarity.check_planarity(H)[0])
+
+
+class TestMaximalPlanarSubgraph:
+    """Unit tests for :mod:`planarity_checking.planar_subgraph`."""
+
+    def test_planar(self):
+        G = nx.grid_2d_graph(5, 6)
+        subgraph, embedding = maximal_planar_subgraph(G)
+        assert_equals(set(map(frozenset, subgraph.edges)),
+                      set(map(frozenset, G.edges)))
+        check_subgraph(G, subgraph, embedding)
+
+    def test_kuratowski(self):
+        for G in [nx.complete_graph(5), nx.complete_bipartite_graph(3, 3)]:
+            for exact in [False, True]:
+                subgraph, embedding = maximal_planar_subgraph(G, exact)
+                check_subgraph(G, subgraph, embedding)
+                assert_equals(subgraph.number_of_edges(),
+                              G.number_of_edges() - 1)
+
+    def test_complete(self):
+        G = nx.complete_graph(12)
+        subgraph, embedding = maximal_planar_subgraph(G, exact=True)
+        check_subgraph(G, subgraph, embedding)
+        # every maximal planar subgraph of K_n is a triangulation
+        assert_equals(subgraph.number_of_edges(), 3 * 12 - 6)
+
+    def test_components(self):
+        G = nx.disjoint_union(nx.complete_graph(6), nx.petersen_graph())
+        G.add_nodes_from([100, 101])
+        subgraph, embedding = maximal_planar_subgraph(G)
+        check_subgraph(G, subgraph, embedding)
+        check_face_maximal(G, subgraph, embedding)
+        assert_equals(nx.number_connected_components(subgraph), 4)
+
+    def test_grid_with_chords(self):
+        G = nx.convert_node_labels_to_integers(nx.grid_2d_graph(12, 12))
+        rnd = random.Random(1)
+        G.add_edges_from(rnd.sample(list(combinations(range(144), 2)), 60))
+        for exact in [False, True]:
+            subgraph, embedding = maximal_planar_subgraph(G, exact)
+            check_subgraph(G, subgraph, embedding)
+            check_face_maximal(G, subgraph, embedding)
+        check_maximal(G, subgraph)
+
+    def test_random_graphs(self):
+        for seed in range(40):
+            G = nx.gnm_random_graph(12, 35, seed=seed)
+            subgraph, embedding = maximal_planar_subgraph(G)
+            check_subgraph(G, subgraph, embedding)
+            check_face_maximal(G, subgraph, embedding)
+
+    def test_random_graphs_exact(self):
+        for seed in range(20):
+            G = nx.gnm_random_graph(10, 28, seed=seed)
+            subgraph, embedding = maximal_planar_subgraph(G, exact=True)
+            check_subgraph(G, subgraph, embedding)
+            check_maximal(G, subgraph)
+
+    def test_planarization(self):
+        for seed in range(20):
+            G = nx.gnm_random_graph(15, 45, seed=seed)
+            nodes, adj_offsets, adj_targets, adj_edges = csr_from_graph(G)
+            deleted = LRPlanarization.from_csr(
+                adj_offsets, adj_targets, adj_edges).planarize()
+            edges = set()
+            for v in range(len(nodes)):
+                for i in range(adj_offsets[v], adj_offsets[v + 1]):
+                    if not deleted[adj_edges[i]]:
+                        edges.add(frozenset((v, adj_targets[i])))
+            assert_true(deleted.count(1) > 0)
+            H = nx.Graph(map(tuple, edges))
+            # tree edges are never removed
+            assert_true(nx.is_connected(H))
+
+    def test_failed_constraints(self):
+        # without resolving conflicts every failing add_constraints drops
+        # the popped conflict pairs
+        class Unresolved(LRPlanarization):
+            def resolve_conflicts(self, ei):
+                return True
+
+        for G in [nx.complete_graph(6), nx.gnm_random_graph(15, 45, seed=3)]:
+            nodes, adj_offsets, adj_targets, adj_edges = csr_from_graph(G)
+            deleted = Unresolved.from_csr(
+                adj_offsets, adj_targets, adj_edges).planarize()
+            assert_true(deleted.count(1) > 0)
+            H = nx.Graph()
+            H.add_nodes_from(range(len(nodes)))
+            H.add_edges_from((v, adj_targets[i]) for v in range(len(nodes))
+                             for i in range(adj_offsets[v],
+                                            adj_offsets[v + 1])
+                             if not deleted[adj_edges[i]])
+            assert_true(nx.is_connected(H))
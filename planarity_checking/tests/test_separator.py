@@ -0,0 +1,105 @@
+import random
+from math import sqrt
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true, raises
+from planarity_checking import generators
+from planarity_checking.lr_planarity import check_planarity
+from planarity_checking.separator import planar_separator, separator_tree
+
+
+def check_separator(G, A, B, S):
+    n = len(G)
+    assert_equals(A | B | S, set(G))
+    assert_equals(len(A) + len(B) + len(S), n)
+    assert_true(3 * len(A) <= 2 * n)
+    assert_true(3 * len(B) <= 2 * n)
+    assert_true(len(S) <= 2 * sqrt(2) * sqrt(n))
+    for u, v in G.edges:
+        assert_true(not (u in A and v in B or u in B and v in A),
+                    "Edge {}-{} joins A and B.".format(u, v))
+
+
+class TestSeparator:
+    """Unit tests for :mod:`planarity_checking.separator`."""
+
+    @staticmethod
+    def check(G, embedding=None):
+        check_separator(G, *planar_separator(G, embedding))
+
+    def test_small(self):
+        self.check(nx.empty_graph(0))
+        self.check(nx.empty_graph(1))
+        self.check(nx.path_graph(2))
+        self.check(nx.complete_graph(4))
+
+    def test_disconnected(self):
+        A, B, S = planar_separator(nx.empty_graph(6))
+        assert_equals(S, set())
+        G = nx.disjoint_union(nx.cycle_graph(20), nx.path_graph(5))
+        self.check(G)
+
+    def test_grid(self):
+        self.check(nx.grid_2d_graph(30, 30))
+        self.check(nx.grid_2d_graph(3, 200))
+
+    def test_tree(self):
+        self.check(nx.star_graph(50))
+        self.check(nx.balanced_tree(2, 8))
+
+    def test_triangulation(self):
+        for seed in range(5):
+            self.check(generators.to_networkx(
+                *generators.triangulation_edges(400, seed)))
+            self.check(generators.to_networkx(
+                *generators.apollonian_edges(400, seed)))
+
+    def test_sparse(self):
+        rnd = random.Random(1)
+        for seed in range(10):
+            G = generators.to_networkx(
+                *generators.triangulation_edges(300, seed))
+            G.remove_edges_from(rnd.sample(list(G.edges),
+                                           G.number_of_edges() // 2))
+            self.check(G)
+
+    def test_embedding(self):
+        G = nx.grid_2d_graph(20, 20)
+        is_planar, embedding = check_planarity(G)
+        self.check(G, embedding)
+        is_planar, embedding = check_planarity(G, compact=True)
+        self.check(G, embedding)
+
+    @raises(nx.NetworkXException)
+    def test_nonplanar(self):
+        planar_separator(nx.complete_graph(5))
+
+
+class TestSeparatorTree:
+    """Unit tests for :func:`separator_tree`."""
+
+    def test_cover(self):
+        G = generators.to_networkx(*generators.triangulation_edges(500, 2))
+        tree = separator_tree(G, leaf_size=8)
+        assert_true(nx.is_arborescence(tree))
+        nodes = [v for t in tree for v in tree.nodes[t]['nodes']]
+        assert_equals(sorted(nodes), sorted(G))
+
+    def test_separation(self):
+        G = nx.grid_2d_graph(15, 15)
+        tree = separator_tree(G, leaf_size=10)
+        part = {}
+        for t in nx.topological_sort(tree):
+            for v in tree.nodes[t]['nodes']:
+                part[v] = t
+        # an edge joins two nodes of the same part or an ancestor's part
+        for u, v in G.edges:
+            a, b = part[u], part[v]
+            assert_true(a == b or a in nx.ancestors(tree, b) or
+                        b in nx.ancestors(tree, a))
+
+    def test_leaf(self):
+        G = nx.path_graph(10)
+        tree = separator_tree(G, leaf_size=10)
+        assert_equals(len(tree), 1)
+        assert_equals(tree.nodes[0]['nodes'], set(G))
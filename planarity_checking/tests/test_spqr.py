@@ -0,0 +1,123 @@
+import random
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true, raises
+from planarity_checking.spqr import spqr_tree, SERIES, PARALLEL, RIGID
+
+
+def check_spqr_tree(G, tree):
+    """Check the properties that determine the SPQR tree uniquely"""
+    m = tree.number_of_edges()
+    assert_equals(m, G.number_of_edges())
+    count = {}
+    for e in tree.edges:
+        count[e] = count.get(e, 0) + 1
+    for e in range(len(tree.edge_source)):
+        # real edges are in one skeleton, virtual edges in two
+        assert_equals(count.get(e), 1 if e < m else 2)
+    real = set(frozenset((tree.nodes[tree.edge_source[e]],
+                          tree.nodes[tree.edge_target[e]]))
+               for e in range(m))
+    assert_equals(real, set(map(frozenset, G.edges)))
+    assert_true(nx.is_tree(tree.to_networkx()))
+
+    for i in range(len(tree)):
+        skeleton = tree.skeleton(i)
+        assert_true(skeleton.number_of_edges() >= 3)
+        if tree.types[i] == PARALLEL:
+            assert_equals(skeleton.number_of_nodes(), 2)
+        elif tree.types[i] == SERIES:
+            assert_true(nx.is_connected(skeleton))
+            assert_true(all(d == 2 for _, d in skeleton.degree))
+        else:
+            simple = nx.Graph(skeleton)
+            assert_equals(simple.number_of_edges(),
+                          skeleton.number_of_edges())
+            assert_true(nx.node_connectivity(simple) >= 3)
+    # adjacent S-nodes or P-nodes would be merged
+    for a, b in zip(tree.tree_source, tree.tree_target):
+        assert_true(tree.types[a] != tree.types[b] or
+                    tree.types[a] == RIGID)
+
+
+def series_parallel_graph(n, seed):
+    """Random series parallel graph built by subdividing and doubling"""
+    rnd = random.Random(seed)
+    G = nx.Graph([(0, 1)])
+    for v in range(2, n):
+        u, w = rnd.choice(list(G.edges))
+        if rnd.random() < 0.5:
+            G.remove_edge(u, w)
+        nx.add_path(G, [u, v, w])
+    return G
+
+
+class TestSPQRTree:
+    """Unit tests for :mod:`planarity_checking.spqr`."""
+
+    @staticmethod
+    def types(G):
+        tree = spqr_tree(G)
+        check_spqr_tree(G, tree)
+        return sorted('SPR'[t] for t in tree.types)
+
+    def test_triconnected(self):
+        assert_equals(self.types(nx.complete_graph(4)), ['R'])
+        assert_equals(self.types(nx.wheel_graph(8)), ['R'])
+        assert_equals(self.types(nx.petersen_graph()), ['R'])
+
+    def test_cycle(self):
+        assert_equals(self.types(nx.complete_graph(3)), ['S'])
+        assert_equals(self.types(nx.cycle_graph(100)), ['S'])
+
+    def test_bonds(self):
+        # six paths of length two between two vertices
+        assert_equals(self.types(nx.complete_bipartite_graph(2, 6)),
+                      ['P'] + ['S'] * 6)
+        G = nx.cycle_graph(6)
+        G.add_edge(0, 3)
+        assert_equals(self.types(G), ['P', 'S', 'S'])
+
+    def test_mixed(self):
+        assert_equals(self.types(nx.grid_2d_graph(5, 6)),
+                      ['R', 'S', 'S', 'S', 'S'])
+        self.types(nx.ladder_graph(10))
+        # two K4 joined at a separation pair
+        G = nx.complete_graph(4)
+        G.add_edges_from([(2, 4), (3, 4), (2, 5), (3, 5), (4, 5)])
+        assert_equals(self.types(G), ['P', 'R', 'R'])
+
+    def test_random(self):
+        rnd = random.Random(3)
+        tested = 0
+        while tested < 100:
+            n = rnd.randint(4, 30)
+            if tested % 2:
+                G = series_parallel_graph(n, rnd.randint(0, 10 ** 6))
+            else:
+                G = nx.gnm_random_graph(n, rnd.randint(n, 3 * n),
+                                        seed=rnd.randint(0, 10 ** 6))
+            if not nx.is_biconnected(G):
+                continue
+            self.types(G)
+            tested += 1
+
+    def test_skeleton(self):
+        G = nx.cycle_graph(6)
+        G.add_edge(0, 3)
+        tree = spqr_tree(G)
+        p = list(tree.types).index(PARALLEL)
+        skeleton = tree.skeleton(p)
+        assert_equals(set(skeleton), {0, 3})
+        virtual = [d['node'] for _, _, d in skeleton.edges(data=True)
+                   if d['virtual']]
+        assert_equals(sorted(tree.types[i] for i in virtual),
+                      [SERIES, SERIES])
+
+    @raises(nx.NetworkXException)
+    def test_not_biconnected(self):
+        spqr_tree(nx.path_graph(4))
+
+    @raises(nx.NetworkXException)
+    def test_too_small(self):
+        spqr_tree(nx.path_graph(2))
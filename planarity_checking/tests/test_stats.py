@@ -0,0 +1,102 @@
+import json
+import tracemalloc
+
+import networkx as nx
+from nose.tools import assert_equals, assert_true, assert_false
+from planarity_checking import lr_planarity
+from planarity_checking.stats import PlanarityStats
+
+
+class TestPlanarityStats:
+    """Unit tests for :mod:`planarity_checking.stats`."""
+
+    def test_planar_phases(self):
+        G = nx.triangular_lattice_graph(8, 8)
+        stats = PlanarityStats()
+        is_planar, embedding = lr_planarity.check_planarity(G, stats=stats)
+        assert_true(is_planar)
+        assert_equals(set(stats.phases),
+                      {'copy', 'orientation', 'sorting', 'testing', 'sign',
+                       'embedding', 'output'})
+        assert_equals(stats.phases['sorting']['calls'], 2)
+        for record in stats.phases.values():
+            assert_true(record['time'] >= 0)
+            assert_false('peak_memory' in record)
+        assert_true(abs(stats.total_time() -
+                        sum(r['time'] for r in stats.phases.values())) < 1e-9)
+
+    def test_counters(self):
+        G = nx.triangular_lattice_graph(8, 8)
+        stats = PlanarityStats()
+        lr_planarity.check_planarity(G, stats=stats)
+        counters = stats.counters
+        assert_equals(counters['tree_edges'], len(G) - 1)
+        assert_equals(counters['tree_edges'] + counters['back_edges'],
+                      len(G.edges))
+        # every back edge pushes a conflict pair, all pairs are merged or
+        # removed again at the end
+        assert_true(counters['conflict_pairs_pushed'] >=
+                    counters['back_edges'])
+        assert_true(counters['conflict_pairs_merged'] <=
+                    counters['conflict_pairs_pushed'])
+        assert_true(0 < counters['max_stack_height'] <=
+                    counters['back_edges'])
+        assert_true(counters['max_ref_chain'] <= counters['ref_chain_steps'])
+
+    def test_non_planar(self):
+        stats = PlanarityStats()
+        is_planar, _ = lr_planarity.check_planarity(nx.petersen_graph(), True,
+                                                    stats=stats)
+        assert_false(is_planar)
+        assert_true('testing' in stats.phases)
+        assert_true('counterexample' in stats.phases)
+        assert_false('embedding' in stats.phases)
+
+    def test_accumulate(self):
+        stats = PlanarityStats()
+        G = nx.wheel_graph(20)
+        lr_planarity.check_planarity(G, stats=stats)
+        back_edges = stats.counters['back_edges']
+        lr_planarity.check_planarity(G, stats=stats)
+        assert_equals(stats.counters['back_edges'], 2 * back_edges)
+        assert_equals(stats.phases['testing']['calls'], 2)
+
+    def test_from_csr(self):
+        stats = PlanarityStats()
+        nodes, adj_offsets, adj_targets, adj_edges = \
+            lr_planarity.csr_from_graph(nx.grid_2d_graph(5, 5))
+        planarity_state = lr_planarity.LRPlanarity.from_csr(
+            adj_offsets, adj_targets, adj_edges, nodes, stats=stats)
+        assert_true(planarity_state.lr_testing())
+        assert_equals(set(stats.phases),
+                      {'copy', 'orientation', 'sorting', 'testing'})
+
+    def test_trace_memory(self):
+        stats = PlanarityStats(trace_memory=True)
+        lr_planarity.check_planarity(nx.grid_2d_graph(10, 10), stats=stats)
+        for record in stats.phases.values():
+            assert_true(record['peak_memory'] >= 0)
+        # the tracing is only active during the phases
+        assert_false(tracemalloc.is_tracing())
+
+    def test_nested_phases(self):
+        stats = PlanarityStats(trace_memory=True)
+        with stats.phase('outer'):
+            data = bytearray(10 ** 6)
+            del data
+            with stats.phase('inner'):
+                pass
+        with stats.phase('inner'):
+            pass
+        outer, inner = stats.phases['outer'], stats.phases['inner']
+        # the peak of the outer phase survives the reset of the inner one
+        assert_true(outer['peak_memory'] >= 10 ** 6)
+        assert_true(inner['peak_memory'] < 10 ** 6)
+        # the nested time is not counted twice
+        assert_true(abs(stats.total_time() - outer['time'] -
+                        inner['time']) < inner['time'])
+
+    def test_json(self):
+        stats = PlanarityStats()
+        lr_planarity.check_planarity(nx.grid_2d_graph(4, 4), stats=stats)
+        assert_equals(json.loads(stats.to_json()), stats.as_dict())
@@ -0,0 +1,89 @@
+import networkx as nx
+from nose.tools import assert_equals, assert_raises
+from planarity_checking import lr_planarity
+from planarity_checking.generators import apollonian_edges, to_networkx
+from planarity_checking.verify import (check_rotation_system,
+                                       check_embedding,
+                                       rotation_system_from_dict)
+
+
+def assert_bad(embedding, G=None):
+    assert_raises(nx.NetworkXException, check_embedding, embedding, G)
+
+
+class TestVerify:
+    """Unit tests for :mod:`planarity_checking.verify`."""
+
+    def test_valid_embeddings(self):
+        graphs = [nx.wheel_graph(30), nx.grid_2d_graph(6, 7),
+                  nx.disjoint_union(nx.path_graph(4), nx.cycle_graph(5)),
+                  nx.empty_graph(3), nx.Graph(),
+                  to_networkx(*apollonian_edges(200, seed=1))]
+        for G in graphs:
+            is_planar, embedding = lr_planarity.check_planarity(G)
+            check_embedding(embedding)
+            check_embedding(embedding, G)
+            is_planar, rotation_system = lr_planarity.check_planarity(
+                G, compact=True)
+            check_embedding(rotation_system, G)
+
+    def test_csr_graph(self):
+        G = nx.triangular_lattice_graph(6, 6)
+        nodes, adj_offsets, adj_targets, adj_edges = \
+            lr_planarity.csr_from_graph(G)
+        rotation_system = lr_planarity.LRPlanarity.from_csr(
+            adj_offsets, adj_targets, adj_edges, nodes).lr_planarity(True)
+        check_rotation_system(rotation_system, adj_offsets, adj_targets)
+        # a missing edge of the graph
+        adj_targets[0] = adj_targets[1]
+        assert_raises(nx.NetworkXException, check_rotation_system,
+                      rotation_system, adj_offsets, adj_targets)
+
+    def test_non_planar_rotation(self):
+        # reversing a rotation of K4 gives an embedding on the torus
+        embedding = lr_planarity.check_planarity(nx.complete_graph(4))[1]
+        embedding[0].reverse()
+        assert_bad(embedding)
+        # the octahedron with two neighbors swapped at one vertex
+        embedding = lr_planarity.check_planarity(nx.octahedral_graph())[1]
+        embedding[0][0], embedding[0][1] = embedding[0][1], embedding[0][0]
+        assert_bad(embedding)
+
+    def test_missing_half_edge(self):
+        embedding = {0: [1, 2], 1: [0, 2], 2: [1]}
+        assert_bad(embedding)
+        assert_bad({0: [1], 1: [0, 5]})
+
+    def test_twice_and_self_loop(self):
+        assert_bad({0: [1, 1], 1: [0, 0]})
+        assert_bad({0: [0, 1], 1: [0]})
+
+    def test_wrong_graph(self):
+        G = nx.cycle_graph(5)
+        embedding = lr_planarity.check_planarity(G)[1]
+        H = nx.path_graph(5)
+        assert_bad(embedding, H)
+        H = nx.cycle_graph(5)
+        H.add_edge(0, 2)
+        assert_bad(embedding, H)
+        assert_bad(embedding, nx.cycle_graph(6))
+        # self-loops and multiple edges of the graph are ignored
+        H = nx.MultiGraph(G)
+        H.add_edges_from([(0, 1), (3, 3)])
+        check_embedding(embedding, H)
+
+    def test_broken_twin(self):
+        G = nx.wheel_graph(10)
+        rotation_system = lr_planarity.check_planarity(G, compact=True)[1]
+        twin = rotation_system.twin
+        twin[0], twin[1] = twin[1], twin[0]
+        assert_raises(nx.NetworkXException, check_rotation_system,
+                      rotation_system)
+
+    def test_from_dict(self):
+        embedding = lr_planarity.check_planarity(nx.wheel_graph(8))[1]
+        rotation_system = rotation_system_from_dict(embedding)
+        assert_raises(nx.NetworkXException, rotation_system_from_dict,
+                      {0: [1]})
+        check_rotation_system(rotation_system)
+        assert_equals(rotation_system.to_dict(), embedding)
@@ -0,0 +1,208 @@
+"""Linear time verification of planar embeddings
+
+The embedding is checked on the arrays of a :class:`RotationSystem`: every
+half-edge must have a twin, all faces are traced in one pass and Euler's
+formula n - m + f = 2 must hold for every connected component. Together
+this takes O(n + m) time, no PlanarEmbedding is built.
+"""
+from array import array
+
+import networkx as nx
+
+from planarity_checking.faces import face_index
+from planarity_checking.lr_planarity import NONE, RotationSystem
+
+
+def check_rotation_system(rotation_system, adj_offsets=None,
+                          adj_targets=None):
+    """Raises an exception if the rotation system is not a planar embedding
+
+    Parameters
+    ----------
+    rotation_system : RotationSystem
+    adj_offsets, adj_targets : arrays, optional
+        The adjacency lists of the graph in CSR form, with the vertex
+        numbering of the rotation system. If given, the rotation system must
+        contain exactly the edges of this graph.
+
+    Raises
+    ------
+    NetworkXException
+        If the rotation system is not valid, with a short explanation
+    """
+    offsets = rotation_system.offsets
+    targets = rotation_system.targets
+    twin = rotation_system.twin
+    n = len(offsets) - 1
+    size = len(targets)
+    if offsets[0] != 0 or offsets[n] != size or len(twin) != size:
+        raise nx.NetworkXException("Bad embedding. Wrong array sizes.")
+
+    # every neighbor once, no self-loops
+    sources = array('i', [NONE]) * size
+    mark = array('i', [NONE]) * n
+    for v in range(n):
+        if offsets[v] > offsets[v + 1]:
+            raise nx.NetworkXException("Bad embedding. Wrong offsets.")
+        for i in range(offsets[v], offsets[v + 1]):
+            w = targets[i]
+            if not 0 <= w < n:
+                raise nx.NetworkXException(
+                    "Bad embedding. Neighbor is not a node.")
+            if w == v:
+                raise nx.NetworkXException("Bad embedding. Self-loop.")
+            if mark[w] == v:
+                raise nx.NetworkXException(
+                    "Bad embedding. Node contained twice in a rotation.")
+            mark[w] = v
+            sources[i] = v
+
+    # every half-edge has an opposite half-edge
+    for i in range(size):
+        j = twin[i]
+        if not 0 <= j < size or j == i or twin[j] != i or \
+                targets[j] != sources[i]:
+            raise nx.NetworkXException(
+                "Bad embedding. Opposite half-edge is missing.")
+
+    if adj_offsets is not None:
+        _check_edges(offsets, targets, adj_offsets, adj_targets, mark)
+
+    # connected components by a DFS over the half-edges
+    component = array('i', [NONE]) * n
+    num_components = 0
+    for r in range(n):
+        if component[r] != NONE:
+            continue
+        component[r] = num_components
+        stack = [r]
+        while stack:
+            v = stack.pop()
+            for i in range(offsets[v], offsets[v + 1]):
+                w = targets[i]
+                if component[w] == NONE:
+                    component[w] = num_components
+                    stack.append(w)
+        num_components += 1
+
+    # Euler's formula n - m + f = 2 for every component with an edge, the
+    # half-edges count 2m and the nodes with neighbors n
+    euler = array('l', [0]) * num_components
+    for v in range(n):
+        if offsets[v + 1] > offsets[v]:
+            euler[component[v]] += 2
+    for i in range(size):
+        euler[component[sources[i]]] -= 1
+
+    # trace the faces: (v, w) is followed by (w, x), where x is the
+    # neighbor of w before v in clockwise order. Since twin is an
+    # involution this is a permutation, so every face is a closed cycle.
+    faces = face_index(rotation_system)
+    for f in range(len(faces)):
+        euler[component[sources[faces.half_edges[faces.offsets[f]]]]] += 2
+
+    for v in range(n):
+        if offsets[v + 1] > offsets[v] and euler[component[v]] != 4:
+            raise nx.NetworkXException(
+                "Bad embedding. The graph does not match Euler's formula.")
+
+
+def _check_edges(offsets, targets, adj_offsets, adj_targets, mark):
+    """Check that the rotation system has the edges of the CSR graph"""
+    n = len(offsets) - 1
+    if len(adj_offsets) - 1 != n:
+        raise nx.NetworkXException(
+            "Bad embedding. Wrong number of nodes.")
+    for v in range(n):
+        # the neighbors in the rotation system are marked with v + n, the
+        # ones that are also found in the graph with v + 2n
+        for i in range(offsets[v], offsets[v + 1]):
+            mark[targets[i]] = v + n
+        degree = 0
+        for i in range(adj_offsets[v], adj_offsets[v + 1]):
+            w = adj_targets[i]
+            if w == v or mark[w] == v + 2 * n:
+                continue  # self-loop or multiple edge
+            if mark[w] != v + n:
+                raise nx.NetworkXException(
+                    "Bad embedding. Edge of the graph is missing.")
+            mark[w] = v + 2 * n
+            degree += 1
+        if degree != offsets[v + 1] - offsets[v]:
+            raise nx.NetworkXException(
+                "Bad embedding. Edge is not in the graph.")
+
+
+def check_embedding(embedding, G=None):
+    """Raises an exception if the embedding is not a planar embedding
+
+    Parameters
+    ----------
+    embedding : RotationSystem or dict
+        An embedding as returned by :func:`check_planarity`
+    G : NetworkX graph, optional
+        If given, the embedding must contain exactly the nodes and edges
+        of G (self-loops and multiple edges are ignored).
+
+    Raises
+    ------
+    NetworkXException
+        If the embedding is not valid, with a short explanation
+
+    See Also
+    --------
+    check_rotation_system
+    """
+    if isinstance(embedding, dict):
+        embedding = rotation_system_from_dict(embedding)
+    if G is None:
+        check_rotation_system(embedding)
+        return
+    nodes = embedding.nodes
+    if len(nodes) != len(G):
+        raise nx.NetworkXException("Bad embedding. Wrong number of nodes.")
+    index = {v: i for i, v in enumerate(nodes)}
+    if len(index) != len(nodes) or any(v not in index for v in G):
+        raise nx.NetworkXException("Bad embedding. Wrong nodes.")
+    if G.is_directed():
+        G = G.to_undirected(as_view=True)
+    adj_offsets = array('i', [0]) * (len(nodes) + 1)
+    adj_targets = array('i')
+    for i, v in enumerate(nodes):
+        adj_targets.extend(index[w] for w in G.adj[v])
+        adj_offsets[i + 1] = len(adj_targets)
+    check_rotation_system(embedding, adj_offsets, adj_targets)
+
+
+def rotation_system_from_dict(embedding):
+    """Return the RotationSystem of an embedding given as dict
+
+    The dict maps every node to its neighbors in clockwise order, as
+    returned by :func:`check_planarity`. Half-edges without an opposite
+    half-edge get the twin NONE.
+
+    Raises
+    ------
+    NetworkXException
+        If a neighbor is not a node of the embedding
+    """
+    nodes = list(embedding)
+    index = {v: i for i, v in enumerate(nodes)}
+    offsets = array('i', [0]) * (len(nodes) + 1)
+    targets = array('i')
+    try:
+        for i, v in enumerate(nodes):
+            targets.extend(index[w] for w in embedding[v])
+            offsets[i + 1] = len(targets)
+    except KeyError:
+        raise nx.NetworkXException("Bad embedding. Neighbor is not a node.")
+    # the position of every half-edge, to find the opposite ones
+    position = {}
+    for v in range(len(nodes)):
+        for i in range(offsets[v], offsets[v + 1]):
+            position[v, targets[i]] = i
+    twin = array('i', [NONE]) * len(targets)
+    for v in range(len(nodes)):
+        for i in range(offsets[v], offsets[v + 1]):
+            twin[i] = position.get((targets[i], v), NONE)
+    return RotationSystem(nodes, offsets, targets, twin)